@@ -0,0 +1,55 @@
+"""
+Benchmark the numpy and pure Python implementations of gmaps.bounds
+
+Run with ``python benchmarks/bench_bounds.py`` with gmaps installed (or
+with the repository root on ``PYTHONPATH``).
+For each dataset size, this prints the time taken by each implementation
+and the largest difference between the bounds they return.
+"""
+
+import timeit
+
+import numpy as np
+
+from gmaps import bounds
+
+SIZES = [1000, 100000, 1000000]
+REPEATS = 3
+
+
+def _best_time(function, values):
+    return min(timeit.repeat(
+        lambda: function(values), number=1, repeat=REPEATS))
+
+
+def _benchmark(name, python_function, numpy_function, values):
+    values_list = values.tolist()
+    python_time = _best_time(python_function, values_list)
+    numpy_time = _best_time(numpy_function, values)
+    difference = np.max(np.abs(
+        np.array(python_function(values_list)) -
+        np.array(numpy_function(values))
+    ))
+    print('{:<10} {:>9d} {:>12.4f} {:>12.4f} {:>9.1f}x {:>12.2e}'.format(
+        name, len(values), python_time, numpy_time,
+        python_time / numpy_time, difference))
+
+
+def main():
+    random_state = np.random.RandomState(42)
+    print('{:<10} {:>9} {:>12} {:>12} {:>10} {:>12}'.format(
+        'bounds', 'points', 'python (s)', 'numpy (s)', 'speedup',
+        'max diff'))
+    for size in SIZES:
+        latitudes = random_state.normal(37.7, 0.1, size)
+        longitudes = random_state.normal(-122.4, 0.1, size)
+        _benchmark(
+            'latitude', bounds._latitude_bounds_python,
+            bounds._latitude_bounds_numpy, latitudes)
+        _benchmark(
+            'longitude', bounds._longitude_bounds_python,
+            bounds._longitude_bounds_numpy, longitudes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark building and querying a gmaps.ClusterIndex
+
+Run with ``python benchmarks/bench_clustering.py [number_points]`` with
+gmaps installed (or with the repository root on ``PYTHONPATH``).
+This prints the time taken to build an index, to add a batch of points
+to it, and to query the clusters in a city-sized viewport at several
+zoom levels.
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from gmaps import ClusterIndex
+
+DEFAULT_NUMBER_POINTS = 1000000
+NUMBER_ADDED = 10000
+VIEWPORT = ((37.5, -122.6), (37.9, -122.2))
+ZOOMS = [0, 6, 10, 14, 17]
+REPEATS = 3
+
+
+def _best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEATS))
+
+
+def _random_locations(random_state, size):
+    return np.column_stack([
+        np.clip(random_state.normal(37.7, 2.0, size), -85.0, 85.0),
+        np.clip(random_state.normal(-122.4, 2.0, size), -180.0, 180.0)
+    ])
+
+
+def main():
+    number_points = (
+        int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUMBER_POINTS)
+    random_state = np.random.RandomState(42)
+    locations = _random_locations(random_state, number_points)
+    added_locations = _random_locations(random_state, NUMBER_ADDED)
+
+    build_time = _best_time(lambda: ClusterIndex(locations))
+    print('build {:d} points: {:.3f} s'.format(number_points, build_time))
+
+    index = ClusterIndex(locations)
+    add_time = _best_time(lambda: index.add(added_locations))
+    print('add {:d} points: {:.3f} s'.format(NUMBER_ADDED, add_time))
+
+    print('{:>5} {:>10} {:>12}'.format('zoom', 'clusters', 'query (s)'))
+    for zoom in ZOOMS:
+        number_clusters = len(index.get_cluster_arrays(VIEWPORT, zoom)[0])
+        query_time = _best_time(
+            lambda: index.get_cluster_arrays(VIEWPORT, zoom))
+        print('{:>5d} {:>10d} {:>12.4f}'.format(
+            zoom, number_clusters, query_time))
+
+
+if __name__ == '__main__':
+    main()
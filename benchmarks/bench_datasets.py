@@ -0,0 +1,71 @@
+"""
+Benchmark loading datasets from the local cache with gmaps.datasets
+
+Run with ``python benchmarks/bench_datasets.py [dataset_name ...]`` with
+gmaps installed (or with the repository root on ``PYTHONPATH``). This
+downloads the datasets listed by
+:func:`gmaps.datasets.list_datasets`, or only those named on the command
+line, into the dataset cache, and prints the time taken to:
+
+- ``csv``: parse the cached CSV file row by row,
+- ``columns``: parse the cached CSV file into numpy columns, one chunk
+  of rows at a time,
+- ``rows``: load the dataset as a list of tuples with
+  :func:`gmaps.datasets.load_dataset`, from the cached columns,
+- ``arrays``: load the dataset as memory-mapped arrays with
+  :func:`gmaps.datasets.load_dataset_as_array`,
+- ``chunks``: iterate over the dataset in chunks of 10000 rows with
+  :func:`gmaps.datasets.iter_dataset`.
+"""
+
+import sys
+import timeit
+
+from gmaps.datasets import datasets
+
+REPEATS = 3
+
+
+def _best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEATS))
+
+
+def _parse_csv(dataset_name, path):
+    with open(path, 'rb') as f:
+        return datasets._read_rows(
+            f, datasets.METADATA[dataset_name]['types'])
+
+
+def _parse_columns(dataset_name, path):
+    with open(path, 'rb') as f:
+        return datasets._parse_columns(
+            f, datasets.METADATA[dataset_name]['types'])
+
+
+def _iterate(dataset_name):
+    for _ in datasets.iter_dataset(dataset_name, chunksize=10000):
+        pass
+
+
+def main():
+    dataset_names = sys.argv[1:] or sorted(datasets.list_datasets())
+    print('{:<24} {:>8} {:>10} {:>12}'.format(
+        'dataset', 'method', 'rows', 'time (s)'))
+    for dataset_name in dataset_names:
+        number_rows = len(datasets.load_dataset(dataset_name))
+        path = datasets._cached_dataset_path(dataset_name, use_cache=True)
+        methods = [
+            ('csv', lambda: _parse_csv(dataset_name, path)),
+            ('columns', lambda: _parse_columns(dataset_name, path)),
+            ('rows', lambda: datasets.load_dataset(dataset_name)),
+            ('arrays', lambda: datasets.load_dataset_as_array(dataset_name)),
+            ('chunks', lambda: _iterate(dataset_name))
+        ]
+        for method_name, function in methods:
+            print('{:<24} {:>8} {:>10} {:>12.4f}'.format(
+                dataset_name, method_name, number_rows,
+                _best_time(function)))
+
+
+if __name__ == '__main__':
+    main()
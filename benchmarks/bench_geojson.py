@@ -0,0 +1,69 @@
+"""
+Benchmark validating and copying GeoJSON documents for gmaps.geojson_layer
+
+Run with ``python benchmarks/bench_geojson.py [geometry_name ...]`` with
+gmaps installed (or with the repository root on ``PYTHONPATH``). This
+downloads the geometries listed by
+:func:`gmaps.geojson_geometries.list_geometries`, or only those named
+on the command line, and prints the time taken and the peak memory
+allocated to prepare the features of a GeoJSON layer:
+
+- ``legacy``: serializing the document to JSON and parsing it with the
+  ``geojson`` package, then deep-copying it, as gmaps used to do,
+- ``copy``: a single validation pass that copies the features,
+- ``no copy``: a single validation pass, as with ``copy=False``.
+"""
+
+import copy
+import json
+import sys
+import timeit
+import tracemalloc
+
+import geojson
+
+from gmaps.geojson_geometries import list_geometries, load_geometry
+from gmaps.geojson_layer import _validate_geojson
+
+REPEATS = 3
+
+
+def _best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEATS))
+
+
+def _peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _legacy(document):
+    geojson.loads(json.dumps(document)).is_valid
+    return copy.deepcopy(document)["features"]
+
+
+def main():
+    geometry_names = sys.argv[1:] or sorted(list_geometries())
+    print('{:<28} {:<8} {:>10} {:>14}'.format(
+        'geometry', 'method', 'time (s)', 'peak (MB)'))
+    for geometry_name in geometry_names:
+        document = load_geometry(geometry_name)
+        methods = [
+            ('legacy', lambda: _legacy(document)),
+            ('copy', lambda: _validate_geojson(document, copy=True)),
+            ('no copy', lambda: _validate_geojson(document, copy=False))
+        ]
+        for method_name, function in methods:
+            elapsed = _best_time(function)
+            peak = _peak_memory(function) / 1024.0 / 1024.0
+            print('{:<28} {:<8} {:>10.3f} {:>14.1f}'.format(
+                geometry_name, method_name, elapsed, peak))
+
+
+if __name__ == '__main__':
+    main()
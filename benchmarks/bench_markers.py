@@ -0,0 +1,53 @@
+"""
+Benchmark building compact marker and symbol layers
+
+Run with ``python benchmarks/bench_markers.py [number_markers]`` with
+gmaps installed (or with the repository root on ``PYTHONPATH``).
+This prints the time taken to build compact layers with one style
+value per marker, from lists and from numpy arrays.
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from gmaps import marker_layer, symbol_layer
+
+DEFAULT_NUMBER_MARKERS = 100000
+COLORS = ['red', 'green', 'blue', (100, 100, 0), 'rgba(0,0,0,0.5)']
+REPEATS = 3
+
+
+def _best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEATS))
+
+
+def main():
+    number_markers = (
+        int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUMBER_MARKERS)
+    random_state = np.random.RandomState(42)
+    locations = np.column_stack([
+        random_state.uniform(-60.0, 60.0, number_markers),
+        random_state.uniform(-180.0, 180.0, number_markers)
+    ])
+    color_indices = random_state.randint(len(COLORS), size=number_markers)
+    colors = [COLORS[index] for index in color_indices]
+    scales = random_state.randint(1, 10, size=number_markers)
+    labels = [str(index) for index in range(number_markers)]
+
+    symbol_time = _best_time(lambda: symbol_layer(
+        locations, fill_color=colors, stroke_color=colors,
+        scale=scales, info_box_content=labels, compact=True))
+    print('symbol layer, {:d} markers: {:.3f} s'.format(
+        number_markers, symbol_time))
+
+    marker_time = _best_time(lambda: marker_layer(
+        locations, hover_text=labels, label=labels,
+        info_box_content=labels, compact=True))
+    print('marker layer, {:d} markers: {:.3f} s'.format(
+        number_markers, marker_time))
+
+
+if __name__ == '__main__':
+    main()
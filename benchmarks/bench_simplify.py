@@ -0,0 +1,50 @@
+"""
+Benchmark simplifying GeoJSON geometries for gmaps.geojson_layer
+
+Run with ``python benchmarks/bench_simplify.py [geometry_name ...]`` with
+gmaps installed (or with the repository root on ``PYTHONPATH``). This
+downloads the geometries listed by
+:func:`gmaps.geojson_geometries.list_geometries`, or only those named
+on the command line, and prints, for each level of
+``simplify='auto'``, the number of vertices and the size of the
+geometries encoded as JSON, along with the time taken to compute every
+level.
+"""
+
+import json
+import sys
+import timeit
+
+from gmaps.geojson_geometries import list_geometries, load_geometry
+from gmaps.simplify import auto_simplify_levels, count_vertices
+
+REPEATS = 3
+
+
+def _best_time(function):
+    return min(timeit.repeat(function, number=1, repeat=REPEATS))
+
+
+def _encoded_size(geometries):
+    return len(json.dumps(geometries, separators=(',', ':')))
+
+
+def main():
+    geometry_names = sys.argv[1:] or sorted(list_geometries())
+    print('{:<28} {:>6} {:>10} {:>12} {:>10}'.format(
+        'geometry', 'zoom', 'vertices', 'size (kB)', 'time (s)'))
+    for geometry_name in geometry_names:
+        document = load_geometry(geometry_name)
+        geometries = [
+            feature['geometry'] for feature in document['features']]
+        elapsed = _best_time(lambda: auto_simplify_levels(geometries))
+        for zoom, level_geometries in auto_simplify_levels(geometries):
+            if level_geometries is None:
+                level_geometries = geometries
+            print('{:<28} {:>6} {:>10} {:>12.1f} {:>10.3f}'.format(
+                geometry_name, zoom, count_vertices(level_geometries),
+                _encoded_size(level_geometries) / 1024.0, elapsed))
+
+
+if __name__ == '__main__':
+    main()
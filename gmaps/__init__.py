@@ -10,6 +10,8 @@ from .bicycling import *  # noqa
 from .transit import *  # noqa
 from .traffic import *  # noqa
 from .drawing import *  # noqa
+from .clustering import *  # noqa
+from .colormaps import *  # noqa
 
 
 def _jupyter_nbextension_paths():
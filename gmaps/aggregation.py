@@ -0,0 +1,233 @@
+"""
+Aggregation of large point datasets into density grids
+
+Heatmaps with millions of points are slow to send to the browser and
+to render, while most points end up in the same pixels anyway. Binning
+the points into a grid and drawing one weighted point per grid cell
+gives a visually similar heatmap with far fewer points.
+"""
+
+from . import bounds, mercator
+from .geotraitlets import (
+    _validate_location_columns, _validate_weight_column)
+from .locations import locations_to_array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ALLOWED_GRID_TYPES = ['mercator', 'latlng']
+
+# Number of cells along the widest side of the data bounds when the
+# cell size is chosen automatically. This is roughly the resolution of
+# a map showing the whole dataset.
+DEFAULT_GRID_RESOLUTION = 200
+
+# Size of the cells of each level of a heatmap pyramid, in pixels at
+# the zoom level that the level is shown at. This must be a power of 2
+# so that the cells of each level nest within those of the previous one.
+PYRAMID_CELL_PIXELS = 4
+
+# Maximum number of points in each level of a heatmap pyramid
+DEFAULT_MAX_LEVEL_POINTS = 50000
+
+# Pyramid cells are indexed by 32-bit integer coordinates, which limits
+# the finest resolution of a pyramid.
+_MAX_PYRAMID_BITS = 32
+
+
+def grid_aggregate(
+        locations, weights=None, cell_size=None, grid_type='mercator'):
+    """
+    Aggregate points into a grid of cells
+
+    :param locations:
+        Iterable of (latitude, longitude) pairs.
+
+    :param weights:
+        Iterable of non-negative weights of the same length as
+        `locations`, or None to give every point a weight of 1.
+
+    :param cell_size:
+        Width of each cell, in degrees of longitude. If None, the cell
+        size is chosen so that the data bounds, as computed by
+        :mod:`gmaps.bounds`, are about ``DEFAULT_GRID_RESOLUTION``
+        cells wide.
+    :type cell_size: float, optional
+
+    :param grid_type:
+        'mercator' for cells that are square in the Web Mercator
+        projection, and therefore on the map, or 'latlng' for
+        cells that are square in latitude and longitude.
+    :type grid_type: str, optional
+
+    :returns:
+        A tuple ``(cell_locations, cell_weights)``. ``cell_locations`` is
+        an array of shape ``(n, 2)`` with the weighted centroid of the
+        points in each non-empty cell, and ``cell_weights`` is an array
+        with the total weight of the points in each cell.
+    """
+    if np is None:
+        raise ImportError('Aggregating heatmaps requires numpy')
+    if grid_type not in ALLOWED_GRID_TYPES:
+        raise ValueError(
+            '{} is not a valid grid type. Expected one of {}'.format(
+                grid_type, ALLOWED_GRID_TYPES))
+    locations = locations_to_array(locations)
+    latitudes = locations[:, 0]
+    longitudes = locations[:, 1]
+    _validate_location_columns(latitudes, longitudes)
+    weights = _validate_weight_column(weights, len(locations))
+    if not len(locations):
+        return locations, weights
+    if cell_size is None:
+        cell_size = automatic_cell_size(locations, grid_type)
+    elif cell_size <= 0.0:
+        raise ValueError('cell_size must be positive')
+    if grid_type == 'mercator':
+        x, y = mercator.world_coordinates(latitudes, longitudes)
+        cell_size_world = cell_size / 360.0
+        rows = np.floor(y / cell_size_world).astype(np.int64)
+        columns = np.floor(x / cell_size_world).astype(np.int64)
+    else:
+        rows = np.floor((latitudes + 90.0) / cell_size).astype(np.int64)
+        columns = np.floor(
+            (longitudes + 180.0) / cell_size).astype(np.int64)
+    number_columns = int(columns.max()) + 1
+    cell_keys = rows * number_columns + columns
+    _, cell_indices = np.unique(cell_keys, return_inverse=True)
+    cell_weights = np.bincount(cell_indices, weights=weights)
+    sum_latitudes = np.bincount(cell_indices, weights=weights * latitudes)
+    sum_longitudes = np.bincount(cell_indices, weights=weights * longitudes)
+    return _weighted_centroids(cell_weights, sum_latitudes, sum_longitudes)
+
+
+def _weighted_centroids(cell_weights, sum_latitudes, sum_longitudes):
+    # Cells whose points all have zero weight do not contribute to
+    # the heatmap, and would give an undefined centroid.
+    is_weighted = cell_weights > 0.0
+    cell_weights = cell_weights[is_weighted]
+    cell_locations = np.column_stack([
+        sum_latitudes[is_weighted] / cell_weights,
+        sum_longitudes[is_weighted] / cell_weights
+    ])
+    return cell_locations, cell_weights
+
+
+def automatic_cell_size(locations, grid_type='mercator'):
+    """
+    Cell size, in degrees of longitude, for a grid covering the data
+
+    This returns a cell size such that the data bounds are
+    ``DEFAULT_GRID_RESOLUTION`` cells along their widest side.
+    """
+    (min_latitude, min_longitude), (max_latitude, max_longitude) = \
+        bounds.BoundsAccumulator.from_locations(locations).bounds()
+    longitude_extent = (max_longitude - min_longitude) % 360.0
+    if grid_type == 'mercator':
+        _, (south_y, north_y) = mercator.world_coordinates(
+            [min_latitude, max_latitude], [0.0, 0.0])
+        # Express the height of the bounds in degrees of longitude
+        latitude_extent = (south_y - north_y) * 360.0
+    else:
+        latitude_extent = max_latitude - min_latitude
+    return max(longitude_extent, latitude_extent) / DEFAULT_GRID_RESOLUTION
+
+
+def pyramid_aggregate(
+        locations, weights=None, max_level_points=DEFAULT_MAX_LEVEL_POINTS,
+        max_zoom=20):
+    """
+    Aggregate points into a pyramid of grids, one for each zoom level
+
+    The level for zoom level `z` is a Web Mercator grid whose cells are
+    ``PYRAMID_CELL_PIXELS`` pixels wide at that zoom, with one point per
+    non-empty cell, placed at the weighted centroid of the points in the
+    cell. Levels are built from the whole world at zoom 0 towards finer
+    grids, stopping at the first level with more than `max_level_points`
+    cells, at `max_zoom`, or when every point is in its own cell.
+
+    :param locations:
+        Iterable of (latitude, longitude) pairs.
+
+    :param weights:
+        Iterable of non-negative weights of the same length as
+        `locations`, or None to give every point a weight of 1.
+
+    :param max_level_points:
+        Maximum number of points in each level. The coarsest level is
+        always included, even if it has more points.
+    :type max_level_points: int, optional
+
+    :param max_zoom:
+        Zoom level of the finest level.
+    :type max_zoom: int, optional
+
+    :returns:
+        List of ``(zoom, cell_locations, cell_weights)`` tuples, sorted
+        by increasing zoom level. Each level should be shown from its
+        zoom level until the zoom level of the next one.
+    """
+    if np is None:
+        raise ImportError('Aggregating heatmaps requires numpy')
+    # Number of bits needed to index the cells of the zoom 0 grid
+    base_bits = int(np.log2(mercator.TILE_SIZE // PYRAMID_CELL_PIXELS))
+    if not 0 <= max_zoom <= _MAX_PYRAMID_BITS - base_bits:
+        raise ValueError(
+            'max_zoom must be between 0 and {}'.format(
+                _MAX_PYRAMID_BITS - base_bits))
+    if max_level_points < 1:
+        raise ValueError('max_level_points must be strictly positive')
+    locations = locations_to_array(locations)
+    latitudes = locations[:, 0]
+    longitudes = locations[:, 1]
+    _validate_location_columns(latitudes, longitudes)
+    weights = _validate_weight_column(weights, len(locations))
+    if not len(locations):
+        return [(0, locations, weights)]
+    # Sort the points along a Z-order curve through the cells of the
+    # finest grid. The cells of every coarser grid are then contiguous
+    # runs of points, found by dropping the low bits of the Z-order key,
+    # so the points only need to be sorted once.
+    x, y = mercator.world_coordinates(latitudes, longitudes)
+    cells_per_axis = 2 ** (base_bits + max_zoom)
+    columns = np.clip(
+        (x * cells_per_axis).astype(np.uint64), 0, cells_per_axis - 1)
+    rows = np.clip(
+        (y * cells_per_axis).astype(np.uint64), 0, cells_per_axis - 1)
+    keys = mercator.zorder_keys(columns, rows)
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    latitudes = latitudes[order]
+    longitudes = longitudes[order]
+    weights = weights[order]
+    weighted_latitudes = weights * latitudes
+    weighted_longitudes = weights * longitudes
+    levels = []
+    for zoom in range(max_zoom + 1):
+        shift = np.uint64(2 * (max_zoom - zoom))
+        level_keys = keys >> shift
+        is_new_cell = np.empty(len(level_keys), dtype=bool)
+        is_new_cell[0] = True
+        np.not_equal(level_keys[1:], level_keys[:-1], out=is_new_cell[1:])
+        cell_starts = np.flatnonzero(is_new_cell)
+        if levels and len(cell_starts) > max_level_points:
+            break
+        if len(cell_starts) == len(keys):
+            # Every point is in its own cell: finer levels would be
+            # identical to this one.
+            is_weighted = weights > 0.0
+            levels.append((
+                zoom,
+                np.column_stack([latitudes, longitudes])[is_weighted],
+                weights[is_weighted]
+            ))
+            break
+        cell_locations, cell_weights = _weighted_centroids(
+            np.add.reduceat(weights, cell_starts),
+            np.add.reduceat(weighted_latitudes, cell_starts),
+            np.add.reduceat(weighted_longitudes, cell_starts)
+        )
+        levels.append((zoom, cell_locations, cell_weights))
+    return levels
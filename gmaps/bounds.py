@@ -1,5 +1,10 @@
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 EPSILON = 1e-5
 
@@ -12,21 +17,10 @@ def latitude_bounds(latitudes):
     """
     Estimate latitude bound with 2*sample standard deviation
     """
-    if max(latitudes) - min(latitudes) < 2.0*EPSILON:
-        lower_bound = latitudes[0] - EPSILON
-        upper_bound = latitudes[0] + EPSILON
+    if np is not None:
+        return _latitude_bounds_numpy(latitudes)
     else:
-        N = float(len(latitudes))
-        mean = sum(latitudes) / N
-        sum_squares = sum(
-            (latitude-mean)**2 for latitude in latitudes
-        )
-        standard_deviation = math.sqrt(sum_squares/float(N))
-        lower_bound = max(mean - 2.0*standard_deviation, -(90.0 - EPSILON))
-        upper_bound = min(mean + 2.0*standard_deviation, (90.0 - EPSILON))
-    lower_bound, upper_bound = _constrain_latitude_bounds(
-        lower_bound, upper_bound)
-    return lower_bound, upper_bound
+        return _latitude_bounds_python(latitudes)
 
 
 def longitude_bounds(longitudes):
@@ -40,39 +34,270 @@ def longitude_bounds(longitudes):
     and https://en.wikipedia.org/wiki/Directional_statistics
     for how to calculate the relevant statistics.
     """
+    if np is not None:
+        return _longitude_bounds_numpy(longitudes)
+    else:
+        return _longitude_bounds_python(longitudes)
+
+
+def _latitude_bounds_python(latitudes):
+    if max(latitudes) - min(latitudes) < 2.0*EPSILON:
+        return _latitude_bounds_single(latitudes[0])
+    else:
+        N = float(len(latitudes))
+        mean = sum(latitudes) / N
+        sum_squares = sum(
+            (latitude-mean)**2 for latitude in latitudes
+        )
+        standard_deviation = math.sqrt(sum_squares/float(N))
+        return _latitude_bounds_from_statistics(mean, standard_deviation)
+
+
+def _latitude_bounds_numpy(latitudes):
+    latitudes = np.asarray(latitudes, dtype=float)
+    if latitudes.max() - latitudes.min() < 2.0*EPSILON:
+        return _latitude_bounds_single(float(latitudes[0]))
+    else:
+        mean = float(latitudes.mean())
+        standard_deviation = float(latitudes.std())
+        return _latitude_bounds_from_statistics(mean, standard_deviation)
+
+
+def _latitude_bounds_single(latitude):
+    lower_bound = latitude - EPSILON
+    upper_bound = latitude + EPSILON
+    return _constrain_latitude_bounds(lower_bound, upper_bound)
+
+
+def _latitude_bounds_from_statistics(mean, standard_deviation):
+    lower_bound = max(mean - 2.0*standard_deviation, -(90.0 - EPSILON))
+    upper_bound = min(mean + 2.0*standard_deviation, (90.0 - EPSILON))
+    return _constrain_latitude_bounds(lower_bound, upper_bound)
+
+
+def _longitude_bounds_python(longitudes):
     normalized_longitudes = [
         _normalize_longitude(longitude) for longitude in longitudes
     ]
-    if max(normalized_longitudes) - min(normalized_longitudes) < 2.0*EPSILON:
-        mean_longitude = 0.5 * (
-            max(normalized_longitudes) + min(normalized_longitudes)
-        )
-        upper_bound = mean_longitude + EPSILON
-        lower_bound = mean_longitude - EPSILON
+    min_longitude = min(normalized_longitudes)
+    max_longitude = max(normalized_longitudes)
+    if max_longitude - min_longitude < 2.0*EPSILON:
+        return _longitude_bounds_single(min_longitude, max_longitude)
     else:
         N = float(len(longitudes))
         radians = [
             math.radians(longitude) for longitude in normalized_longitudes
         ]
         sum_cos = sum(math.cos(r) for r in radians)
-        sum_cos_sq = sum_cos**2
         sum_sin = sum(math.sin(r) for r in radians)
-        sum_sin_sq = sum_sin**2
-        mean_radians = math.atan2(sum_sin, sum_cos)
-        mean_degrees = math.degrees(mean_radians)
-        Rsq = (1/N**2) * (sum_cos_sq + sum_sin_sq)
+        return _longitude_bounds_from_sums(N, sum_cos, sum_sin)
+
+
+def _longitude_bounds_numpy(longitudes):
+    normalized_longitudes = np.mod(np.asarray(longitudes, dtype=float), 360.0)
+    normalized_longitudes[normalized_longitudes >= 180.0] -= 360.0
+    min_longitude = float(normalized_longitudes.min())
+    max_longitude = float(normalized_longitudes.max())
+    if max_longitude - min_longitude < 2.0*EPSILON:
+        return _longitude_bounds_single(min_longitude, max_longitude)
+    else:
+        N = float(len(normalized_longitudes))
+        radians = np.radians(normalized_longitudes)
+        sum_cos = float(np.cos(radians).sum())
+        sum_sin = float(np.sin(radians).sum())
+        return _longitude_bounds_from_sums(N, sum_cos, sum_sin)
+
+
+def _longitude_bounds_single(min_longitude, max_longitude):
+    mean_longitude = 0.5 * (max_longitude + min_longitude)
+    upper_bound = mean_longitude + EPSILON
+    lower_bound = mean_longitude - EPSILON
+    return lower_bound, upper_bound
+
+
+def _longitude_bounds_from_sums(N, sum_cos, sum_sin):
+    mean_radians = math.atan2(sum_sin, sum_cos)
+    mean_degrees = math.degrees(mean_radians)
+    Rsq = (1/N**2) * (sum_cos**2 + sum_sin**2)
+    # Rounding errors can push Rsq marginally above 1
+    Rsq = min(Rsq, 1.0)
+    if Rsq > 0.0:
         standard_deviation = math.sqrt(-math.log(Rsq))
         extent = 2.0*math.degrees(standard_deviation)
-        if extent > 180.0:
-            # longitudes cover entire map
-            upper_bound = 180.0 - EPSILON
-            lower_bound = -upper_bound
-        else:
-            lower_bound = _normalize_longitude(mean_degrees - extent)
-            upper_bound = _normalize_longitude(mean_degrees + extent)
+    else:
+        # points spread evenly around the globe
+        extent = float('inf')
+    if extent > 180.0:
+        # longitudes cover entire map
+        upper_bound = 180.0 - EPSILON
+        lower_bound = -upper_bound
+    else:
+        lower_bound = _normalize_longitude(mean_degrees - extent)
+        upper_bound = _normalize_longitude(mean_degrees + extent)
     return lower_bound, upper_bound
 
 
+class BoundsAccumulator(object):
+    """
+    Mergeable summary of a set of locations, for estimating bounds
+
+    This keeps the number of points, the sum and sum of squares of
+    the latitudes, and the sum of the cosines and sines of the
+    longitudes. These are sufficient to estimate the same 2-sigma
+    latitude bounds and wrapped normal longitude bounds as
+    :func:`latitude_bounds` and :func:`longitude_bounds`.
+
+    Since these are just sums, adding or removing k points
+    costs O(k), and accumulators computed on separate chunks of
+    data can be merged exactly.
+
+    :Examples:
+
+    >>> accumulator = BoundsAccumulator.from_locations(locations)
+    >>> accumulator.add(new_locations)
+    >>> accumulator.remove(old_locations)
+    >>> accumulator.bounds()
+    [(min_latitude, min_longitude), (max_latitude, max_longitude)]
+
+    >>> chunk_accumulators = [
+            BoundsAccumulator.from_locations(chunk) for chunk in chunks
+        ]
+    >>> total = sum(chunk_accumulators, BoundsAccumulator())
+    """
+
+    def __init__(
+            self, count=0, sum_latitudes=0.0, sum_latitudes_squared=0.0,
+            sum_cos=0.0, sum_sin=0.0):
+        self.count = count
+        self.sum_latitudes = sum_latitudes
+        self.sum_latitudes_squared = sum_latitudes_squared
+        self.sum_cos = sum_cos
+        self.sum_sin = sum_sin
+
+    @classmethod
+    def from_locations(cls, locations):
+        """
+        Build an accumulator from an iterable of (latitude, longitude) pairs
+        """
+        return cls(*_location_sums(locations))
+
+    def add(self, locations):
+        """
+        Add an iterable of (latitude, longitude) pairs to the summary
+        """
+        self._update(_location_sums(locations), 1)
+
+    def remove(self, locations):
+        """
+        Remove (latitude, longitude) pairs that were previously added
+        """
+        self._update(_location_sums(locations), -1)
+
+    def merge(self, other):
+        """
+        Return a new accumulator summarizing the points in both accumulators
+        """
+        merged = self.copy()
+        merged._update(other._sums(), 1)
+        return merged
+
+    __add__ = merge
+
+    def copy(self):
+        return BoundsAccumulator(*self._sums())
+
+    def latitude_bounds(self):
+        """
+        Estimate latitude bounds with 2*sample standard deviation
+        """
+        self._check_not_empty()
+        N = float(self.count)
+        mean = self.sum_latitudes / N
+        variance = max(self.sum_latitudes_squared / N - mean**2, 0.0)
+        standard_deviation = math.sqrt(variance)
+        if standard_deviation < 0.5*EPSILON:
+            return _latitude_bounds_single(mean)
+        else:
+            return _latitude_bounds_from_statistics(mean, standard_deviation)
+
+    def longitude_bounds(self):
+        """
+        Estimate longitude bounds with a wrapped normal distribution
+        """
+        self._check_not_empty()
+        lower_bound, upper_bound = _longitude_bounds_from_sums(
+            float(self.count), self.sum_cos, self.sum_sin)
+        if _longitude_extent(lower_bound, upper_bound) < 2.0*EPSILON:
+            mean_longitude = math.degrees(
+                math.atan2(self.sum_sin, self.sum_cos))
+            return _longitude_bounds_single(mean_longitude, mean_longitude)
+        else:
+            return lower_bound, upper_bound
+
+    def bounds(self):
+        """
+        Bounds in the format expected by the `data_bounds` layer trait
+        """
+        min_latitude, max_latitude = self.latitude_bounds()
+        min_longitude, max_longitude = self.longitude_bounds()
+        return [
+            (min_latitude, min_longitude),
+            (max_latitude, max_longitude)
+        ]
+
+    def _sums(self):
+        return (
+            self.count, self.sum_latitudes, self.sum_latitudes_squared,
+            self.sum_cos, self.sum_sin
+        )
+
+    def _update(self, sums, sign):
+        count, sum_latitudes, sum_latitudes_squared, sum_cos, sum_sin = sums
+        self.count += sign * count
+        self.sum_latitudes += sign * sum_latitudes
+        self.sum_latitudes_squared += sign * sum_latitudes_squared
+        self.sum_cos += sign * sum_cos
+        self.sum_sin += sign * sum_sin
+
+    def _check_not_empty(self):
+        if self.count <= 0:
+            raise ValueError('Cannot estimate the bounds of an empty set.')
+
+    def __repr__(self):
+        return 'BoundsAccumulator(count={})'.format(self.count)
+
+
+def _location_sums(locations):
+    if np is not None:
+        locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+        latitudes = locations[:, 0]
+        radians = np.radians(locations[:, 1])
+        return (
+            len(locations),
+            float(latitudes.sum()),
+            float(np.dot(latitudes, latitudes)),
+            float(np.cos(radians).sum()),
+            float(np.sin(radians).sum())
+        )
+    else:
+        count = 0
+        sum_latitudes = sum_latitudes_squared = 0.0
+        sum_cos = sum_sin = 0.0
+        for latitude, longitude in locations:
+            radians = math.radians(longitude)
+            count += 1
+            sum_latitudes += latitude
+            sum_latitudes_squared += latitude**2
+            sum_cos += math.cos(radians)
+            sum_sin += math.sin(radians)
+        return count, sum_latitudes, sum_latitudes_squared, sum_cos, sum_sin
+
+
+def _longitude_extent(lower_bound, upper_bound):
+    """ Width of the interval going eastwards from lower to upper bound """
+    return (upper_bound - lower_bound) % 360.0
+
+
 def merge_longitude_bounds(longitude_bounds_list):
     """
     Return a single set of bounds that encompasses a list of bounds
@@ -0,0 +1,418 @@
+"""
+Server-side clustering of large point datasets
+
+A :class:`gmaps.ClusterIndex` groups points into clusters at every zoom
+level, so that a map only needs to receive the clusters that are visible
+in the current viewport, rather than every point.
+
+At each zoom level, the world is divided into a grid of square cells
+``radius`` pixels wide, and the points in each cell form a cluster.
+Cells at one zoom level are exactly four cells at the next zoom level,
+so each level is built by merging the clusters of the level below.
+"""
+
+import collections
+
+from traitlets import observe
+
+from . import bounds, mercator
+from .geotraitlets import _validate_location_columns, ZoomLevel
+from .locations import locations_to_array, locations_docstring
+from .marker import CompactMarkers
+from .viewport import in_bounds, pad_bounds
+from ._docutils import doc_subst
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['ClusterIndex', 'ClusteredMarkers', 'clustered_marker_layer']
+
+
+Cluster = collections.namedtuple(
+    'Cluster', ['latitude', 'longitude', 'count'])
+
+
+WHOLE_WORLD = ((-90.0, -180.0), (90.0, 180.0))
+
+
+class _ClusterLevel(object):
+    """
+    Clusters at a single zoom level
+
+    Each cluster is identified by the key of its grid cell. We keep
+    the sum of the latitudes and longitudes of the points in each
+    cluster, rather than their mean, so that levels can be merged.
+    """
+    def __init__(self, keys, counts, sum_latitudes, sum_longitudes):
+        self.keys = keys
+        self.counts = counts
+        self.sum_latitudes = sum_latitudes
+        self.sum_longitudes = sum_longitudes
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+            np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_points(cls, keys, latitudes, longitudes):
+        return cls._aggregate(
+            keys, np.ones(len(keys), dtype=np.int64),
+            latitudes, longitudes)
+
+    @classmethod
+    def _aggregate(cls, keys, counts, sum_latitudes, sum_longitudes):
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        number_clusters = len(unique_keys)
+        return cls(
+            unique_keys,
+            np.bincount(
+                inverse, weights=counts, minlength=number_clusters
+            ).astype(np.int64),
+            np.bincount(
+                inverse, weights=sum_latitudes, minlength=number_clusters),
+            np.bincount(
+                inverse, weights=sum_longitudes, minlength=number_clusters)
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+    def merge(self, other):
+        """
+        Level with the clusters of both `self` and `other`
+        """
+        if not len(self):
+            return other
+        # Both sets of keys are sorted and unique, so we can find the
+        # clusters in `other` that already exist by binary search,
+        # rather than sorting every cluster again.
+        positions = np.searchsorted(self.keys, other.keys)
+        exists = positions < len(self.keys)
+        exists[exists] = self.keys[positions[exists]] == other.keys[exists]
+        existing_positions = positions[exists]
+        counts = self.counts.copy()
+        sum_latitudes = self.sum_latitudes.copy()
+        sum_longitudes = self.sum_longitudes.copy()
+        counts[existing_positions] += other.counts[exists]
+        sum_latitudes[existing_positions] += other.sum_latitudes[exists]
+        sum_longitudes[existing_positions] += other.sum_longitudes[exists]
+        is_new = ~exists
+        new_positions = positions[is_new]
+        return _ClusterLevel(
+            np.insert(self.keys, new_positions, other.keys[is_new]),
+            np.insert(counts, new_positions, other.counts[is_new]),
+            np.insert(
+                sum_latitudes, new_positions, other.sum_latitudes[is_new]),
+            np.insert(
+                sum_longitudes, new_positions, other.sum_longitudes[is_new])
+        )
+
+    def parent(self, cells_per_axis):
+        """
+        Level one zoom level out, with half as many cells per axis
+
+        :param cells_per_axis: number of cells per axis at this level
+        """
+        rows, columns = np.divmod(self.keys, cells_per_axis)
+        parent_keys = (rows // 2) * (cells_per_axis // 2) + columns // 2
+        return self._aggregate(
+            parent_keys, self.counts,
+            self.sum_latitudes, self.sum_longitudes)
+
+    def centroids(self):
+        return (
+            self.sum_latitudes / self.counts,
+            self.sum_longitudes / self.counts
+        )
+
+
+class ClusterIndex(object):
+    """
+    Hierarchical index of point clusters for every zoom level
+
+    Build an index from any of the location formats accepted by
+    :func:`gmaps.marker_layer`, then query the clusters visible in a
+    viewport at a given zoom level. Above ``max_zoom``, the index
+    returns individual points.
+
+    The index requires numpy.
+
+    :Examples:
+
+    >>> index = gmaps.ClusterIndex(locations)
+    >>> clusters = index.get_clusters(
+            ((46.0, 5.0), (47.0, 6.0)), zoom=8)
+    >>> clusters[0]
+    Cluster(latitude=46.3, longitude=5.4, count=1451)
+
+    New points are merged into the existing clusters, without
+    rebuilding the index:
+
+    >>> index.add(new_locations)
+
+    :param locations:
+        Initial points in the index, as an iterable of
+        (latitude, longitude) pairs.
+
+    :param radius:
+        Width of the grid cells, in pixels. Defaults to 60.
+    :type radius: int, optional
+
+    :param min_zoom:
+        Lowest zoom level in the index. Defaults to 0.
+    :type min_zoom: int, optional
+
+    :param max_zoom:
+        Highest zoom level at which points are clustered. Defaults to 16.
+    :type max_zoom: int, optional
+    """
+
+    def __init__(self, locations=None, radius=60, min_zoom=0, max_zoom=16):
+        if np is None:
+            raise ImportError('ClusterIndex requires numpy')
+        if radius < 1:
+            raise ValueError('radius must be at least 1 pixel')
+        if not 0 <= min_zoom <= max_zoom:
+            raise ValueError(
+                'Expected 0 <= min_zoom <= max_zoom, got min_zoom={} '
+                'and max_zoom={}'.format(min_zoom, max_zoom))
+        self.radius = radius
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self._levels = {
+            zoom: _ClusterLevel.empty()
+            for zoom in range(min_zoom, max_zoom + 1)
+        }
+        self._point_chunks = []
+        self._points = np.empty((0, 2))
+        if locations is not None:
+            self.add(locations)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def points(self):
+        """
+        Every point in the index, as an array of shape ``(n, 2)``
+        """
+        if self._point_chunks:
+            self._points = np.concatenate(
+                [self._points] + self._point_chunks)
+            self._point_chunks = []
+        return self._points
+
+    def _cells_per_axis(self, zoom):
+        # A power of two times a constant, so that each cell divides
+        # into exactly four cells at the next zoom level.
+        cells_at_zoom_zero = -(-mercator.TILE_SIZE // self.radius)
+        return cells_at_zoom_zero * 2 ** zoom
+
+    def _cell_keys(self, latitudes, longitudes, zoom):
+        x, y = mercator.world_coordinates(latitudes, longitudes)
+        cell_size = float(self.radius) / mercator.world_size(zoom)
+        cells_per_axis = self._cells_per_axis(zoom)
+        rows = np.clip(
+            (y / cell_size).astype(np.int64), 0, cells_per_axis - 1)
+        columns = np.clip(
+            (x / cell_size).astype(np.int64), 0, cells_per_axis - 1)
+        return rows * cells_per_axis + columns
+
+    def add(self, locations):
+        """
+        Add points to the index
+
+        This only updates the clusters the new points fall in, so is
+        much faster than rebuilding the index.
+
+        :param locations:
+            Iterable of (latitude, longitude) pairs.
+        """
+        locations = locations_to_array(locations)
+        if not len(locations):
+            return
+        latitudes = locations[:, 0]
+        longitudes = locations[:, 1]
+        _validate_location_columns(latitudes, longitudes)
+        level = _ClusterLevel.from_points(
+            self._cell_keys(latitudes, longitudes, self.max_zoom),
+            latitudes, longitudes)
+        for zoom in range(self.max_zoom, self.min_zoom - 1, -1):
+            self._levels[zoom] = self._levels[zoom].merge(level)
+            if zoom > self.min_zoom:
+                level = level.parent(self._cells_per_axis(zoom))
+        self._point_chunks.append(locations)
+
+    def get_cluster_arrays(self, bounds, zoom):
+        """
+        Clusters visible in a viewport, as numpy arrays
+
+        This is like :meth:`get_clusters`, but returns a tuple of
+        arrays ``(latitudes, longitudes, counts)``, which is faster
+        for large numbers of clusters.
+        """
+        zoom = max(int(zoom), self.min_zoom)
+        if zoom > self.max_zoom:
+            points = self.points
+            latitudes = points[:, 0]
+            longitudes = points[:, 1]
+            counts = np.ones(len(points), dtype=np.int64)
+        else:
+            level = self._levels[zoom]
+            latitudes, longitudes = level.centroids()
+            counts = level.counts
+        visible = in_bounds(latitudes, longitudes, bounds)
+        return latitudes[visible], longitudes[visible], counts[visible]
+
+    def get_clusters(self, bounds=WHOLE_WORLD, zoom=0):
+        """
+        Clusters visible in a viewport
+
+        :param bounds:
+            ((min_latitude, min_longitude), (max_latitude, max_longitude))
+            tuple describing the viewport. If ``min_longitude`` is
+            greater than ``max_longitude``, the viewport crosses the
+            antimeridian. Defaults to the whole world.
+
+        :param zoom:
+            Zoom level of the viewport. Defaults to 0.
+        :type zoom: int, optional
+
+        :returns:
+            List of :class:`Cluster` named tuples with the latitude and
+            longitude of the centroid of each cluster, and the number
+            of points it contains.
+        """
+        latitudes, longitudes, counts = self.get_cluster_arrays(bounds, zoom)
+        return [
+            Cluster(*cluster) for cluster in zip(
+                latitudes.tolist(), longitudes.tolist(), counts.tolist())
+        ]
+
+
+class ClusteredMarkers(CompactMarkers):
+    """
+    Marker layer that only contains the clusters in a viewport
+
+    The points are held in a :class:`gmaps.ClusterIndex` in the
+    kernel, and only the clusters visible in the current viewport are
+    sent to the browser. Each cluster is drawn as a marker labelled
+    with the number of points it contains. When the layer is added to
+    a figure, the clusters are updated as the user pans and zooms.
+
+    Prefer instantiating this with :func:`gmaps.clustered_marker_layer`.
+
+    :param index: Index of the points in the layer.
+    :type index: :class:`gmaps.ClusterIndex`
+    """
+    zoom = ZoomLevel(0)
+
+    def __init__(self, index, **kwargs):
+        self.index = index
+        self._viewport_bounds = WHOLE_WORLD
+        self._bounds_accumulator = bounds.BoundsAccumulator()
+        if len(index):
+            self._bounds_accumulator.add(index.points)
+        super(ClusteredMarkers, self).__init__(**kwargs)
+        self.show_viewport(WHOLE_WORLD, index.min_zoom)
+
+    @observe('locations')
+    def _calc_bounds(self, change):
+        # The bounds cover every point in the index, not just the
+        # clusters in the viewport.
+        if self._bounds_accumulator.count:
+            self.data_bounds = self._bounds_accumulator.bounds()
+            self.has_bounds = True
+        else:
+            self.has_bounds = False
+
+    def show_viewport(self, bounds, zoom):
+        """
+        Show the clusters visible in a viewport
+
+        :param bounds:
+            ((min_latitude, min_longitude), (max_latitude, max_longitude))
+            tuple describing the viewport.
+
+        :param zoom: Zoom level of the viewport.
+        :type zoom: int
+        """
+        self._viewport_bounds = bounds
+        latitudes, longitudes, counts = self.index.get_cluster_arrays(
+            bounds, zoom)
+        counts = counts.tolist()
+        self.zoom = int(zoom)
+        with self.hold_sync():
+            self.label = [
+                str(count) if count > 1 else '' for count in counts]
+            self.hover_text = [
+                '{} points'.format(count) if count > 1 else ''
+                for count in counts
+            ]
+            self.locations = np.column_stack([latitudes, longitudes])
+
+    def update_viewport(self, bounds, zoom):
+        """
+        Called by the map when the viewport changes
+        """
+        self.show_viewport(pad_bounds(bounds), zoom)
+
+    def add(self, locations):
+        """
+        Add points to the layer
+
+        This updates the index incrementally and refreshes the clusters
+        in the current viewport.
+        """
+        locations = locations_to_array(locations)
+        self.index.add(locations)
+        self._bounds_accumulator.add(locations)
+        self.show_viewport(self._viewport_bounds, self.zoom)
+
+
+@doc_subst({'locations': locations_docstring})
+def clustered_marker_layer(
+        locations, radius=60, max_zoom=16, data_encoding='json'):
+    """
+    Marker layer that clusters points in the kernel
+
+    Use this for datasets that are too large to send to the browser.
+    The points are grouped into clusters in Python, and only the
+    clusters in the current viewport are sent to the browser.
+
+    :Examples:
+
+    >>> fig = gmaps.figure()
+    >>> layer = gmaps.clustered_marker_layer(locations)
+    >>> fig.add_layer(layer)
+
+    To show the clusters for a specific viewport:
+
+    >>> layer.show_viewport(((46.0, 5.0), (47.0, 6.0)), zoom=8)
+
+    {locations}
+
+    :param radius:
+        Width, in pixels, of the grid cells used to group points into
+        clusters. Defaults to 60.
+    :type radius: int, optional
+
+    :param max_zoom:
+        Zoom level above which individual points are shown, rather
+        than clusters. Defaults to 16.
+    :type max_zoom: int, optional
+
+    :param data_encoding:
+        How to send the cluster locations to the browser. One of 'json',
+        'float64' or 'float32'. Defaults to 'json'.
+    :type data_encoding: str, optional
+
+    :returns:
+        A :class:`gmaps.ClusteredMarkers` instance.
+    """
+    index = ClusterIndex(locations, radius=radius, max_zoom=max_zoom)
+    return ClusteredMarkers(index, data_encoding=data_encoding)
@@ -0,0 +1,217 @@
+"""
+Colors computed from numeric values
+
+Coloring markers or GeoJSON features by a value, like the population of
+each country, would otherwise mean building a list with a color string
+for every feature. :func:`gmaps.colormap` instead bins the values in a
+single vectorized pass and returns a :class:`gmaps.MappedColors`: a short
+palette of colors and, for each value, the index of its color in the
+palette. Compact marker layers send the palette and a packed array of
+8-bit indices to the browser rather than a color string per marker.
+"""
+
+from .geotraitlets import normalize_colors
+from .serialization import pack_array
+from .tiles import gradient_colormap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['colormap', 'MappedColors']
+
+ALLOWED_SCALES = ['linear', 'log', 'quantile']
+
+# Sequential palette from light yellow to dark blue
+DEFAULT_COLORS = ['#ffffcc', '#a1dab4', '#41b6c4', '#2c7fb8', '#253494']
+
+DEFAULT_NUMBER_COLORS = 8
+
+# Indices are sent as 8-bit integers, with one palette entry kept for
+# missing values
+MAX_NUMBER_COLORS = 255
+
+
+class MappedColors(object):
+    """
+    Colors stored as a palette and the index of each color in the palette
+
+    Prefer creating these with :func:`gmaps.colormap`.
+
+    :param palette:
+        List of colors. Colors are validated and normalized as
+        with :class:`gmaps.geotraitlets.ColorAlpha`. Entries can be None,
+        in which case the layer's default color is used.
+
+    :param indices:
+        Iterable of indices into `palette`, one for each marker or
+        feature.
+
+    :param bin_edges:
+        Optional edges of the bins of values mapped to each color.
+
+    :Examples:
+
+    >>> colors = gmaps.MappedColors(['red', 'blue'], [0, 1, 1, 0])
+    >>> colors.to_list()
+    ['red', 'blue', 'blue', 'red']
+    """
+    def __init__(self, palette, indices, bin_edges=None):
+        if np is None:
+            raise ImportError('Mapping colors requires numpy')
+        self.palette = normalize_colors(palette)
+        if not 1 <= len(self.palette) <= MAX_NUMBER_COLORS + 1:
+            raise ValueError(
+                'palette must have between 1 and {} colors'.format(
+                    MAX_NUMBER_COLORS + 1))
+        indices = np.asarray(indices)
+        if indices.ndim != 1:
+            raise ValueError('indices must be one-dimensional')
+        if len(indices) and (
+                indices.min() < 0 or indices.max() >= len(self.palette)):
+            raise ValueError(
+                'indices must be between 0 and {}, the number of colors '
+                'in the palette minus one'.format(len(self.palette) - 1))
+        self.indices = indices.astype(np.uint8)
+        self.bin_edges = bin_edges
+
+    def __len__(self):
+        return len(self.indices)
+
+    def to_list(self):
+        """
+        List with the color of each value
+        """
+        return [self.palette[index] for index in self.indices.tolist()]
+
+    def to_json(self):
+        """
+        Palette and packed indices, as sent to the browser
+        """
+        return {
+            'palette': self.palette,
+            'indices': pack_array(self.indices, 'uint8')
+        }
+
+
+def colormap(
+        values, colors=DEFAULT_COLORS, scale='linear',
+        number_colors=DEFAULT_NUMBER_COLORS, vmin=None, vmax=None,
+        missing_color=None):
+    """
+    Map numeric values to colors
+
+    The values are divided into `number_colors` bins and the values in
+    each bin get the same color, taken from a gradient between `colors`.
+    Pass the result as the ``fill_color`` or ``stroke_color`` of
+    :func:`gmaps.symbol_layer` or as the ``fill_color`` or
+    ``stroke_color`` of :func:`gmaps.geojson_layer`.
+
+    :Examples:
+
+    >>> populations = [1.2e6, 3.4e7, 5.6e5]
+    >>> colors = gmaps.colormap(
+            populations, colors=['white', 'red'], scale='log')
+    >>> layer = gmaps.symbol_layer(
+            locations, fill_color=colors, compact=True)
+
+    :param values:
+        Iterable of numbers, one for each marker or feature. NaN values
+        are colored with `missing_color`.
+
+    :param colors:
+        List of colors of the gradient, from the color of the lowest
+        values to the color of the highest values.
+    :type colors: list of colors, optional
+
+    :param scale:
+        How to divide values into bins. 'linear' divides the range
+        between `vmin` and `vmax` into bins of equal width, 'log' does
+        the same on the logarithm of the values, which must then be
+        strictly positive, and 'quantile' uses bins that hold the same
+        number of values.
+    :type scale: str, optional
+
+    :param number_colors:
+        Number of bins, and therefore of distinct colors, between 1
+        and 255.
+    :type number_colors: int, optional
+
+    :param vmin, vmax:
+        Values mapped to the first and the last color, for the linear
+        and log scales. Values outside this range get the first or the
+        last color. These default to the smallest and largest values.
+    :type vmin, vmax: float, optional
+
+    :param missing_color:
+        Color of NaN values. If this is None, features with NaN values
+        use the layer's default color.
+
+    :returns:
+        A :class:`gmaps.MappedColors` instance. Its ``bin_edges``
+        attribute holds the `number_colors + 1` edges of the bins, for
+        instance to draw a legend.
+    """
+    if np is None:
+        raise ImportError('Mapping colors requires numpy')
+    if scale not in ALLOWED_SCALES:
+        raise ValueError(
+            '{} is not a valid scale. Expected one of {}'.format(
+                scale, ALLOWED_SCALES))
+    if not 1 <= number_colors <= MAX_NUMBER_COLORS:
+        raise ValueError(
+            'number_colors must be between 1 and {}'.format(
+                MAX_NUMBER_COLORS))
+    values = np.asarray(values, dtype=float)
+    is_missing = np.isnan(values)
+    present_values = values[~is_missing]
+    if scale == 'log':
+        if (present_values <= 0.0).any() or (
+                vmin is not None and vmin <= 0.0):
+            raise ValueError('Values must be strictly positive for log scale')
+        values = np.log10(values)
+        present_values = values[~is_missing]
+        vmin = None if vmin is None else np.log10(vmin)
+        vmax = None if vmax is None else np.log10(vmax)
+    if scale == 'quantile':
+        bin_edges = _quantile_edges(present_values, number_colors)
+    else:
+        bin_edges = _linear_edges(present_values, number_colors, vmin, vmax)
+    # Inner edges split the values into bins, values beyond the outer
+    # edges go in the first or the last bin
+    indices = np.searchsorted(bin_edges[1:-1], values, side='right')
+    if scale == 'log':
+        bin_edges = 10.0 ** bin_edges
+    palette = _gradient_palette(colors, number_colors)
+    if is_missing.any():
+        indices[is_missing] = len(palette)
+        palette.append(missing_color)
+    return MappedColors(palette, indices, bin_edges)
+
+
+def _linear_edges(values, number_bins, vmin, vmax):
+    if vmin is None:
+        vmin = values.min() if len(values) else 0.0
+    if vmax is None:
+        vmax = values.max() if len(values) else 1.0
+    if vmin > vmax:
+        raise ValueError('vmin must be smaller than vmax')
+    return np.linspace(vmin, vmax, number_bins + 1)
+
+
+def _quantile_edges(values, number_bins):
+    if not len(values):
+        return np.linspace(0.0, 1.0, number_bins + 1)
+    return np.percentile(values, np.linspace(0.0, 100.0, number_bins + 1))
+
+
+def _gradient_palette(colors, number_colors):
+    rgba = gradient_colormap(normalize_colors(colors), size=number_colors)
+    return [_rgba_to_color(*color) for color in rgba.tolist()]
+
+
+def _rgba_to_color(red, green, blue, alpha):
+    if alpha == 255:
+        return 'rgb({},{},{})'.format(red, green, blue)
+    return 'rgba({},{},{},{:.3f})'.format(red, green, blue, alpha / 255.0)
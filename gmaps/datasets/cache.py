@@ -0,0 +1,314 @@
+"""
+Local cache of downloaded dataset files
+
+Files are stored under the SHA-256 digest of their content, and an index
+maps the URL that each file was downloaded from to its digest. The index
+also records the size and modification time of each file when its
+content was last checked against its digest. Reading a file whose size
+or modification time has changed since checks its content again, so
+that a truncated or corrupted file is downloaded again rather than
+parsed. Files derived from a cached file are named after its digest, so
+that they are evicted with it.
+
+Files are marked as used by updating their access time, and the least
+recently used files are evicted first. The cache can be read, but not
+updated, from a read-only directory.
+
+The cache directory defaults to ``~/.cache/gmaps/datasets``, or to the
+directory in the ``GMAPS_DATASETS_CACHE`` environment variable.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+__all__ = ['DatasetCache', 'DatasetNotCachedError']
+
+# Datasets are at most a few megabytes, so this holds every dataset
+# many times over
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_INDEX_FILE_NAME = 'index.json'
+
+_CHUNK_BYTES = 1024 * 1024
+
+# Names of cached files: a digest, optionally followed by the suffix of
+# a derived file
+_FILE_NAME_RE = re.compile(r'([0-9a-f]{64})(\..*)?$')
+
+
+class DatasetNotCachedError(IOError):
+    """
+    Raised when a dataset is needed in offline mode but is not cached
+    """
+    pass
+
+
+def default_cache_directory():
+    """
+    Cache directory from the environment, or ``~/.cache/gmaps/datasets``
+    """
+    directory = os.environ.get('GMAPS_DATASETS_CACHE')
+    if directory:
+        return directory
+    cache_home = os.environ.get(
+        'XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'gmaps', 'datasets')
+
+
+class DatasetCache(object):
+    """
+    Content-addressed cache of downloaded files, bounded by their size
+
+    :param directory:
+        Directory holding the cached files, created when the first file
+        is cached.
+    :type directory: str
+
+    :param max_bytes:
+        Maximum total size of the files in the cache. The least recently
+        used files are deleted first.
+    :type max_bytes: int, optional
+
+    :Examples:
+
+    >>> cache = DatasetCache('/tmp/gmaps-cache')
+    >>> path = cache.get(url)
+    >>> if path is None:
+            path = cache.put(url, urlopen(url))
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def get(self, url):
+        """
+        Path of the cached file for `url`, or None if it is not cached
+
+        Files whose content does not match their digest are deleted.
+        """
+        index = self._read_index()
+        digest = index['urls'].get(url)
+        if digest is None:
+            return None
+        path = self.path(digest)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._remove_digest(digest)
+            return None
+        if index['files'].get(digest) != _file_signature(stat):
+            # The file changed since its content was last checked
+            if _file_digest(path) != digest:
+                self._remove_digest(digest)
+                return None
+            index['files'][digest] = _file_signature(stat)
+            try:
+                self._write_index(index)
+            except (IOError, OSError):
+                # Read-only cache: the file is checked again next time
+                pass
+        _mark_used(path, stat)
+        return path
+
+    def put(self, url, source):
+        """
+        Copy the content of a file-like object to the cache
+
+        :param source: file-like object open for reading bytes
+        :returns: path of the cached file
+        """
+        _ensure_directory(self.directory)
+        hasher = hashlib.sha256()
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, prefix='.download-')
+        try:
+            with os.fdopen(descriptor, 'wb') as destination:
+                for chunk in iter(lambda: source.read(_CHUNK_BYTES), b''):
+                    hasher.update(chunk)
+                    destination.write(chunk)
+            digest = hasher.hexdigest()
+            path = self.path(digest)
+            index = self._read_index()
+            if _is_verified(path, index['files'].get(digest)):
+                os.remove(temporary_path)
+            else:
+                # Replace any unchecked file with this name, since it
+                # may be corrupted
+                if os.path.exists(path) and os.name == 'nt':
+                    os.remove(path)
+                os.rename(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+        stat = os.stat(path)
+        index['urls'][url] = digest
+        index['files'][digest] = _file_signature(stat)
+        self._write_index(index)
+        _mark_used(path, stat)
+        self.evict(keep=digest)
+        return path
+
+    def path(self, digest, suffix=''):
+        """
+        Path of the cached file with `digest`, or of a file derived
+        from it if `suffix` is given
+        """
+        return os.path.join(self.directory, digest + suffix)
+
+    @property
+    def size_bytes(self):
+        """
+        Total size of the files in the cache
+        """
+        return sum(size for (_, size) in self._entries().values())
+
+    def clear(self):
+        """
+        Delete every file in the cache
+
+        Other files in the cache directory are left alone.
+        """
+        for digest in self._entries():
+            self._remove_digest(digest)
+        if os.path.exists(self._index_path()):
+            os.remove(self._index_path())
+
+    def _entries(self):
+        # Maps each digest to the time its files were last used and
+        # their total size
+        entries = {}
+        if not os.path.isdir(self.directory):
+            return entries
+        for file_name in os.listdir(self.directory):
+            digest = _file_name_digest(file_name)
+            if digest is None:
+                continue
+            stat = os.stat(os.path.join(self.directory, file_name))
+            last_used, size = entries.get(digest, (0.0, 0))
+            entries[digest] = (
+                max(last_used, stat.st_atime, stat.st_mtime),
+                size + stat.st_size)
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Delete the least recently used files until the cache fits in
+        `max_bytes`
+
+        :param keep:
+            Digest of a file to keep, with the files derived from it,
+            even if it is the least recently used.
+        :type keep: str, optional
+        """
+        entries = self._entries()
+        size_bytes = sum(size for (_, size) in entries.values())
+        by_last_use = sorted(
+            entries.items(), key=lambda entry: entry[1][0])
+        for digest, (_, size) in by_last_use:
+            if size_bytes <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            self._remove_digest(digest)
+            size_bytes -= size
+
+    def _remove_digest(self, digest):
+        if os.path.isdir(self.directory):
+            for file_name in os.listdir(self.directory):
+                if _file_name_digest(file_name) == digest:
+                    os.remove(os.path.join(self.directory, file_name))
+        index = self._read_index()
+        updated_index = {
+            'urls': {
+                url: url_digest for (url, url_digest)
+                in index['urls'].items() if url_digest != digest
+            },
+            'files': {
+                file_digest: signature for (file_digest, signature)
+                in index['files'].items() if file_digest != digest
+            }
+        }
+        if updated_index != index:
+            self._write_index(updated_index)
+
+    def _read_index(self):
+        # The index maps each URL to the digest of its file, and each
+        # digest to the signature of the file when its content was last
+        # checked
+        try:
+            with open(self._index_path()) as f:
+                index = json.load(f)
+        except (IOError, OSError, ValueError):
+            index = {}
+        return {
+            'urls': index.get('urls', {}),
+            'files': {
+                digest: tuple(signature)
+                for (digest, signature) in index.get('files', {}).items()
+            }
+        }
+
+    def _write_index(self, index):
+        # Write to a temporary file first, so that other processes
+        # never read a partially written index
+        _ensure_directory(self.directory)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, prefix='.index-')
+        with os.fdopen(descriptor, 'w') as f:
+            json.dump(index, f)
+        if os.path.exists(self._index_path()) and os.name == 'nt':
+            os.remove(self._index_path())
+        os.rename(temporary_path, self._index_path())
+
+    def _index_path(self):
+        return os.path.join(self.directory, _INDEX_FILE_NAME)
+
+
+def _ensure_directory(directory):
+    try:
+        os.makedirs(directory)
+    except OSError:
+        # The directory already exists, possibly created concurrently
+        if not os.path.isdir(directory):
+            raise
+
+
+def _file_name_digest(file_name):
+    match = _FILE_NAME_RE.match(file_name)
+    return None if match is None else match.group(1)
+
+
+def _file_signature(stat):
+    # Files are assumed unchanged as long as their size and
+    # modification time are
+    return (stat.st_size, stat.st_mtime)
+
+
+def _is_verified(path, signature):
+    try:
+        return signature == _file_signature(os.stat(path))
+    except OSError:
+        return False
+
+
+def _mark_used(path, stat):
+    # Only update the access time, so that the modification time still
+    # tells whether the file changed
+    try:
+        os.utime(path, (time.time(), stat.st_mtime))
+    except (IOError, OSError):
+        # Read-only cache
+        pass
+
+
+def _file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_BYTES), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
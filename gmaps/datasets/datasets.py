@@ -11,13 +11,33 @@ Commands
     dataset_metadata(dataset_name) : get metadata on specified
         dataset.
     load_dataset(dataset_name) : load dataset. Returns a numpy array.
+    load_dataset_as_array(dataset_name) : load dataset as a numpy array
+        for each column.
+    iter_dataset(dataset_name, chunksize) : iterate over a dataset in
+        chunks of rows.
+    configure_cache(directory, max_bytes, offline) : configure the
+        local cache of downloaded datasets.
 """
 
+import collections
 import csv
 import codecs
+import io
+import itertools
+import os
+import tempfile
 
 from six.moves.urllib.request import urlopen
 
+from .cache import (
+    DatasetCache, DatasetNotCachedError, DEFAULT_MAX_BYTES,
+    default_cache_directory)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 METADATA = {
     "taxi_rides": {
         "url": "https://s3-eu-west-1.amazonaws.com/jupyter-gmaps-examples/taxi_data.csv",  # noqa
@@ -77,6 +97,100 @@ METADATA = {
 }
 
 
+_default_cache_configuration = {
+    'directory': default_cache_directory(),
+    'max_bytes': DEFAULT_MAX_BYTES,
+    'offline': os.environ.get(
+        'GMAPS_DATASETS_OFFLINE', '').lower() in ('1', 'true', 'yes')
+}
+
+
+def configure_cache(directory=None, max_bytes=None, offline=None):
+    """
+    Configure the local cache of downloaded datasets
+
+    Datasets are downloaded once and then loaded from the cache. Options
+    left as None keep their current value.
+
+    :param directory:
+        Directory holding the cached datasets. This defaults to the
+        ``GMAPS_DATASETS_CACHE`` environment variable if it is set,
+        and to ``~/.cache/gmaps/datasets`` otherwise.
+    :type directory: str, optional
+
+    :param max_bytes:
+        Maximum total size of the cached files. The least recently used
+        datasets are deleted first. Defaults to 256MB.
+    :type max_bytes: int, optional
+
+    :param offline:
+        Whether to only load datasets from the cache, raising
+        :class:`DatasetNotCachedError` for datasets that are not cached
+        rather than downloading them. This defaults to True if the
+        ``GMAPS_DATASETS_OFFLINE`` environment variable is set to 1.
+    :type offline: bool, optional
+
+    :Examples:
+
+    >>> gmaps.datasets.configure_cache(directory='/data/gmaps')
+    >>> gmaps.datasets.load_dataset('taxi_rides')  # downloads the data
+    >>> gmaps.datasets.configure_cache(offline=True)
+    >>> gmaps.datasets.load_dataset('taxi_rides')  # no network needed
+    """
+    global _default_cache_configuration
+    configuration = _default_cache_configuration.copy()
+    for name, value in [
+            ('directory', directory), ('max_bytes', max_bytes),
+            ('offline', offline)]:
+        if value is not None:
+            configuration[name] = value
+    _default_cache_configuration = configuration
+
+
+# Number of rows in each chunk of iter_dataset
+DEFAULT_CHUNKSIZE = 100000
+
+
+def _cache():
+    return DatasetCache(
+        _default_cache_configuration['directory'],
+        _default_cache_configuration['max_bytes']
+    )
+
+
+def _cached_dataset_path(dataset_name, use_cache):
+    """
+    Path of the cached CSV of a dataset, downloading it if needed
+
+    Returns None if the dataset should be downloaded without caching it.
+    """
+    url = METADATA[dataset_name]["url"]
+    offline = _default_cache_configuration['offline']
+    if not use_cache and not offline:
+        return None
+    cache = _cache()
+    path = cache.get(url)
+    if path is None:
+        if offline:
+            raise DatasetNotCachedError(
+                'Dataset {} is not in the cache at {} and datasets cannot '
+                'be downloaded in offline mode'.format(
+                    dataset_name, cache.directory))
+        source = urlopen(url)
+        try:
+            path = cache.put(url, source)
+        finally:
+            source.close()
+    return path
+
+
+def _download_rows(dataset_name):
+    f = urlopen(METADATA[dataset_name]["url"])
+    data = _read_rows(f, METADATA[dataset_name]["types"])
+    f.close()
+    return data
+
+
 def _read_rows(f, column_types):
     f.readline()  # skip header line
     reader = csv.reader(codecs.iterdecode(f, "utf-8"))
@@ -89,6 +203,137 @@ def _read_rows(f, column_types):
     return rows
 
 
+# Strings are stored as fixed-width unicode, rather than as Python
+# objects, so that every column can be memory-mapped
+_column_dtypes = {float: np.float64, int: np.int64} if np is not None else {}
+
+
+def _split_columns(lines, number_columns):
+    """
+    Cells of each column of a list of lines of a CSV file
+    """
+    text = b''.join(lines).decode("utf-8")
+    if '"' in text:
+        # Quoted cells can hold commas
+        rows = [row for row in csv.reader(io.StringIO(text)) if row]
+        _check_row_lengths((len(row) for row in rows), number_columns)
+        return list(zip(*rows))
+    rows = [line for line in text.splitlines() if line]
+    _check_row_lengths(
+        (row.count(',') + 1 for row in rows), number_columns)
+    cells = ','.join(rows).split(',')
+    return [cells[index::number_columns] for index in range(number_columns)]
+
+
+def _check_row_lengths(row_lengths, number_columns):
+    for row_length in row_lengths:
+        if row_length != number_columns:
+            raise ValueError(
+                'Every row of the dataset must have {} cells'.format(
+                    number_columns))
+
+
+def _iter_column_chunks(f, column_types, chunksize):
+    """
+    Parse a CSV file in chunks of `chunksize` lines, yielding a list of
+    numpy arrays with the columns of each chunk
+
+    Each column of a chunk is converted by numpy in a single call,
+    rather than converting every cell to a Python object. Cells cannot
+    hold line breaks.
+    """
+    f.readline()  # skip header line
+    dtypes = [
+        _column_dtypes.get(column_type, column_type)
+        for column_type in column_types
+    ]
+    while True:
+        lines = list(itertools.islice(f, chunksize))
+        if not lines:
+            return
+        columns = _split_columns(lines, len(column_types))
+        if columns and len(columns[0]):
+            yield [
+                np.array(cells, dtype=dtype)
+                for dtype, cells in zip(dtypes, columns)
+            ]
+
+
+def _parse_columns(f, column_types):
+    chunks = list(_iter_column_chunks(f, column_types, DEFAULT_CHUNKSIZE))
+    if not chunks:
+        return [
+            np.array([], dtype=_column_dtypes.get(column_type, column_type))
+            for column_type in column_types
+        ]
+    return [np.concatenate(columns) for columns in zip(*chunks)]
+
+
+def _column_path(path, index):
+    return '{}.{}.npy'.format(path, index)
+
+
+def _save_column(column, column_path):
+    # Write to a temporary file first, so that other processes never
+    # load a partially written column
+    descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(column_path), prefix='.column-')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            np.save(f, column)
+        if os.path.exists(column_path) and os.name == 'nt':
+            os.remove(column_path)
+        os.rename(temporary_path, column_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def _read_cached_columns(path, number_columns):
+    """
+    Memory-mapped columns of the dataset cached at `path`, or None if
+    they have not been saved
+    """
+    try:
+        return [
+            np.load(_column_path(path, index), mmap_mode='r')
+            for index in range(number_columns)
+        ]
+    except (IOError, OSError, ValueError):
+        # Columns missing, or truncated by an interrupted write
+        return None
+
+
+def _load_cached_columns(dataset_name, path):
+    """
+    Columns of a dataset cached at `path`, as numpy arrays
+
+    The first load of a cached dataset parses the CSV and saves each
+    column next to it in the cache, in numpy's ``.npy`` format. Later
+    loads memory-map these files rather than parsing the CSV again. If
+    the columns cannot be saved, for instance because the cache is
+    read-only, the parsed columns are returned instead.
+    """
+    column_types = METADATA[dataset_name]["types"]
+    columns = _read_cached_columns(path, len(column_types))
+    if columns is not None:
+        return columns
+    with open(path, 'rb') as f:
+        columns = _parse_columns(f, column_types)
+    column_paths = [
+        _column_path(path, index) for index in range(len(column_types))]
+    try:
+        for column, column_path in zip(columns, column_paths):
+            _save_column(column, column_path)
+    except (IOError, OSError):
+        return columns
+    # The columns count towards the size of the cache
+    _cache().evict(keep=os.path.basename(path))
+    return [
+        np.load(column_path, mmap_mode='r') for column_path in column_paths]
+
+
 def list_datasets():
     """
     List of datasets available
@@ -115,23 +360,136 @@ def dataset_metadata(dataset_name):
     return metadata
 
 
-def load_dataset(dataset_name):
+def load_dataset(dataset_name, use_cache=True):
     """
     Fetch a dataset, returning an array of tuples.
+
+    The dataset is downloaded the first time it is loaded and read from
+    the local cache afterwards. See :func:`configure_cache`.
+
+    :param use_cache:
+        Whether to read the dataset from the cache, and store it in the
+        cache after downloading it. Pass False to always download the
+        dataset, unless the cache is in offline mode.
+    :type use_cache: bool, optional
     """
-    url = METADATA[dataset_name]["url"]
+    path = _cached_dataset_path(dataset_name, use_cache)
+    if path is None:
+        return _download_rows(dataset_name)
+    if np is not None:
+        columns = _load_cached_columns(dataset_name, path)
+        return list(zip(*[column.tolist() for column in columns]))
+    with open(path, 'rb') as f:
+        return _read_rows(f, METADATA[dataset_name]["types"])
+
+
+def load_dataset_as_array(dataset_name, use_cache=True):
+    """
+    Fetch a dataset, returning a numpy array for each column.
+
+    Cached datasets are parsed once and stored in the cache as one
+    ``.npy`` file per column. The arrays returned are read-only
+    memory-maps of these files, so loading a dataset again takes
+    almost no time or memory. This requires numpy.
+
+    :param use_cache:
+        Whether to read the dataset from the cache. If this is False,
+        the dataset is downloaded and parsed into in-memory arrays.
+    :type use_cache: bool, optional
+
+    :returns:
+        An ordered dictionary mapping each header of the dataset to
+        a numpy array with the values in that column.
+
+    :Examples:
+
+    >>> earthquakes = gmaps.datasets.load_dataset_as_array('earthquakes')
+    >>> locations = np.column_stack(
+            [earthquakes['latitude'], earthquakes['longitude']])
+    >>> layer = gmaps.heatmap_layer(
+            locations, weights=earthquakes['magnitude'])
+    """
+    if np is None:
+        raise ImportError('Loading datasets as arrays requires numpy')
+    path = _cached_dataset_path(dataset_name, use_cache)
+    if path is None:
+        f = urlopen(METADATA[dataset_name]["url"])
+        columns = _parse_columns(f, METADATA[dataset_name]["types"])
+        f.close()
+    else:
+        columns = _load_cached_columns(dataset_name, path)
+    headers = METADATA[dataset_name]["headers"]
+    return collections.OrderedDict(zip(headers, columns))
+
+
+def iter_dataset(dataset_name, chunksize=DEFAULT_CHUNKSIZE, use_cache=True):
+    """
+    Iterate over a dataset in chunks of rows.
+
+    Each chunk is parsed as it is needed, so that large datasets can be
+    processed with a bounded amount of memory. If the columns of the
+    dataset are already in the cache (see :func:`load_dataset_as_array`),
+    the chunks are slices of the memory-mapped columns. This requires
+    numpy.
+
+    :param chunksize:
+        Maximum number of rows in each chunk.
+    :type chunksize: int, optional
+
+    :param use_cache:
+        Whether to read the dataset from the cache. If this is False,
+        chunks are parsed as the dataset is downloaded.
+    :type use_cache: bool, optional
+
+    :returns:
+        An iterator of ordered dictionaries mapping each header of the
+        dataset to a numpy array with the values of that column in the
+        chunk.
+
+    :Examples:
+
+    >>> accumulator = gmaps.bounds.BoundsAccumulator()
+    >>> for chunk in gmaps.datasets.iter_dataset('taxi_rides', 1000):
+            accumulator.add(
+                np.column_stack([chunk['latitude'], chunk['longitude']]))
+    """
+    # Check the arguments, and download the dataset if needed, before
+    # the first chunk is requested
+    if np is None:
+        raise ImportError('Loading datasets as arrays requires numpy')
+    if chunksize < 1:
+        raise ValueError('chunksize must be strictly positive')
+    path = _cached_dataset_path(dataset_name, use_cache)
+    return _iter_dataset_chunks(dataset_name, chunksize, path)
+
+
+def _iter_dataset_chunks(dataset_name, chunksize, path):
+    headers = METADATA[dataset_name]["headers"]
     column_types = METADATA[dataset_name]["types"]
-    f = urlopen(url)
-    data = _read_rows(f, column_types)
-    f.close()
-    return data
+    if path is not None:
+        columns = _read_cached_columns(path, len(column_types))
+        if columns is not None:
+            for start in range(0, len(columns[0]), chunksize):
+                yield collections.OrderedDict(
+                    (header, column[start:start + chunksize])
+                    for header, column in zip(headers, columns)
+                )
+            return
+        f = open(path, 'rb')
+    else:
+        f = urlopen(METADATA[dataset_name]["url"])
+    try:
+        for columns in _iter_column_chunks(f, column_types, chunksize):
+            yield collections.OrderedDict(zip(headers, columns))
+    finally:
+        f.close()
 
 
-def load_dataset_as_df(dataset_name):
+def load_dataset_as_df(dataset_name, use_cache=True):
     """
     Fetch a dataset, returning a pandas dataframe.
     """
     import pandas as pd
-    data = load_dataset(dataset_name)
-    headers = dataset_metadata(dataset_name)["headers"]
-    return pd.DataFrame(data, columns=headers)
+    columns = load_dataset_as_array(dataset_name, use_cache=use_cache)
+    # Copy, since the columns may be read-only memory-maps
+    return pd.DataFrame(columns, copy=True)
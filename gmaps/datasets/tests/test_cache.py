@@ -0,0 +1,94 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import cache as cache_module
+from ..cache import DatasetCache
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DatasetCache(os.path.join(self.directory, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_get(self):
+        assert self.cache.get('http://a') is None
+        path = self.cache.put('http://a', io.BytesIO(b'a,b\n1,2\n'))
+        assert self.cache.get('http://a') == path
+        with open(path, 'rb') as f:
+            assert f.read() == b'a,b\n1,2\n'
+        assert self.cache.size_bytes == 8
+
+    def test_content_addressed(self):
+        path = self.cache.put('http://a', io.BytesIO(b'data'))
+        assert self.cache.put('http://b', io.BytesIO(b'data')) == path
+        assert self.cache.get('http://b') == path
+        assert self.cache.size_bytes == 4
+
+    def test_corrupted_file(self):
+        path = self.cache.put('http://a', io.BytesIO(b'data'))
+        with open(path, 'wb') as f:
+            f.write(b'dat')
+        assert self.cache.get('http://a') is None
+        assert not os.path.exists(path)
+
+    def test_unchanged_file_not_checked_again(self):
+        path = self.cache.put('http://a', io.BytesIO(b'data'))
+        file_digest = cache_module._file_digest
+        cache_module._file_digest = None
+        try:
+            assert self.cache.get('http://a') == path
+        finally:
+            cache_module._file_digest = file_digest
+
+    def test_read_only(self):
+        path = self.cache.put('http://a', io.BytesIO(b'data'))
+        os.utime(path, (0, 0))
+
+        def fail(*args):
+            raise OSError('Read-only file system')
+        utime, write_index = os.utime, self.cache._write_index
+        os.utime = self.cache._write_index = fail
+        try:
+            assert self.cache.get('http://a') == path
+        finally:
+            os.utime, self.cache._write_index = utime, write_index
+
+    def test_evict_least_recently_used(self):
+        cache = DatasetCache(self.cache.directory, max_bytes=10)
+        path_a = cache.put('http://a', io.BytesIO(b'aaaa'))
+        path_b = cache.put('http://b', io.BytesIO(b'bbbb'))
+        os.utime(path_a, (0, 0))
+        cache.get('http://a')
+        os.utime(path_b, (0, 0))
+        cache.put('http://c', io.BytesIO(b'cccc'))
+        assert cache.get('http://a') == path_a
+        assert cache.get('http://b') is None
+        assert cache.get('http://c') is not None
+        assert cache.size_bytes == 8
+
+    def test_evicts_derived_files(self):
+        cache = DatasetCache(self.cache.directory, max_bytes=10)
+        path = cache.put('http://a', io.BytesIO(b'aaaa'))
+        with open(path + '.0.npy', 'wb') as f:
+            f.write(b'xx')
+        os.utime(path, (0, 0))
+        cache.put('http://b', io.BytesIO(b'bbbbbb'))
+        assert not os.path.exists(path + '.0.npy')
+
+    def test_clear(self):
+        other_path = os.path.join(self.directory, 'other')
+        self.cache.directory = self.directory
+        with open(other_path, 'w') as f:
+            f.write('other')
+        self.cache.put('http://a', io.BytesIO(b'data'))
+        self.cache.clear()
+        assert self.cache.get('http://a') is None
+        assert self.cache.size_bytes == 0
+        assert os.path.exists(other_path)
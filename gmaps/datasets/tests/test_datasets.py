@@ -1,7 +1,12 @@
 
+import os
+import shutil
+import tempfile
 import unittest
 
+import numpy as np
 import pytest
+from six.moves.urllib.request import pathname2url
 
 from .. import datasets
 
@@ -32,3 +37,168 @@ class TestDatasets(unittest.TestCase):
         df = datasets.load_dataset_as_df('taxi_rides')
         assert df.columns.tolist() == ['latitude', 'longitude']
         assert df.dtypes.tolist() == [float, float]
+
+
+class TestCachedDatasets(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.directory, 'points.csv')
+        with open(self.csv_path, 'w') as f:
+            f.write(
+                'latitude,longitude,name\n1.5,2.5,a\n-3.0,4.0,b\n'
+                '0.5,-1.0,"c, d"\n')
+        datasets.METADATA['test_points'] = {
+            'url': 'file:' + pathname2url(self.csv_path),
+            'description': 'Test points',
+            'headers': ['latitude', 'longitude', 'name'],
+            'types': [float, float, str]
+        }
+        self.configuration = datasets._default_cache_configuration
+        datasets.configure_cache(
+            directory=os.path.join(self.directory, 'cache'), offline=False)
+
+    def tearDown(self):
+        del datasets.METADATA['test_points']
+        datasets._default_cache_configuration = self.configuration
+        shutil.rmtree(self.directory)
+
+    def test_load_from_cache(self):
+        expected = [(1.5, 2.5, 'a'), (-3.0, 4.0, 'b'), (0.5, -1.0, 'c, d')]
+        assert datasets.load_dataset('test_points') == expected
+        os.remove(self.csv_path)
+        assert datasets.load_dataset('test_points') == expected
+
+    def test_offline(self):
+        datasets.configure_cache(offline=True)
+        with pytest.raises(datasets.DatasetNotCachedError):
+            datasets.load_dataset('test_points')
+        datasets.configure_cache(offline=False)
+        datasets.load_dataset('test_points')
+        os.remove(self.csv_path)
+        datasets.configure_cache(offline=True)
+        assert len(datasets.load_dataset('test_points')) == 3
+
+    def test_without_cache(self):
+        datasets.load_dataset('test_points', use_cache=False)
+        assert datasets._cache().size_bytes == 0
+
+    def test_load_as_array(self):
+        data = datasets.load_dataset_as_array('test_points')
+        assert list(data.keys()) == ['latitude', 'longitude', 'name']
+        assert data['latitude'].tolist() == [1.5, -3.0, 0.5]
+        assert data['name'].tolist() == ['a', 'b', 'c, d']
+        assert isinstance(data['longitude'], np.memmap)
+        os.remove(self.csv_path)
+        data = datasets.load_dataset_as_array('test_points')
+        assert data['longitude'].tolist() == [2.5, 4.0, -1.0]
+
+    def test_columns_cached(self):
+        datasets.load_dataset('test_points')
+        [path] = [
+            file_name
+            for file_name in os.listdir(datasets._cache().directory)
+            if file_name.endswith('.0.npy')
+        ]
+        # Loading again reads the columns rather than the CSV
+        column_path = os.path.join(datasets._cache().directory, path)
+        np.save(column_path, np.array([7.0, 8.0]))
+        assert datasets.load_dataset('test_points')[0] == (7.0, 2.5, 'a')
+
+    def test_truncated_columns(self):
+        datasets.load_dataset_as_array('test_points')
+        directory = datasets._cache().directory
+        for file_name in os.listdir(directory):
+            if file_name.endswith('.npy'):
+                with open(os.path.join(directory, file_name), 'wb') as f:
+                    f.write(b'\x93NUMPY')
+        data = datasets.load_dataset_as_array('test_points')
+        assert data['latitude'].tolist() == [1.5, -3.0, 0.5]
+
+    def test_columns_not_saved(self):
+        save_column = datasets._save_column
+
+        def fail(column, column_path):
+            raise OSError('Read-only file system')
+        datasets._save_column = fail
+        try:
+            data = datasets.load_dataset_as_array('test_points')
+        finally:
+            datasets._save_column = save_column
+        assert data['latitude'].tolist() == [1.5, -3.0, 0.5]
+        assert not isinstance(data['latitude'], np.memmap)
+
+    def test_columns_evicted(self):
+        other_path = os.path.join(self.directory, 'other.csv')
+        with open(other_path, 'w') as f:
+            f.write('latitude,longitude,name\n1.0,1.0,a\n')
+        datasets.METADATA['test_other'] = dict(
+            datasets.METADATA['test_points'],
+            url='file:' + pathname2url(other_path))
+        cache = datasets._cache()
+        datasets.load_dataset('test_points')
+        # Room for this dataset and its columns only
+        max_bytes = cache.size_bytes
+        cache.clear()
+        try:
+            datasets.load_dataset('test_other')
+        finally:
+            del datasets.METADATA['test_other']
+        datasets.configure_cache(max_bytes=max_bytes)
+        datasets.load_dataset('test_points')
+        assert cache.size_bytes == max_bytes
+        assert datasets.load_dataset('test_points')[0] == (1.5, 2.5, 'a')
+
+    def test_load_as_array_without_cache(self):
+        data = datasets.load_dataset_as_array('test_points', use_cache=False)
+        assert data['latitude'].tolist() == [1.5, -3.0, 0.5]
+        assert not isinstance(data['latitude'], np.memmap)
+
+    def _check_chunks(self, chunks):
+        assert [list(chunk.keys()) for chunk in chunks] == \
+            [['latitude', 'longitude', 'name']] * 2
+        assert [chunk['latitude'].tolist() for chunk in chunks] == \
+            [[1.5, -3.0], [0.5]]
+        assert chunks[1]['name'].tolist() == ['c, d']
+
+    def test_iter_dataset(self):
+        self._check_chunks(list(datasets.iter_dataset('test_points', 2)))
+
+    def test_iter_dataset_cached_columns(self):
+        datasets.load_dataset_as_array('test_points')
+        os.remove(self.csv_path)
+        self._check_chunks(list(datasets.iter_dataset('test_points', 2)))
+
+    def test_iter_dataset_without_cache(self):
+        chunks = list(
+            datasets.iter_dataset('test_points', 2, use_cache=False))
+        self._check_chunks(chunks)
+        assert datasets._cache().size_bytes == 0
+
+    def test_iter_dataset_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            datasets.iter_dataset('test_points', 0)
+        with pytest.raises(KeyError):
+            datasets.iter_dataset('no_such_dataset')
+        datasets.configure_cache(offline=True)
+        with pytest.raises(datasets.DatasetNotCachedError):
+            datasets.iter_dataset('test_points')
+
+    def test_rows_with_wrong_number_of_cells(self):
+        for content in [
+                'latitude,longitude,name\n1.5,2.5,a,x\n-3.0,4.0\n',
+                'latitude,longitude,name\n1.5,2.5,"a",x\n-3.0,4.0\n']:
+            with open(self.csv_path, 'w') as f:
+                f.write(content)
+            with pytest.raises(ValueError):
+                datasets.load_dataset_as_array(
+                    'test_points', use_cache=False)
+
+    def test_load_as_df(self):
+        pytest.importorskip("pandas")
+        df = datasets.load_dataset_as_df('test_points')
+        assert df.columns.tolist() == ['latitude', 'longitude', 'name']
+        assert df['longitude'].tolist() == [2.5, 4.0, -1.0]
+        assert df['name'].tolist() == ['a', 'b', 'c, d']
+        df.loc[0, 'latitude'] = 10.0
+        assert datasets.load_dataset('test_points')[0][0] == 1.5
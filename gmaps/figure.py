@@ -1,7 +1,9 @@
 
 import ipywidgets as widgets
 
-from traitlets import Unicode, Instance, default, link
+from traitlets import (
+    Unicode, Instance, default, link, directional_link, List, Int
+)
 
 from .maps import (
     Map, InitialViewport, GMapsWidgetMixin, map_params_doc_snippets
@@ -31,6 +33,10 @@ class Figure(GMapsWidgetMixin, widgets.DOMWidget):
     This is the base widget for a Figure. Prefer instantiating
     instances of ``Figure`` using the :func:`gmaps.figure`
     factory method.
+
+    ``current_bounds`` and ``current_zoom`` hold the viewport the user
+    is currently looking at, once the figure is displayed. See
+    :class:`gmaps.Map` for details.
     """
     _view_name = Unicode("FigureView").tag(sync=True)
     _model_name = Unicode("FigureModel").tag(sync=True)
@@ -42,6 +48,8 @@ class Figure(GMapsWidgetMixin, widgets.DOMWidget):
     map_type = MapType('ROADMAP')
     tilt = Tilt()
     mouse_handling = MouseHandling('COOPERATIVE')
+    current_bounds = List(default_value=None, allow_none=True)
+    current_zoom = Int(default_value=None, allow_none=True)
     layout = widgets.trait_types.InstanceDict(FigureLayout).tag(
         sync=True, **widgets.widget_serialization)
 
@@ -58,6 +66,11 @@ class Figure(GMapsWidgetMixin, widgets.DOMWidget):
         self._map.mouse_handling = self.mouse_handling
         link((self._map, 'mouse_handling'), (self, 'mouse_handling'))
 
+        directional_link(
+            (self._map, 'current_bounds'), (self, 'current_bounds'))
+        directional_link(
+            (self._map, 'current_zoom'), (self, 'current_zoom'))
+
     @default('layout')
     def _default_layout(self):
         return FigureLayout()
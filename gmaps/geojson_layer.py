@@ -1,19 +1,37 @@
 
+import hashlib
 import json
-import copy
+import marshal
+from copy import deepcopy
+from itertools import chain
+from numbers import Number
 
 import ipywidgets as widgets
-from traitlets import (Unicode, Dict, List, observe, Float)
+from traitlets import (Unicode, Dict, List, observe, Float, Enum)
 
 import geojson
 
 from . import geotraitlets
 from . import bounds
+from . import simplify as simplification
+from .colormaps import MappedColors
 from .options import (
-    merge_option_dicts, broadcast_if_atomic, broadcast_if_color_atomic)
+    merge_option_dicts, broadcast_if_atomic, broadcast_if_color_atomic,
+    is_atomic, is_color_atomic)
 from .maps import GMapsWidgetMixin
+from .marker import (
+    _StyleColumn, _ColorStyleColumn, _color_column_to_json,
+    _compact_column, _broadcast_column)
 
-__all__ = ["GeoJson", "geojson_layer", "GeoJsonFeature", "InvalidGeoJson"]
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = [
+    "GeoJson", "CompactGeoJson", "geojson_layer", "GeoJsonFeature",
+    "InvalidGeoJson"
+]
 
 
 GEOJSON_DEFAULT_FILL_OPACITY = 0.4
@@ -45,9 +63,102 @@ class GeoJsonFeature(GMapsWidgetMixin, widgets.Widget):
     stroke_opacity = geotraitlets.StrokeOpacity().tag(sync=True)
     stroke_weight = Float(min=0.0, default_value=1.0).tag(sync=True)
 
+    _bounds_accumulator = None
+    # Geometry that the accumulator summarizes, and the fingerprint of
+    # that geometry, computed only when it is needed
+    _bounds_geometry = None
+    _bounds_fingerprint = None
+
     def get_coords(self):
         return geojson.utils.coords(self.feature)
 
+    @observe("feature")
+    def _check_bounds_accumulator(self, change):
+        # Keep the accumulator if the new feature has the same geometry,
+        # for instance if only its properties changed.
+        if self._bounds_accumulator is None:
+            return
+        geometry = change["new"].get("geometry")
+        if geometry is self._bounds_geometry:
+            return
+        fingerprint = _geometry_fingerprint(geometry)
+        if fingerprint is not None and \
+                fingerprint == self._get_bounds_fingerprint():
+            self._bounds_geometry = geometry
+        else:
+            self._bounds_accumulator = None
+            self._bounds_geometry = None
+            self._bounds_fingerprint = None
+
+    def _get_bounds_fingerprint(self):
+        if self._bounds_fingerprint is None:
+            self._bounds_fingerprint = _geometry_fingerprint(
+                self._bounds_geometry)
+        return self._bounds_fingerprint
+
+    def _get_bounds_accumulator(self, cache=None):
+        """
+        Bounds accumulator summarizing the positions of the feature
+
+        This is kept until the geometry of the feature changes, so that
+        restyling the feature does not walk its coordinates again.
+
+        :param cache:
+            Optional :class:`_BoundsCache` of the accumulators of other
+            features. The accumulator is taken from it if it holds a
+            feature with the same geometry.
+        """
+        if self._bounds_accumulator is None:
+            self._bounds_geometry = self.feature.get("geometry")
+            self._bounds_fingerprint = None
+            accumulator = None
+            if cache is not None:
+                accumulator = cache.get(self)
+            if accumulator is None:
+                accumulator = _features_bounds_accumulator([self.feature])
+            self._bounds_accumulator = accumulator
+        return self._bounds_accumulator
+
+
+class _BoundsCache(object):
+    """
+    Bounds accumulators of GeoJSON features, looked up by geometry
+
+    Geometries are matched by identity first, which is enough when
+    features are copied to restyle them. Fingerprints of the geometries
+    are only computed when that fails.
+    """
+    def __init__(self, features):
+        self._features = [
+            feature for feature in features
+            if feature._bounds_accumulator is not None
+        ]
+        self._by_identity = {
+            id(feature._bounds_geometry): feature._bounds_accumulator
+            for feature in self._features
+        }
+        self._by_fingerprint = None
+
+    def get(self, feature):
+        """
+        Accumulator of a feature with the same geometry as `feature`,
+        or None
+        """
+        accumulator = self._by_identity.get(id(feature._bounds_geometry))
+        if accumulator is not None or not self._features:
+            return accumulator
+        fingerprint = feature._get_bounds_fingerprint()
+        if fingerprint is None:
+            return None
+        if self._by_fingerprint is None:
+            self._by_fingerprint = {}
+            for other_feature in self._features:
+                other_fingerprint = other_feature._get_bounds_fingerprint()
+                if other_fingerprint is not None:
+                    self._by_fingerprint[other_fingerprint] = \
+                        other_feature._bounds_accumulator
+        return self._by_fingerprint.get(fingerprint)
+
 
 class GeoJson(GMapsWidgetMixin, widgets.Widget):
     """
@@ -65,19 +176,20 @@ class GeoJson(GMapsWidgetMixin, widgets.Widget):
     data_bounds = List().tag(sync=True)
     features = List().tag(sync=True, **widgets.widget_serialization)
 
+    # Features whose bounds accumulators are reused when the features
+    # are replaced with new widgets for the same geometries, for
+    # instance to restyle them, rather than walking the coordinates
+    # again.
+    _bounds_features = ()
+
     def _set_bounds(self, features):
-        longitudes, latitudes = [], []
-        for feature in features:
-            feature_coords = feature.get_coords()
-            feature_longitudes, feature_latitudes = zip(*feature_coords)
-            longitudes.extend(feature_longitudes)
-            latitudes.extend(feature_latitudes)
-        min_latitude, max_latitude = bounds.latitude_bounds(latitudes)
-        min_longitude, max_longitude = bounds.longitude_bounds(longitudes)
-        self.data_bounds = [
-            (min_latitude, min_longitude),
-            (max_latitude, max_longitude)
+        cache = _BoundsCache(self._bounds_features)
+        accumulators = [
+            feature._get_bounds_accumulator(cache) for feature in features
         ]
+        self._bounds_features = list(features)
+        accumulator = sum(accumulators, bounds.BoundsAccumulator())
+        self.data_bounds = accumulator.bounds()
 
     @observe("features")
     def _calc_bounds(self, change):
@@ -85,45 +197,406 @@ class GeoJson(GMapsWidgetMixin, widgets.Widget):
         self._set_bounds(data)
 
 
+# Number of levels of nesting between the coordinates of each geometry
+# type and its positions
+_position_depths = {
+    'Point': 0,
+    'MultiPoint': 1,
+    'LineString': 1,
+    'MultiLineString': 2,
+    'Polygon': 2,
+    'MultiPolygon': 3
+}
+
+
+def _collect_positions(geometry, positions):
+    """
+    Append the positions of a geometry to `positions`
+    """
+    geometry_type = geometry['type']
+    if geometry_type == 'GeometryCollection':
+        for member in geometry['geometries']:
+            _collect_positions(member, positions)
+        return
+    coordinates = [geometry['coordinates']]
+    for _ in range(_position_depths[geometry_type]):
+        coordinates = chain.from_iterable(coordinates)
+    positions.extend(coordinates)
+
+
+def _positions_to_locations(positions):
+    """
+    (latitude, longitude) pairs of a list of GeoJSON positions
+    """
+    if np is None:
+        return [(position[1], position[0]) for position in positions]
+    try:
+        positions = np.asarray(positions, dtype=float)[:, :2]
+    except (ValueError, IndexError):
+        # Positions with and without altitude, or no positions
+        positions = np.array(
+            [position[:2] for position in positions], dtype=float
+        ).reshape(-1, 2)
+    return positions[:, ::-1]
+
+
+def _geometry_fingerprint(geometry):
+    """
+    Digest of a geometry
+
+    Geometries with the same digest are equal. Equal geometries can
+    have different digests, though, since marshal encodes objects that
+    appear several times in a geometry differently from equal copies.
+
+    Returns None for geometries that marshal cannot serialize, such as
+    geometries with numpy scalars.
+    """
+    try:
+        return hashlib.sha1(marshal.dumps(geometry)).digest()
+    except ValueError:
+        return None
+
+
+def _features_bounds_accumulator(features):
+    """
+    :class:`gmaps.bounds.BoundsAccumulator` summarizing every position
+    of a list of features, computed in a single vectorized pass
+    """
+    positions = []
+    for feature in features:
+        _collect_positions(feature['geometry'], positions)
+    return bounds.BoundsAccumulator.from_locations(
+        _positions_to_locations(positions))
+
+
+def _encode_json(value, data_encoding):
+    if data_encoding == 'json':
+        return value
+    encoded_value = json.dumps(value, separators=(',', ':'))
+    return {'buffer': memoryview(encoded_value.encode('utf-8'))}
+
+
+def _features_to_json(features, widget):
+    return _encode_json(features, widget.data_encoding)
+
+
+def _geometry_levels_to_json(levels, widget):
+    return [
+        {
+            'zoom': level['zoom'],
+            'geometries': (
+                None if level['geometries'] is None
+                else _encode_json(level['geometries'], widget.data_encoding)
+            )
+        }
+        for level in levels
+    ]
+
+
+class CompactGeoJson(GMapsWidgetMixin, widgets.Widget):
+    """
+    GeoJSON layer holding every feature in a single widget
+
+    Unlike :class:`gmaps.GeoJson`, which holds one widget per feature,
+    this layer sends the whole feature collection to the browser at
+    once. Each style option is either a single value, in which case it
+    applies to every feature, or a list with one value per feature.
+    This makes it much faster to display documents with many features.
+
+    Prefer instantiating this by passing ``compact=True`` to
+    :func:`gmaps.geojson_layer`.
+
+    :Examples:
+
+    >>> layer = gmaps.geojson_layer(counties, compact=True)
+    >>> fig.add_layer(layer)
+
+    Setting a style option sends the style of every feature to the
+    browser. To change the style of a few features, use
+    :meth:`update_styles`, which only sends the styles that changed:
+
+    >>> layer.update_styles([3, 12], fill_color='red')
+
+    :param features:
+        List of GeoJSON features.
+
+    :param data_encoding:
+        How to send the features to the browser. Either 'json', to
+        send them as part of the widget state, or 'binary', to send
+        them as a buffer of UTF-8 encoded JSON, which the browser
+        parses faster. Defaults to 'json'.
+    :type data_encoding: str, optional
+
+    :param geometry_levels:
+        Simplified geometries to show at low zoom levels, as a list of
+        dictionaries with a ``zoom`` key and a ``geometries`` key, sorted
+        by increasing zoom. ``geometries`` holds one geometry per feature,
+        and is shown from its zoom level until the zoom level of the next
+        entry. If ``geometries`` is None, the geometries of ``features``
+        are shown. Prefer passing ``simplify='auto'`` to
+        :func:`gmaps.geojson_layer` to compute these.
+    """
+    _view_name = Unicode("CompactGeoJsonLayerView").tag(sync=True)
+    _model_name = Unicode("CompactGeoJsonLayerModel").tag(sync=True)
+    features = List().tag(sync=True, to_json=_features_to_json)
+    data_encoding = Enum(
+        ['json', 'binary'], default_value='json').tag(sync=True)
+    data_bounds = List().tag(sync=True)
+    geometry_levels = List().tag(sync=True, to_json=_geometry_levels_to_json)
+
+    fill_color = _ColorStyleColumn(
+        geotraitlets.ColorAlpha(allow_none=True, default_value=None),
+        allow_none=True
+    ).tag(sync=True, to_json=_color_column_to_json)
+    fill_opacity = _StyleColumn(
+        geotraitlets.FillOpacity(default_value=GEOJSON_DEFAULT_FILL_OPACITY)
+    ).tag(sync=True)
+    stroke_color = _ColorStyleColumn(
+        geotraitlets.ColorAlpha(allow_none=True, default_value=None),
+        allow_none=True
+    ).tag(sync=True, to_json=_color_column_to_json)
+    stroke_opacity = _StyleColumn(geotraitlets.StrokeOpacity()).tag(sync=True)
+    stroke_weight = _StyleColumn(
+        Float(min=0.0, default_value=1.0)).tag(sync=True)
+
+    _style_columns = [
+        "fill_color", "fill_opacity", "stroke_color", "stroke_opacity",
+        "stroke_weight"
+    ]
+    _color_columns = ["fill_color", "stroke_color"]
+
+    @observe("features")
+    def _calc_bounds(self, change):
+        accumulator = _features_bounds_accumulator(change["new"])
+        if accumulator.count:
+            self.data_bounds = accumulator.bounds()
+            self.has_bounds = True
+        else:
+            self.has_bounds = False
+
+    def update_styles(self, indices, **styles):
+        """
+        Change the style of some features
+
+        Only the new styles of these features are sent to the browser,
+        rather than the style of every feature. For this reason, the
+        style traits are updated without notifying their observers:
+        callbacks registered with ``observe`` on, for instance,
+        ``fill_color`` are not called for these changes.
+
+        :param indices:
+            Iterable of indices of the features to change, in the list
+            of features.
+
+        :param styles:
+            New values for style options, like ``fill_color`` or
+            ``stroke_weight``. Each value is either a single value, in
+            which case it applies to every feature in `indices`, or a
+            list with one value per index.
+
+        :Examples:
+
+        >>> layer.update_styles([0, 4], fill_color=['red', 'blue'])
+        """
+        indices = [int(index) for index in indices]
+        number_features = len(self.features)
+        for index in indices:
+            if not 0 <= index < number_features:
+                raise IndexError(
+                    'Feature index {} out of range'.format(index))
+        updated_styles = {}
+        for name, values in styles.items():
+            if name not in self._style_columns:
+                raise ValueError(
+                    '{} is not a valid style option. Expected one of '
+                    '{}'.format(name, self._style_columns))
+            atomic_check = (
+                is_color_atomic if name in self._color_columns
+                else is_atomic)
+            values = _broadcast_column(
+                _compact_column(values, len(indices), name, atomic_check),
+                len(indices))
+            values = self.traits()[name]._validate_column(self, values)
+            column = list(
+                _broadcast_column(getattr(self, name), number_features))
+            for index, value in zip(indices, values):
+                column[index] = value
+            # Store the column without notifying observers, so that
+            # only the changed values are sent to the browser.
+            self._trait_values[name] = column
+            updated_styles[name] = values
+        self.send({
+            "event": "STYLES_UPDATED",
+            "payload": {"indices": indices, "styles": updated_styles}
+        })
+
+
 def _geojson_layer_options(
         number_features, fill_color, fill_opacity,
         stroke_color, stroke_opacity, stroke_weight):
     feature_options = {
-        "fill_color": broadcast_if_color_atomic(fill_color, number_features),
+        "fill_color": _feature_colors(fill_color, number_features),
         "fill_opacity": broadcast_if_atomic(fill_opacity, number_features),
-        "stroke_color":
-            broadcast_if_color_atomic(stroke_color, number_features),
+        "stroke_color": _feature_colors(stroke_color, number_features),
         "stroke_opacity": broadcast_if_atomic(stroke_opacity, number_features),
         "stroke_weight": broadcast_if_atomic(stroke_weight, number_features)
     }
     return merge_option_dicts(feature_options)
 
 
-def _validate_feature(feature):
-    if feature.get("properties") is None:
-        feature["properties"] = {}
+def _feature_colors(colors, number_features):
+    if isinstance(colors, MappedColors):
+        return colors.to_list()
+    # Normalize colors up front, so that each distinct color is only
+    # validated once rather than once per feature.
+    return geotraitlets.normalize_colors(
+        broadcast_if_color_atomic(colors, number_features))
+
+
+_coordinate_types = {float, int}
+
+
+def _validate_position(position, copy):
+    if not isinstance(position, (list, tuple)) or len(position) not in (2, 3):
+        raise InvalidGeoJson('a position must have exactly 2 or 3 values')
+    for number in position:
+        # Checking the exact type first is much faster than isinstance
+        # checks against the abstract Number class
+        if type(number) not in _coordinate_types and \
+                not isinstance(number, Number):
+            raise InvalidGeoJson(
+                '{!r} is not a valid coordinate'.format(number))
+    return list(position) if copy else position
+
+
+def _validate_sequence(values, validate_element, copy):
+    if not isinstance(values, (list, tuple)):
+        raise InvalidGeoJson('{!r} is not a list'.format(values))
+    if copy:
+        return [validate_element(value, copy) for value in values]
+    for value in values:
+        validate_element(value, copy)
+    return values
+
+
+def _validate_multi_point(coordinates, copy):
+    return _validate_sequence(coordinates, _validate_position, copy)
+
+
+def _validate_line_string(coordinates, copy):
+    coordinates = _validate_multi_point(coordinates, copy)
+    if len(coordinates) < 2:
+        raise InvalidGeoJson(
+            'a line string must have two or more positions')
+    return coordinates
+
+
+def _validate_linear_ring(coordinates, copy):
+    coordinates = _validate_multi_point(coordinates, copy)
+    if len(coordinates) < 4:
+        raise InvalidGeoJson(
+            'each linear ring must contain at least 4 positions')
+    if list(coordinates[0]) != list(coordinates[-1]):
+        raise InvalidGeoJson('each linear ring must end where it started')
+    return coordinates
+
+
+def _validate_multi_line_string(coordinates, copy):
+    return _validate_sequence(coordinates, _validate_line_string, copy)
+
+
+def _validate_polygon(coordinates, copy):
+    return _validate_sequence(coordinates, _validate_linear_ring, copy)
+
+
+def _validate_multi_polygon(coordinates, copy):
+    return _validate_sequence(coordinates, _validate_polygon, copy)
+
+
+_coordinate_validators = {
+    'Point': _validate_position,
+    'MultiPoint': _validate_multi_point,
+    'LineString': _validate_line_string,
+    'MultiLineString': _validate_multi_line_string,
+    'Polygon': _validate_polygon,
+    'MultiPolygon': _validate_multi_polygon
+}
+
+
+def _validate_geometry(geometry, copy):
+    """
+    Validate a GeoJSON geometry, returning a copy if `copy` is True
+    """
+    if not isinstance(geometry, dict):
+        raise InvalidGeoJson('{!r} is not a geometry'.format(geometry))
+    geometry_type = geometry.get('type')
+    if geometry_type == 'GeometryCollection':
+        member = 'geometries'
+        validated_member = _validate_sequence(
+            geometry.get(member), _validate_geometry, copy)
+    elif geometry_type in _coordinate_validators:
+        member = 'coordinates'
+        validated_member = _coordinate_validators[geometry_type](
+            geometry.get(member), copy)
+    else:
+        raise InvalidGeoJson(
+            '{!r} is not a valid geometry type'.format(geometry_type))
+    if not copy:
+        return geometry
+    copied_geometry = {
+        key: deepcopy(value) for key, value in geometry.items()
+        if key != member
+    }
+    copied_geometry[member] = validated_member
+    return copied_geometry
+
+
+def _validate_feature(feature, copy):
+    if not isinstance(feature, dict) or feature.get('type') != 'Feature':
+        raise InvalidGeoJson('{!r} is not a GeoJSON feature'.format(feature))
     if feature.get('geometry') is None:
         raise InvalidGeoJson(
             "Feature with properties {} does not have a geometry.".format(
                 feature.get("properties")))
+    geometry = _validate_geometry(feature['geometry'], copy)
+    if copy:
+        feature = {
+            key: deepcopy(value) for key, value in feature.items()
+            if key != 'geometry'
+        }
+        feature['geometry'] = geometry
+    if feature.get("properties") is None:
+        feature["properties"] = {}
     return feature
 
 
-def _validate_geojson(geojson_document):
-    try:
-        geojson_instance = geojson.loads(json.dumps(geojson_document))
-    except ValueError as e:
-        raise InvalidGeoJson(e.message)
-    if not isinstance(geojson_instance, geojson.GeoJSON):
-        # Sometimes GeoJSON.to_instance fails silently and just returns
-        # the original type, rather than validation errors.
-        # Try with, e.g. an empty dictionary.
+def _validate_geojson(geojson_document, copy=True):
+    """
+    Validate a GeoJSON feature collection
+
+    This walks the document once, copying the features as it goes if
+    `copy` is True, rather than serializing the whole document.
+
+    :returns: list of validated features
+    """
+    if not isinstance(geojson_document, dict) or \
+            'type' not in geojson_document:
         raise InvalidGeoJson('Could not convert document to GeoJSON.')
-    if not geojson_instance.is_valid:
-        raise InvalidGeoJson(", ".join(geojson_instance.errors()))
     if geojson_document["type"] != "FeatureCollection":
         raise InvalidGeoJson(
             "Only FeatureCollection GeoJSON is currently supported")
+    features = geojson_document.get('features')
+    if not isinstance(features, list):
+        raise InvalidGeoJson(
+            'The features of a feature collection must be a list')
+    validated_features = []
+    for index, feature in enumerate(features):
+        try:
+            validated_features.append(_validate_feature(feature, copy))
+        except InvalidGeoJson as error:
+            raise InvalidGeoJson(
+                'Invalid feature at index {}: {}'.format(index, error))
+    return validated_features
 
 
 def geojson_layer(
@@ -131,7 +604,8 @@ def geojson_layer(
         fill_opacity=GEOJSON_DEFAULT_FILL_OPACITY,
         stroke_color=None,
         stroke_opacity=geotraitlets.StrokeOpacity.default_value,
-        stroke_weight=1.0):
+        stroke_weight=1.0, copy=True, compact=False, data_encoding='json',
+        simplify=None):
     """
     GeoJSON layer
 
@@ -185,8 +659,10 @@ def geojson_layer(
         same length as ``locations``.
         Colors can be specified as a simple string, e.g. 'blue',
         as an RGB tuple, e.g. (100, 0, 0), or as an RGBA tuple, e.g.
-        (100, 0, 0, 0.5).
-    :type fill_color: single color or list of colors, optional
+        (100, 0, 0, 0.5). To color features by a numeric value, pass
+        the output of :func:`gmaps.colormap`.
+    :type fill_color: single color, list of colors or
+        :class:`gmaps.MappedColors`, optional
 
     :param fill_opacity:
         The opacity of the fill color. The opacity should be a float
@@ -201,8 +677,10 @@ def geojson_layer(
         same length as ``locations``.
         Colors can be specified as a simple string, e.g. 'blue',
         as an RGB tuple, e.g. (100, 0, 0), or as an RGBA tuple, e.g.
-        (100, 0, 0, 0.5).
-    :type stroke_color: single color or list of colors, optional
+        (100, 0, 0, 0.5). To color features by a numeric value, pass
+        the output of :func:`gmaps.colormap`.
+    :type stroke_color: single color, list of colors or
+        :class:`gmaps.MappedColors`, optional
 
     :param stroke_opacity:
         The opacity of the stroke color. The opacity should be a float
@@ -216,14 +694,89 @@ def geojson_layer(
         fat brush. 3.0 by default.
     :type stroke_weight: float or list of floats, optional
 
+    :param copy:
+        Whether to copy the features of ``geojson``. The layer keeps
+        references to the features, so pass ``copy=False`` only if
+        you will not modify ``geojson`` afterwards. This saves time
+        and memory for large documents. Features without properties
+        are then given an empty ``properties`` dictionary in place.
+        Defaults to True.
+    :type copy: boolean, optional
+
+    :param compact:
+        Whether to store the features in a single
+        :class:`gmaps.CompactGeoJson` widget, rather than creating
+        a :class:`gmaps.GeoJsonFeature` widget for every feature. This
+        is much faster for documents with many features, but the
+        features cannot be edited individually through their own
+        widget. Defaults to False.
+    :type compact: boolean, optional
+
+    :param data_encoding:
+        How to send the features to the browser when ``compact`` is
+        True. Either 'json' or 'binary'. See
+        :class:`gmaps.CompactGeoJson` for details. Defaults to 'json'.
+    :type data_encoding: str, optional
+
+    :param simplify:
+        Simplify the lines and polygons of the features, which makes
+        documents with detailed boundaries faster to send and to draw.
+        Pass a tolerance, in degrees of longitude, to simplify the
+        features once, keeping them within that distance of the
+        original. Pass 'auto' to send several versions of the features,
+        simplified to within a pixel at increasing zoom levels, and let
+        the map show the version that matches its zoom level. 'auto'
+        requires ``compact=True``. Borders shared by several features
+        are simplified in the same way in each feature. This requires
+        numpy. Defaults to None, which does not simplify the features.
+    :type simplify: float or str, optional
+
     :returns:
-        A :class:`gmaps.GeoJson` instance.
+        A :class:`gmaps.GeoJson` instance, or a
+        :class:`gmaps.CompactGeoJson` instance if ``compact`` is True.
     """
-    _validate_geojson(geojson)
-    styled_geojson = copy.deepcopy(geojson)
-    raw_features = styled_geojson["features"]
-    features = [_validate_feature(feature) for feature in raw_features]
+    if data_encoding != 'json' and not compact:
+        raise ValueError('data_encoding requires compact=True')
+    if simplify == 'auto' and not compact:
+        raise ValueError("simplify='auto' requires compact=True")
+    features = _validate_geojson(geojson, copy=copy)
     number_features = len(features)
+    geometry_levels = []
+    if simplify == 'auto':
+        levels = simplification.auto_simplify_levels(
+            [feature['geometry'] for feature in features])
+        if len(levels) > 1:
+            geometry_levels = [
+                {'zoom': zoom, 'geometries': geometries}
+                for (zoom, geometries) in levels
+            ]
+    elif simplify is not None:
+        if not isinstance(simplify, Number) or \
+                isinstance(simplify, bool) or simplify < 0.0:
+            raise ValueError(
+                "simplify must be None, 'auto' or a non-negative tolerance")
+        geometries = simplification.simplify_geometries(
+            [feature['geometry'] for feature in features], simplify)
+        features = [
+            dict(feature, geometry=geometry)
+            for (feature, geometry) in zip(features, geometries)
+        ]
+    if compact:
+        options = {
+            name: _compact_column(values, number_features, name)
+            for name, values in [
+                ("fill_opacity", fill_opacity),
+                ("stroke_opacity", stroke_opacity),
+                ("stroke_weight", stroke_weight)
+            ]
+        }
+        for name, values in [
+                ("fill_color", fill_color), ("stroke_color", stroke_color)]:
+            options[name] = _compact_column(
+                values, number_features, name, atomic_check=is_color_atomic)
+        return CompactGeoJson(
+            features=features, data_encoding=data_encoding,
+            geometry_levels=geometry_levels, **options)
     styles = _geojson_layer_options(
         number_features, fill_color, fill_opacity, stroke_color,
         stroke_opacity, stroke_weight)
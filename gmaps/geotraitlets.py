@@ -3,7 +3,12 @@ import re
 
 import traitlets
 
-from .locations import locations_to_list
+from .locations import locations_to_list, _is_columnar, _location_columns
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class InvalidPointException(Exception):
@@ -21,11 +26,15 @@ class LocationArray(traitlets.List):
     def validate(self, obj, value):
         if value is None:
             return super(LocationArray, self).validate(obj, value)
-        locations_as_list = locations_to_list(value)
-        for location in locations_as_list:
-            latitude, longitude = location
-            _validate_latitude(latitude)
-            _validate_longitude(longitude)
+        locations_as_list = None
+        if _is_columnar(value):
+            locations_as_list = _validate_locations_array(value)
+        if locations_as_list is None:
+            locations_as_list = locations_to_list(value)
+            for row, location in enumerate(locations_as_list):
+                latitude, longitude = location
+                _validate_latitude(latitude, row)
+                _validate_longitude(longitude, row)
         return super(LocationArray, self).validate(obj, locations_as_list)
 
 
@@ -199,12 +208,45 @@ class Tilt(traitlets.Integer):
             self.error(obj, value)
 
 
+# Maximum number of colors kept in the cache of normalized colors. The
+# cache is emptied when it reaches this size.
+_COLOR_CACHE_SIZE = 4096
+
+# Cache of normalized color strings, keyed by the value that was validated
+_normalized_colors = {}
+
+
+def _color_cache_key(value):
+    """
+    Hashable key identifying a color value, or None if the value
+    cannot be cached
+    """
+    if isinstance(value, (list, tuple)):
+        # Include the type of each component, so that e.g. (1.0, 0, 0),
+        # which is invalid, does not match (1, 0, 0).
+        key = (
+            type(value),
+            tuple(type(component) for component in value),
+            tuple(value)
+        )
+    else:
+        key = (type(value), value)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 class ColorAlpha(traitlets.Union):
     """
     Trait representing a color that can be passed to Google maps.
 
     This is either a string like 'blue' or '#aabbcc' or an RGB
     tuple like (100, 0, 250) or an RGBA tuple like (100, 0, 250, 0.5).
+
+    Layers often validate the same few colors many times, so normalized
+    colors are cached.
     """
     def __init__(
             self, default_value=traitlets.Undefined,
@@ -221,6 +263,17 @@ class ColorAlpha(traitlets.Union):
         Verifies that 'value' is a string or tuple and converts it to a
         value like 'rgb(x,y,z)'
         """
+        key = _color_cache_key(value)
+        normalized_color = _normalized_colors.get(key)
+        if normalized_color is None:
+            normalized_color = self._normalize(obj, value)
+            if key is not None:
+                if len(_normalized_colors) >= _COLOR_CACHE_SIZE:
+                    _normalized_colors.clear()
+                _normalized_colors[key] = normalized_color
+        return normalized_color
+
+    def _normalize(self, obj, value):
         value = super(ColorAlpha, self).validate(obj, value)
         if isinstance(value, tuple):
             if len(value) == 3:
@@ -234,6 +287,51 @@ class ColorAlpha(traitlets.Union):
             return value
 
 
+class _ColorValidator(traitlets.HasTraits):
+    color = ColorAlpha()
+
+
+_color_validator = _ColorValidator()
+
+
+def normalize_colors(colors):
+    """
+    Validate and normalize an iterable of colors
+
+    Each distinct color is only validated once, so this is fast for
+    long lists of colors drawn from a small palette.
+
+    :param colors:
+        Iterable of colors, each of which is a string like 'blue' or
+        '#aabbcc', an RGB tuple like (100, 0, 250) or an RGBA tuple like
+        (100, 0, 250, 0.5). None values are kept as None.
+
+    :returns:
+        List of color strings like 'blue' or 'rgb(100,0,250)'.
+
+    :raises traitlets.TraitError: if one of the colors is invalid
+    """
+    normalized_colors = {}
+    colors_list = []
+    for color in colors:
+        if color is None:
+            colors_list.append(None)
+            continue
+        key = _color_cache_key(color)
+        normalized_color = normalized_colors.get(key)
+        if normalized_color is None:
+            try:
+                normalized_color = _ColorValidator.color.validate(
+                    _color_validator, color)
+            except traitlets.TraitError:
+                raise traitlets.TraitError(
+                    '{!r} is not a valid color'.format(color))
+            if key is not None:
+                normalized_colors[key] = normalized_color
+        colors_list.append(normalized_color)
+    return colors_list
+
+
 class MapType(traitlets.Enum):
     """
     String representing a map type
@@ -294,32 +392,95 @@ def is_valid_point(pt):
     return (-90.0 <= latitude <= 90.0) and (-180.0 <= longitude <= 180.0)
 
 
-def _validate_latitude(latitude):
+def _validate_locations_array(value):
+    """
+    Validate an array-like of locations in bulk with numpy
+
+    Returns the locations as a list of tuples, or None if the value
+    cannot be interpreted as columns of (latitude, longitude) floats,
+    in which case the caller should fall back to validating each point
+    individually.
+    """
+    try:
+        latitudes, longitudes = _location_columns(value)
+    except (TypeError, ValueError):
+        return None
+    _validate_location_columns(latitudes, longitudes)
+    return list(zip(latitudes.tolist(), longitudes.tolist()))
+
+
+def _validate_location_columns(latitudes, longitudes):
+    """
+    Validate numpy arrays of latitudes and longitudes in bulk
+    """
+    # Comparisons with NaN are always false, so this also catches
+    # non-finite values.
+    with np.errstate(invalid='ignore'):
+        is_invalid = ~(
+            (latitudes >= -90.0) & (latitudes <= 90.0) &
+            (longitudes >= -180.0) & (longitudes <= 180.0)
+        )
+    if is_invalid.any():
+        # Re-validate the first offending row to get the error message
+        row = int(np.argmax(is_invalid))
+        _validate_latitude(latitudes[row], row)
+        _validate_longitude(longitudes[row], row)
+
+
+def _validate_weight_column(weights, number_locations):
+    """
+    Validate weights in bulk with numpy, returning an array of floats
+
+    If `weights` is None, every point gets a weight of 1.
+    """
+    if weights is None:
+        return np.ones(number_locations)
+    weights = np.asarray(weights, dtype=float)
+    if len(weights) != number_locations:
+        raise ValueError(
+            'weights must be of the same length as locations')
+    with np.errstate(invalid='ignore'):
+        is_invalid = ~(weights >= 0.0)
+    if is_invalid.any():
+        raise InvalidWeightException(
+            '{} is not a valid weight. Weights must be '
+            'non-negative.'.format(weights[np.argmax(is_invalid)]))
+    return weights
+
+
+def _row_description(row):
+    return '' if row is None else ' (row {})'.format(row)
+
+
+def _validate_latitude(latitude, row=None):
     try:
         latitude = float(latitude)
     except (TypeError, ValueError):
         raise traitlets.TraitError(
-            '{} is not a valid latitude. '
-            'Latitudes must be floats'.format(latitude)
+            '{} is not a valid latitude{}. '
+            'Latitudes must be floats'.format(
+                latitude, _row_description(row))
         )
     if not (-90.0 <= latitude <= 90.0):
         raise InvalidPointException(
-            '{} is not a valid latitude. '
-            'Latitudes must lie between -90 and 90.'.format(latitude)
+            '{} is not a valid latitude{}. '
+            'Latitudes must lie between -90 and 90.'.format(
+                latitude, _row_description(row))
         )
 
 
-def _validate_longitude(longitude):
+def _validate_longitude(longitude, row=None):
     try:
         longitude = float(longitude)
     except (TypeError, ValueError):
         raise traitlets.TraitError(
-            '{} is not a valid longitude. '
-            'Longitudes must be floats'.format(longitude)
+            '{} is not a valid longitude{}. '
+            'Longitudes must be floats'.format(
+                longitude, _row_description(row))
         )
     if not (-180.0 <= longitude <= 180.0):
         raise InvalidPointException(
-            '{} is not a valid longitude. '
+            '{} is not a valid longitude{}. '
             'Longitudes must lie between '
-            '-180 and 180.'.format(longitude)
+            '-180 and 180.'.format(longitude, _row_description(row))
         )
@@ -1,13 +1,20 @@
 
 import ipywidgets as widgets
 from traitlets import (
-    Float, Bool, Unicode, HasTraits, default, List, observe
+    Float, Bool, Unicode, HasTraits, default, List, observe, Enum, Int,
+    validate, Dict
 )
 
-from . import bounds
-from .locations import locations_docstring
+from . import bounds, tiles
+from .aggregation import (
+    grid_aggregate, pyramid_aggregate, DEFAULT_MAX_LEVEL_POINTS)
+from .locations import locations_docstring, locations_to_array
 from . import geotraitlets
+from .geotraitlets import _validate_location_columns, _validate_weight_column
 from .maps import GMapsWidgetMixin
+from .serialization import ALLOWED_ENCODINGS, array_to_json, pack_array
+from .tile_cache import TileCache, MBTilesStore, DEFAULT_MAX_BYTES
+from .viewport import ViewportData, ViewportLayerMixin
 from ._docutils import doc_subst
 
 
@@ -48,6 +55,22 @@ _doc_snippets['options'] = """
         as an RGB tuple, e.g. (100, 0, 0), or as an RGBA tuple, e.g.
         (100, 0, 0, 0.5).
     :type gradient: list of colors, optional
+
+    :param data_encoding:
+        How the locations and weights are sent to the browser. One of
+        'json' (the default), 'float64' or 'float32'. The last two send
+        the data as packed binary buffers, which is much faster for
+        heatmaps with many points. 'float32' halves the size of the data
+        sent, at the cost of about seven significant digits of precision,
+        or roughly a meter on the ground.
+    :type data_encoding: str, optional
+
+    :param max_points:
+        Maximum number of points in the heatmap. If set, only the
+        ``max_points`` most recently added points are kept, which is
+        useful for showing a sliding window over a live data feed.
+        Defaults to None, meaning no limit.
+    :type max_points: int, optional
 """
 
 
@@ -60,30 +83,145 @@ class _HeatmapOptionsMixin(HasTraits):
     gradient = List(
         trait=geotraitlets.ColorAlpha(), allow_none=True, minlen=1
     ).tag(sync=True)
+    data_encoding = Enum(
+        ALLOWED_ENCODINGS, default_value='json').tag(sync=True)
+
+    # Traits serialized according to `data_encoding`
+    _encoded_traits = []
 
     @default('gradient')
     def _default_gradient(self):
         return None
 
-    def set_bounds(self, data):
-        latitudes = [row[0] for row in data]
-        longitudes = [row[1] for row in data]
-        min_latitude, max_latitude = self._latitude_bounds(latitudes)
-        min_longitude, max_longitude = self._longitude_bounds(longitudes)
-        self.data_bounds = [
-            (min_latitude, min_longitude),
-            (max_latitude, max_longitude)
-        ]
-
-    def _latitude_bounds(self, latitudes):
-        return bounds.latitude_bounds(latitudes)
+    @observe('data_encoding')
+    def _resend_encoded_traits(self, change):
+        # The serialized form of the data depends on the encoding,
+        # so we need to re-send it explicitly.
+        if self._encoded_traits:
+            self.send_state(key=self._encoded_traits)
 
-    def _longitude_bounds(self, longitudes):
-        return bounds.longitude_bounds(longitudes)
+    def set_bounds(self, data):
+        self._bounds_accumulator = bounds.BoundsAccumulator.from_locations(
+            data)
+        self.data_bounds = self._bounds_accumulator.bounds()
+
+    def _update_bounds(self, old_data, new_data):
+        """
+        Update the bounds when the data changes
+
+        If points were only appended, only the new points are added
+        to the bounds, rather than recomputing them from scratch.
+        """
+        if getattr(self, '_viewport_data', None) is not None:
+            # The bounds cover every point, not just the visible ones
+            return
+        accumulator = getattr(self, '_bounds_accumulator', None)
+        number_old = len(old_data) if isinstance(old_data, list) else 0
+        is_append = (
+            accumulator is not None and
+            0 < number_old <= len(new_data) and
+            new_data[:number_old] == old_data
+        )
+        if is_append:
+            accumulator.add(new_data[number_old:])
+            self.data_bounds = accumulator.bounds()
+        else:
+            self.set_bounds(new_data)
+
+    def _show_visible_data(self, locations, columns):
+        if not len(locations):
+            # Keep the current points, since they are not visible either
+            return
+        with self.hold_sync():
+            self.locations = locations
+            for name, values in columns.items():
+                setattr(self, name, values)
+
+
+# Traits for validating points appended to existing heatmaps.
+# Unlike the traits on the widgets, these accept empty lists.
+_appended_locations_trait = geotraitlets.LocationArray(allow_none=False)
+_appended_weights_trait = geotraitlets.WeightArray(allow_none=False)
+
+
+# Mixin for appending points to heatmaps without re-sending all the data
+class _AppendableHeatmapMixin(HasTraits):
+    max_points = Int(default_value=None, allow_none=True, min=1).tag(
+        sync=True)
+
+    def _trim_to_max_points(self, values):
+        if self.max_points is not None and len(values) > self.max_points:
+            values = values[-self.max_points:]
+        return values
+
+    @observe('max_points')
+    def _apply_max_points(self, change):
+        self.set_trait('locations', self.locations)
+        if 'weights' in self._encoded_traits:
+            self.set_trait('weights', self.weights)
+
+    def _extend_data(self, **new_data):
+        """
+        Append points and send only the new points to the front-end
+
+        `new_data` maps the name of each encoded trait (e.g. 'locations')
+        to the new values, which must already have been validated.
+        Rather than assigning a new list to the traits, which would
+        re-send every point, we mutate the lists in place and send a
+        message to the front-end with the new points.
+        """
+        number_new = len(new_data['locations'])
+        if number_new == 0:
+            return
+        if self._viewport_data is not None:
+            self._viewport_data.extend(**new_data)
+            self._bounds_accumulator.add(new_data['locations'])
+            self.data_bounds = self._bounds_accumulator.bounds()
+            self._refresh_viewport()
+            return
+        number_existing = len(self.locations)
+        number_removed = 0
+        if self.max_points is not None:
+            number_removed = max(
+                number_existing + number_new - self.max_points, 0)
+        if number_removed >= number_existing:
+            # Every existing point is dropped: just replace the data.
+            with self.hold_sync():
+                for name, values in new_data.items():
+                    self.set_trait(name, self._trim_to_max_points(values))
+            return
+        removed_locations = self.locations[:number_removed]
+        for name, values in new_data.items():
+            current_values = getattr(self, name)
+            current_values.extend(values)
+            del current_values[:number_removed]
+        self._bounds_accumulator.add(new_data['locations'])
+        self._bounds_accumulator.remove(removed_locations)
+        self.data_bounds = self._bounds_accumulator.bounds()
+        self._send_appended_data(new_data, number_removed)
+
+    def _send_appended_data(self, new_data, number_removed):
+        payload = {'numberRemoved': number_removed}
+        buffers = []
+        for name, values in new_data.items():
+            if self.data_encoding == 'json':
+                payload[name] = values
+            else:
+                packed = pack_array(values, self.data_encoding)
+                payload[name] = {
+                    'dtype': packed['dtype'],
+                    'shape': packed['shape'],
+                    'bufferIndex': len(buffers)
+                }
+                buffers.append(packed['buffer'])
+        message = {'event': 'DATA_APPENDED', 'payload': payload}
+        self.send(message, buffers=buffers)
 
 
 @doc_subst(_doc_snippets)
-class Heatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
+class Heatmap(
+        GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin,
+        _AppendableHeatmapMixin, ViewportLayerMixin):
     """
     Heatmap layer.
 
@@ -115,6 +253,11 @@ class Heatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
     >>> heatmap.point_radius = 3
     >>> heatmap.gradient = ['white', 'gray']
     >>> fig.add_layer(heatmap_layer)
+
+    To add points to an existing heatmap, use ``append`` or ``extend``.
+    These only send the new points to the browser:
+
+    >>> heatmap.extend([(46.4, 5.5), (46.5, 5.6)])
     """
     has_bounds = True
     _view_name = Unicode('SimpleHeatmapLayerView').tag(sync=True)
@@ -122,17 +265,44 @@ class Heatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
 
     locations = geotraitlets.LocationArray(
         allow_none=False, minlen=1
-    ).tag(sync=True)
+    ).tag(sync=True, to_json=array_to_json)
     data_bounds = List().tag(sync=True)
+    _encoded_traits = ['locations']
+
+    @validate('locations')
+    def _validate_max_points(self, proposal):
+        return self._trim_to_max_points(proposal['value'])
 
     @observe('locations')
     def _calc_bounds(self, change):
-        data = change['new']
-        self.set_bounds(data)
+        self._update_bounds(change['old'], change['new'])
+
+    def append(self, location):
+        """
+        Add a single (latitude, longitude) pair to the heatmap
+        """
+        self.extend([location])
+
+    def extend(self, locations):
+        """
+        Add points to the heatmap
+
+        Only the new points are sent to the browser. If ``max_points``
+        is set, the oldest points are dropped to keep at most
+        ``max_points`` points in the heatmap.
+
+        :param locations:
+            Iterable of (latitude, longitude) pairs, in any of the formats
+            accepted by :func:`gmaps.heatmap_layer`.
+        """
+        locations = _appended_locations_trait.validate(self, locations)
+        self._extend_data(locations=locations)
 
 
 @doc_subst(_doc_snippets)
-class WeightedHeatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
+class WeightedHeatmap(
+        GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin,
+        _AppendableHeatmapMixin, ViewportLayerMixin):
     """
     Heatmap with weighted points.
 
@@ -171,6 +341,11 @@ class WeightedHeatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
     >>> heatmap = gmaps.heatmap_layer(locations, weights=weights)
     >>> heatmap.max_intensity = 2
     >>> fig.add_layer(heatmap_layer)
+
+    To add points to an existing heatmap, use ``append`` or ``extend``.
+    These only send the new points to the browser:
+
+    >>> heatmap.extend([(46.4, 5.5), (46.5, 5.6)], [0.1, 0.4])
     """
     has_bounds = True
     _view_name = Unicode('WeightedHeatmapLayerView').tag(sync=True)
@@ -178,28 +353,332 @@ class WeightedHeatmap(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
 
     locations = geotraitlets.LocationArray(
         allow_none=False, minlen=1
-    ).tag(sync=True)
+    ).tag(sync=True, to_json=array_to_json)
     weights = geotraitlets.WeightArray(
         allow_none=False, minlen=1
-    ).tag(sync=True)
+    ).tag(sync=True, to_json=array_to_json)
     data_bounds = List().tag(sync=True)
+    _encoded_traits = ['locations', 'weights']
+
+    @validate('locations', 'weights')
+    def _validate_max_points(self, proposal):
+        return self._trim_to_max_points(proposal['value'])
 
     @observe('locations')
     def _calc_bounds(self, change):
-        data = change['new']
-        self.set_bounds(data)
+        self._update_bounds(change['old'], change['new'])
+
+    def append(self, location, weight):
+        """
+        Add a single (latitude, longitude) pair and its weight
+        """
+        self.extend([location], [weight])
+
+    def extend(self, locations, weights):
+        """
+        Add points to the heatmap
+
+        Only the new points are sent to the browser. If ``max_points``
+        is set, the oldest points are dropped to keep at most
+        ``max_points`` points in the heatmap.
+
+        :param locations:
+            Iterable of (latitude, longitude) pairs, in any of the formats
+            accepted by :func:`gmaps.heatmap_layer`.
+
+        :param weights:
+            Iterable of non-negative weights of the same length as
+            `locations`.
+        """
+        locations = _appended_locations_trait.validate(self, locations)
+        weights = _appended_weights_trait.validate(self, weights)
+        if len(weights) != len(locations):
+            raise ValueError(
+                'weights must be of the same length as locations')
+        self._extend_data(locations=locations, weights=weights)
+
+
+def _pyramid_levels_to_json(levels, widget):
+    def _level_array_to_json(values):
+        if widget.data_encoding == 'json':
+            return values.tolist()
+        return pack_array(values, widget.data_encoding)
+    return [
+        {
+            'zoom': level['zoom'],
+            'locations': _level_array_to_json(level['locations']),
+            'weights': _level_array_to_json(level['weights'])
+        }
+        for level in levels
+    ]
 
 
-def _heatmap_options(
-        locations, weights, max_intensity, dissipating, point_radius,
-        opacity, gradient):
-    options = {
+@doc_subst(_doc_snippets)
+class HeatmapPyramid(GMapsWidgetMixin, widgets.Widget, _HeatmapOptionsMixin):
+    """
+    Heatmap aggregated at several resolutions.
+
+    The points are aggregated in Python into a pyramid of weighted
+    grids, one for each zoom level, with cells a few pixels wide at
+    that zoom level. The browser shows the level that matches the
+    current zoom of the map, so it never draws more than
+    ``max_level_points`` points, however large the dataset. Beyond the
+    finest level, the finest level is shown.
+
+    You should not instantiate this directly. Instead, use the
+    :func:`gmaps.heatmap_layer` factory function, passing
+    ``aggregate='pyramid'``. This requires numpy.
+
+    {options}
+
+    :param max_level_points:
+        Maximum number of points in each level of the pyramid.
+        Setting this only affects data passed to ``set_data``
+        afterwards.
+    :type max_level_points: int, optional
+
+    :Examples:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, aggregate='pyramid')
+
+    To replace the data in the heatmap:
+
+    >>> heatmap.set_data(new_locations, new_weights)
+    """
+    has_bounds = True
+    _view_name = Unicode('HeatmapPyramidLayerView').tag(sync=True)
+    _model_name = Unicode('HeatmapPyramidLayerModel').tag(sync=True)
+
+    levels = List(trait=Dict()).tag(
+        sync=True, to_json=_pyramid_levels_to_json)
+    data_bounds = List().tag(sync=True)
+    max_level_points = Int(default_value=DEFAULT_MAX_LEVEL_POINTS, min=1)
+    _encoded_traits = ['levels']
+
+    def set_data(self, locations, weights=None):
+        """
+        Aggregate points into the levels of the pyramid
+
+        :param locations:
+            Iterable of (latitude, longitude) pairs, in any of the formats
+            accepted by :func:`gmaps.heatmap_layer`.
+
+        :param weights:
+            Iterable of non-negative weights of the same length as
+            `locations`, or None to give every point the same weight.
+        """
+        locations = locations_to_array(locations)
+        levels = pyramid_aggregate(
+            locations, weights, self.max_level_points)
+        with self.hold_sync():
+            self.levels = [
+                {'zoom': zoom, 'locations': level_locations,
+                 'weights': level_weights}
+                for (zoom, level_locations, level_weights) in levels
+            ]
+            self.set_bounds(locations)
+
+
+@doc_subst(_doc_snippets)
+class TiledHeatmap(GMapsWidgetMixin, widgets.Widget):
+    """
+    Heatmap rendered as image tiles in the kernel.
+
+    The points stay in the kernel, which renders PNG tiles of the
+    heatmap as the map requests them. Only the tiles that the map
+    shows are sent to the browser, so this scales to datasets with
+    hundreds of millions of points. Rendered tiles are cached, so
+    panning back to a region already viewed is instantaneous.
+
+    You should not instantiate this directly. Instead, use the
+    :func:`gmaps.heatmap_tile_layer` factory function.
+
+    The ``cache_hits``, ``cache_misses`` and ``cache_bytes`` attributes
+    report how well the tile cache is doing, which can help choose
+    ``max_cache_bytes``.
+
+    :Examples:
+
+    >>> heatmap = gmaps.heatmap_tile_layer(locations)
+    >>> heatmap.point_radius = 5
+
+    To replace the data in the heatmap:
+
+    >>> heatmap.set_data(new_locations, new_weights)
+
+    To keep rendered tiles between sessions:
+
+    >>> heatmap.tile_store = 'heatmap-tiles.mbtiles'
+    """
+    has_bounds = True
+    _view_name = Unicode('TiledHeatmapLayerView').tag(sync=True)
+    _model_name = Unicode('TiledHeatmapLayerModel').tag(sync=True)
+
+    max_intensity = Float(default_value=None, allow_none=True).tag(sync=True)
+    point_radius = Int(
+        default_value=10, min=1, max=tiles.TILE_SIZE).tag(sync=True)
+    opacity = Float(default_value=0.6, min=0.0, max=1.0).tag(sync=True)
+    gradient = List(
+        trait=geotraitlets.ColorAlpha(), allow_none=True, minlen=1
+    ).tag(sync=True)
+    data_bounds = List().tag(sync=True)
+    max_cache_bytes = Int(default_value=DEFAULT_MAX_BYTES, min=0)
+    tile_store = Unicode(default_value=None, allow_none=True)
+    cache_hits = Int(0, read_only=True)
+    cache_misses = Int(0, read_only=True)
+    cache_bytes = Int(0, read_only=True)
+
+    def __init__(self, locations, weights=None, **kwargs):
+        self._tile_cache = TileCache(self.max_cache_bytes)
+        self._point_index = None
+        super(TiledHeatmap, self).__init__(**kwargs)
+        self.set_data(locations, weights)
+        self.on_msg(self._handle_message)
+
+    @default('gradient')
+    def _default_gradient(self):
+        return None
+
+    @observe('max_cache_bytes')
+    def _resize_cache(self, change):
+        self._tile_cache.resize(change['new'])
+        self._update_cache_statistics()
+
+    @observe('tile_store')
+    def _open_tile_store(self, change):
+        if self._tile_cache.store is not None:
+            self._tile_cache.store.close()
+        path = change['new']
+        self._tile_cache.store = None if path is None else MBTilesStore(path)
+
+    def set_data(self, locations, weights=None):
+        """
+        Replace the points in the heatmap
+
+        :param locations:
+            Iterable of (latitude, longitude) pairs, in any of the formats
+            accepted by :func:`gmaps.heatmap_tile_layer`.
+
+        :param weights:
+            Iterable of non-negative weights of the same length as
+            `locations`, or None to give every point the same weight.
+        """
+        locations = locations_to_array(locations)
+        _validate_location_columns(locations[:, 0], locations[:, 1])
+        weights = _validate_weight_column(weights, len(locations))
+        is_new_data = self._point_index is not None
+        self._point_index = tiles.TilePointIndex(locations, weights)
+        self._data_fingerprint = None
+        # Densest areas, by zoom level and point radius
+        self._max_densities = {}
+        self._tile_cache.clear()
+        self._update_cache_statistics()
+        self.data_bounds = bounds.BoundsAccumulator.from_locations(
+            locations).bounds()
+        if is_new_data:
+            self.send({'event': 'TILES_CHANGED', 'payload': {}})
+
+    def render_tile(self, zoom, x, y):
+        """
+        Render the tile at column `x` and row `y` at a zoom level
+
+        :returns:
+            The tile as a PNG image, or None if the tile is empty.
+        """
+        number_tiles = 2 ** zoom
+        if not 0 <= y < number_tiles:
+            return None
+        x = x % number_tiles
+        key = (zoom, x, y, self._style_key())
+        tile = self._tile_cache.get(key)
+        if tile is None:
+            tile = self._render_tile(zoom, x, y)
+            # Empty tiles are cached as empty strings
+            self._tile_cache.put(key, tile or b'')
+        self._update_cache_statistics()
+        return tile or None
+
+    def _render_tile(self, zoom, x, y):
+        pixel_x, pixel_y, weights = self._point_index.points_near_tile(
+            zoom, x, y, self.point_radius)
+        if not len(weights) or not weights.any():
+            return None
+        max_intensity = self.max_intensity
+        if max_intensity is None:
+            max_intensity = self._max_density(zoom)
+        colormap = tiles.gradient_colormap(
+            self.gradient or tiles.DEFAULT_GRADIENT)
+        rgba = tiles.render_heatmap_tile(
+            pixel_x, pixel_y, weights, self.point_radius, max_intensity,
+            colormap)
+        return tiles.encode_png(rgba)
+
+    def _max_density(self, zoom):
+        # The hottest color corresponds to the densest area at the
+        # current zoom level, so that tiles at the same zoom level
+        # share the same scale.
+        key = (zoom, self.point_radius)
+        if key not in self._max_densities:
+            self._max_densities[key] = self._point_index.max_density(
+                zoom, self.point_radius)
+        return self._max_densities[key]
+
+    def _style_key(self):
+        # Tiles persisted in a tile store must not be reused for other
+        # data, so the key then includes a fingerprint of the data.
+        # Tiles in memory are dropped when the data changes, so they do
+        # not need one.
+        if self._tile_cache.store is None:
+            data_fingerprint = None
+        else:
+            if self._data_fingerprint is None:
+                self._data_fingerprint = self._point_index.fingerprint()
+            data_fingerprint = self._data_fingerprint
+        return repr((
+            data_fingerprint, self.point_radius, self.max_intensity,
+            self.gradient
+        ))
+
+    def _update_cache_statistics(self):
+        self.set_trait('cache_hits', self._tile_cache.hits)
+        self.set_trait('cache_misses', self._tile_cache.misses)
+        self.set_trait('cache_bytes', self._tile_cache.size_bytes)
+
+    def _handle_message(self, _, content, buffers):
+        if content.get('event') == 'TILE_REQUESTED':
+            payload = content['payload']
+            tile = self.render_tile(
+                payload['zoom'], payload['x'], payload['y'])
+            message = {
+                'event': 'TILE_RENDERED',
+                'payload': {
+                    'requestId': payload['requestId'],
+                    'isEmpty': tile is None
+                }
+            }
+            self.send(message, buffers=[] if tile is None else [tile])
+
+
+def _heatmap_style_options(
+        max_intensity, dissipating, point_radius, opacity, gradient,
+        data_encoding):
+    return {
         'max_intensity': max_intensity,
         'dissipating': dissipating,
         'point_radius': point_radius,
         'opacity': opacity,
-        'gradient': gradient
+        'gradient': gradient,
+        'data_encoding': data_encoding
     }
+
+
+def _heatmap_options(
+        locations, weights, max_intensity, dissipating, point_radius,
+        opacity, gradient, data_encoding, max_points):
+    options = _heatmap_style_options(
+        max_intensity, dissipating, point_radius, opacity, gradient,
+        data_encoding)
+    options['max_points'] = max_points
     if weights is None:
         is_weighted = False
         widget_args = {'locations': locations}
@@ -220,7 +699,9 @@ def _heatmap_options(
 def heatmap_layer(
         locations, weights=None, max_intensity=None,
         dissipating=True, point_radius=None,
-        opacity=0.6, gradient=None):
+        opacity=0.6, gradient=None, data_encoding='json', max_points=None,
+        viewport_only=False, aggregate=None, cell_size=None,
+        grid_type='mercator', max_level_points=DEFAULT_MAX_LEVEL_POINTS):
     """
     Create a heatmap layer.
 
@@ -249,6 +730,30 @@ def heatmap_layer(
     >>> heatmap.gradient = ['white', 'gray']
     >>> fig.add_layer(heatmap)
 
+    For large datasets, send the data to the browser as binary buffers:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, data_encoding='float32')
+
+    To show a live feed of points, keeping only the most recent ones:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, max_points=1000)
+    >>> heatmap.extend(new_locations)
+
+    For datasets covering a large area, only send the points that are
+    visible on the map:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, viewport_only=True)
+
+    For datasets with millions of points, aggregate the points into a
+    grid in Python and only send one weighted point per grid cell:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, aggregate='grid')
+
+    To keep the heatmap detailed as the user zooms in, aggregate the
+    points at every zoom level and let the browser pick the right one:
+
+    >>> heatmap = gmaps.heatmap_layer(locations, aggregate='pyramid')
+
     {locations}
 
     :param weights:
@@ -258,14 +763,187 @@ def heatmap_layer(
 
     {options}
 
+    :param viewport_only:
+        If True, the full dataset stays in the kernel and only the
+        points in or near the map's current viewport are sent to the
+        browser. The points are updated as the user pans and zooms. The
+        ``locations`` and ``weights`` attributes of the heatmap then
+        only hold the visible points. This requires numpy and is
+        incompatible with ``max_points``. Defaults to False.
+    :type viewport_only: bool, optional
+
+    :param aggregate:
+        If 'grid', the points are binned into a grid, and the heatmap
+        contains one point per non-empty grid cell, at the weighted
+        centroid of the points in the cell and weighted by their total
+        weight. This always returns a :class:`gmaps.WeightedHeatmap`.
+        If 'pyramid', the points are binned into a grid for each zoom
+        level, and the browser shows the grid for the current zoom.
+        This returns a :class:`gmaps.HeatmapPyramid`, and is
+        incompatible with ``max_points`` and ``viewport_only``.
+        Both require numpy. Defaults to None, meaning the points are
+        sent to the browser as they are.
+    :type aggregate: str, optional
+
+    :param cell_size:
+        Width of the grid cells when ``aggregate`` is 'grid', in degrees
+        of longitude. By default, this is chosen so that the bounds of
+        the data are 200 cells across.
+    :type cell_size: float, optional
+
+    :param grid_type:
+        Type of grid when ``aggregate`` is 'grid'. Either 'mercator',
+        for cells that are square on the map, or 'latlng', for cells
+        that are square in latitude and longitude. Defaults to
+        'mercator'.
+    :type grid_type: str, optional
+
+    :param max_level_points:
+        Maximum number of points in each level when ``aggregate`` is
+        'pyramid'. Defaults to 50000.
+    :type max_level_points: int, optional
+
     :returns:
-        A :class:`gmaps.Heatmap` or a :class:`gmaps.WeightedHeatmap` widget.
+        A :class:`gmaps.Heatmap`, :class:`gmaps.WeightedHeatmap` or
+        :class:`gmaps.HeatmapPyramid` widget.
     """
+    if aggregate == 'pyramid':
+        if max_points is not None or viewport_only:
+            raise ValueError(
+                "max_points and viewport_only cannot be used with "
+                "aggregate='pyramid'")
+        heatmap = HeatmapPyramid(
+            max_level_points=max_level_points,
+            **_heatmap_style_options(
+                max_intensity, dissipating, point_radius, opacity,
+                gradient, data_encoding)
+        )
+        heatmap.set_data(locations, weights)
+        return heatmap
+    elif aggregate == 'grid':
+        locations, weights = grid_aggregate(
+            locations, weights, cell_size, grid_type)
+    elif aggregate is not None:
+        raise ValueError(
+            "{} is not a valid aggregation. "
+            "Expected 'grid', 'pyramid' or None".format(aggregate))
     widget_args, is_weighted = _heatmap_options(
         locations, weights, max_intensity, dissipating, point_radius,
-        opacity, gradient
+        opacity, gradient, data_encoding, max_points
     )
-    if is_weighted:
-        return WeightedHeatmap(**widget_args)
-    else:
-        return Heatmap(**widget_args)
+    heatmap_class = WeightedHeatmap if is_weighted else Heatmap
+    if viewport_only:
+        if max_points is not None:
+            raise ValueError(
+                'max_points cannot be used with viewport_only=True')
+        return _viewport_heatmap(heatmap_class, widget_args)
+    return heatmap_class(**widget_args)
+
+
+def _viewport_heatmap(heatmap_class, widget_args):
+    """
+    Create a heatmap that only holds the points visible in the viewport
+
+    Before the map reports its viewport, we show the points within the
+    data bounds, since this is where the map is initially centered.
+    """
+    locations = widget_args.pop('locations')
+    columns = {}
+    if 'weights' in widget_args:
+        columns['weights'] = widget_args.pop('weights')
+    viewport_data = ViewportData(locations, **columns)
+    accumulator = bounds.BoundsAccumulator.from_locations(
+        viewport_data.locations)
+    data_bounds = accumulator.bounds()
+    visible_locations, visible_columns = viewport_data.visible(
+        data_bounds, padding=0.0)
+    if not len(visible_locations):
+        visible_locations = viewport_data.locations[:1]
+        visible_columns = {
+            name: values[:1]
+            for name, values in viewport_data.columns.items()
+        }
+    widget_args.update(visible_columns)
+    heatmap = heatmap_class(
+        locations=visible_locations, viewport_only=True, **widget_args)
+    heatmap._viewport_data = viewport_data
+    heatmap._bounds_accumulator = accumulator
+    heatmap.data_bounds = data_bounds
+    return heatmap
+
+
+def heatmap_tile_layer(
+        locations, weights=None, max_intensity=None, point_radius=10,
+        opacity=0.6, gradient=None, max_cache_bytes=DEFAULT_MAX_BYTES,
+        tile_store=None):
+    """
+    Create a heatmap layer rendered as image tiles in the kernel.
+
+    This returns a :class:`gmaps.TiledHeatmap` object that can be added
+    to a :class:`gmaps.Figure`. Unlike :func:`gmaps.heatmap_layer`, the
+    points are never sent to the browser. Instead, the kernel renders
+    the tiles of the heatmap that the map needs, as PNG images. Use
+    this for datasets too large for the browser, even after
+    aggregation. This requires numpy.
+
+    :Examples:
+
+    >>> fig = gmaps.figure()
+    >>> heatmap = gmaps.heatmap_tile_layer(locations)
+    >>> fig.add_layer(heatmap)
+
+    :param locations:
+        Iterable of (latitude, longitude) pairs, in any of the formats
+        accepted by :func:`gmaps.heatmap_layer`.
+
+    :param weights:
+        Iterable of non-negative weights of the same length as
+        `locations`. Defaults to None, meaning every point has the same
+        weight.
+    :type weights: iterable of floats, optional
+
+    :param max_intensity:
+        Intensity that corresponds to the hottest color in the gradient.
+        An isolated point has an intensity equal to its weight. By
+        default, the hottest color corresponds to the densest area of
+        the dataset at each zoom level.
+    :type max_intensity: float, optional
+
+    :param point_radius:
+        Radius of influence of each point, in pixels. Defaults to 10.
+    :type point_radius: int, optional
+
+    :param opacity:
+        The opacity of the heatmap layer. Defaults to 0.6.
+    :type opacity: float, optional
+
+    :param gradient:
+        The color gradient for the heatmap, as a list of colors, from the
+        color for the lowest intensities to the color for the highest.
+        The first color is usually transparent, e.g. ``(0, 0, 255, 0.0)``.
+        Colors can be specified as strings, RGB tuples or RGBA tuples, as
+        for :func:`gmaps.heatmap_layer`. Defaults to the gradient used by
+        Google Maps heatmaps.
+    :type gradient: list of colors, optional
+
+    :param max_cache_bytes:
+        Maximum total size, in bytes, of the rendered tiles kept in
+        memory. The least recently used tiles are dropped first.
+        Defaults to 64MB.
+    :type max_cache_bytes: int, optional
+
+    :param tile_store:
+        Path to an SQLite file, laid out like an MBTiles file, in which
+        to persist rendered tiles. Tiles rendered in previous sessions
+        for the same data and style are read from the file rather than
+        rendered again. Defaults to None, meaning tiles are only cached
+        in memory.
+    :type tile_store: str, optional
+
+    :returns:
+        A :class:`gmaps.TiledHeatmap` widget.
+    """
+    return TiledHeatmap(
+        locations, weights, max_intensity=max_intensity,
+        point_radius=point_radius, opacity=opacity, gradient=gradient,
+        max_cache_bytes=max_cache_bytes, tile_store=tile_store)
@@ -1,3 +1,8 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def locations_to_list(locations):
     """
@@ -6,7 +11,20 @@ def locations_to_list(locations):
     Layer widgets only accepts lists of tuples, but we want the user
     to be able to pass in any reasonable iterable. We therefore
     need to convert the iterable passed in.
+
+    Numpy arrays, dataframes, pyarrow tables and other objects that
+    expose an array interface are converted column by column, rather
+    than row by row.
     """
+    if _is_columnar(locations):
+        try:
+            latitudes, longitudes = _location_columns(locations)
+        except (TypeError, ValueError):
+            # Not two columns of floats: fall back to iterating
+            # over the rows, so the validation reports the bad row.
+            pass
+        else:
+            return list(zip(latitudes.tolist(), longitudes.tolist()))
     try:
         location_tuples = locations.itertuples()  # locations is a dataframe
         locations_as_list = [
@@ -21,6 +39,82 @@ def locations_to_list(locations):
     return locations_as_list
 
 
+def locations_to_array(locations):
+    """
+    Convert from a generic iterable of locations to a numpy array
+
+    This returns a contiguous array of floats of shape ``(n, 2)``,
+    where the first column contains latitudes and the second column
+    contains longitudes. Prefer this over :func:`locations_to_list`
+    for large datasets, since it avoids creating a Python tuple
+    for every location.
+
+    :raises ValueError:
+        if the locations cannot be interpreted as (latitude, longitude)
+        pairs of floats.
+    """
+    if np is None:
+        raise ImportError('locations_to_array requires numpy')
+    if _is_columnar(locations):
+        latitudes, longitudes = _location_columns(locations)
+        locations_array = np.empty((len(latitudes), 2), dtype=float)
+        locations_array[:, 0] = latitudes
+        locations_array[:, 1] = longitudes
+    else:
+        locations_array = np.array(list(locations), dtype=float)
+        if locations_array.size == 0:
+            locations_array = locations_array.reshape(0, 2)
+        _check_location_columns(locations_array)
+    return locations_array
+
+
+def _is_columnar(locations):
+    return np is not None and (
+        hasattr(locations, '__array__') or _is_arrow_table(locations)
+    )
+
+
+def _is_arrow_table(locations):
+    return hasattr(locations, 'num_columns') and hasattr(locations, 'column')
+
+
+def _location_columns(locations):
+    """
+    Extract latitude and longitude columns as numpy arrays of floats
+    """
+    if _is_arrow_table(locations):
+        _check_number_columns(locations.num_columns)
+        latitudes = np.asarray(locations.column(0), dtype=float)
+        longitudes = np.asarray(locations.column(1), dtype=float)
+    elif hasattr(locations, 'iloc'):
+        # pandas dataframe: extract each column separately to avoid
+        # upcasting mixed column types to a common type.
+        _check_number_columns(locations.shape[1])
+        latitudes = np.asarray(locations.iloc[:, 0], dtype=float)
+        longitudes = np.asarray(locations.iloc[:, 1], dtype=float)
+    else:
+        locations_array = np.asarray(locations, dtype=float)
+        _check_location_columns(locations_array)
+        latitudes = locations_array[:, 0]
+        longitudes = locations_array[:, 1]
+    return latitudes, longitudes
+
+
+def _check_location_columns(locations_array):
+    if locations_array.ndim != 2:
+        raise ValueError(
+            'Locations must be a two-dimensional array '
+            'of (latitude, longitude) pairs.')
+    _check_number_columns(locations_array.shape[1])
+
+
+def _check_number_columns(number_columns):
+    if number_columns != 2:
+        raise ValueError(
+            'Locations must have exactly two columns: '
+            'latitude and longitude. Got {} columns.'.format(number_columns))
+
+
 locations_docstring = """
     :param locations:
         Iterable of (latitude, longitude) pairs denoting a single point.
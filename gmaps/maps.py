@@ -1,7 +1,7 @@
 
 import ipywidgets as widgets
 from traitlets import (Unicode, default, List, Instance,
-                       observe, Dict, HasTraits, Enum, Union)
+                       observe, Dict, HasTraits, Enum, Union, Int)
 
 from .bounds import merge_longitude_bounds
 from .geotraitlets import Point, ZoomLevel, MapType, MouseHandling, Tilt
@@ -185,6 +185,17 @@ class Map(ConfigurationMixin, GMapsWidgetMixin, widgets.DOMWidget):
     You can also change this dynamically:
 
     >>> m.map_type = 'TERRAIN'
+
+    Once the map is displayed, ``current_bounds`` and ``current_zoom``
+    hold the viewport the user is looking at. They are updated when the
+    user stops panning or zooming. Layers that define an
+    ``update_viewport(bounds, zoom)`` method are called with the new
+    viewport, which lets them only send the data that is visible.
+
+    >>> m.current_bounds
+    [(46.1, 5.9), (46.3, 6.3)]
+    >>> m.current_zoom
+    11
     """
     _view_name = Unicode('PlainmapView').tag(sync=True)
     _model_name = Unicode('PlainmapModel').tag(sync=True)
@@ -196,10 +207,39 @@ class Map(ConfigurationMixin, GMapsWidgetMixin, widgets.DOMWidget):
     map_type = MapType('ROADMAP').tag(sync=True)
     tilt = Tilt().tag(sync=True)
     mouse_handling = MouseHandling('COOPERATIVE').tag(sync=True)
+    current_bounds = List(
+        default_value=None, allow_none=True).tag(sync=True)
+    current_zoom = Int(default_value=None, allow_none=True).tag(sync=True)
 
     def add_layer(self, layer):
         self.layers = tuple([l for l in self.layers] + [layer])
 
+    @observe('current_bounds', 'current_zoom')
+    def _current_viewport_changed(self, change):
+        # Both traits normally change in the same message from the
+        # front-end, so make sure we only notify the layers once.
+        viewport = (self.current_bounds, self.current_zoom)
+        if viewport != getattr(self, '_notified_viewport', None):
+            self._notified_viewport = viewport
+            self._update_layer_viewports(self.layers)
+
+    @observe('layers')
+    def _update_new_layer_viewports(self, change):
+        old_layers = change['old'] or []
+        new_layers = [
+            layer for layer in change['new'] if layer not in old_layers]
+        self._update_layer_viewports(new_layers)
+
+    def _update_layer_viewports(self, layers):
+        if self.current_bounds is None or self.current_zoom is None:
+            return
+        for layer in layers:
+            update_viewport = getattr(layer, 'update_viewport', None)
+            if update_viewport is not None:
+                update_viewport(
+                    [tuple(point) for point in self.current_bounds],
+                    self.current_zoom)
+
     @default('layout')
     def _default_layout(self):
         return widgets.Layout(height='400px', align_self='stretch')
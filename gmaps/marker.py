@@ -1,17 +1,22 @@
 
 import ipywidgets as widgets
-from traitlets import Unicode, Int, List, observe, HasTraits, Bool
+from traitlets import (
+    Unicode, Int, List, observe, HasTraits, Bool, Enum, Union, TraitError
+)
 
 import gmaps.geotraitlets as geotraitlets
 import gmaps.bounds as bounds
 
+from .colormaps import MappedColors
 from .maps import DEFAULT_CENTER, GMapsWidgetMixin
 from .locations import locations_to_list
 from .options import merge_option_dicts, is_atomic, is_color_atomic
+from .serialization import ALLOWED_ENCODINGS, array_to_json
+from .viewport import ViewportData, ViewportLayerMixin
 from ._docutils import doc_subst
 
 __all__ = [
-    'Symbol', 'Marker', 'Markers', 'MarkerOptions',
+    'Symbol', 'Marker', 'Markers', 'CompactMarkers', 'MarkerOptions',
     'marker_layer', 'symbol_layer'
 ]
 
@@ -42,6 +47,39 @@ _doc_snippets['marker_options'] = """
 """
 
 
+_doc_snippets['clustering_options'] = """
+    :param cluster:
+        Whether to group nearby markers into clusters. Each cluster is
+        drawn as a single icon showing the number of markers it
+        contains. Clusters are recomputed as the user zooms in or out,
+        and zooming in far enough splits them into individual markers.
+        Clustering is much faster than drawing every marker for
+        layers with many thousands of markers. Defaults to False.
+    :type cluster: boolean, optional
+
+    :param cluster_radius:
+        Size, in pixels, of the grid cells used to group markers into
+        clusters. Larger values give fewer, bigger clusters.
+        Defaults to 60.
+    :type cluster_radius: int, optional
+
+    :param cluster_max_zoom:
+        Zoom level above which markers are no longer clustered.
+        Defaults to 15.
+    :type cluster_max_zoom: int, optional
+"""
+
+
+_doc_snippets['viewport_only'] = """
+    :param viewport_only:
+        If True, the full dataset stays in the kernel and only the
+        markers in or near the map's current viewport are sent to the
+        browser. The markers are updated as the user pans and zooms.
+        This requires ``compact=True`` and numpy. Defaults to False.
+    :type viewport_only: boolean, optional
+"""
+
+
 _doc_snippets['marker_examples'] = """
     >>> fig = gmaps.figure()
     >>> locations = [
@@ -127,6 +165,12 @@ class MarkerOptions(HasTraits):
         return new_marker
 
 
+class _MarkerClusteringMixin(HasTraits):
+    cluster = Bool(False).tag(sync=True)
+    cluster_radius = Int(default_value=60, min=1).tag(sync=True)
+    cluster_max_zoom = geotraitlets.ZoomLevel(15).tag(sync=True)
+
+
 class _BaseMarkerMixin(HasTraits):
     location = geotraitlets.Point(DEFAULT_CENTER).tag(sync=True)
     hover_text = Unicode('').tag(sync=True)
@@ -193,7 +237,7 @@ class Marker(GMapsWidgetMixin, _BaseMarkerMixin, widgets.Widget):
 
 
 @doc_subst(_doc_snippets)
-class Markers(GMapsWidgetMixin, widgets.Widget):
+class Markers(GMapsWidgetMixin, _MarkerClusteringMixin, widgets.Widget):
     """
     Marker and symbol layer
 
@@ -208,6 +252,8 @@ class Markers(GMapsWidgetMixin, widgets.Widget):
     :type markers: list of :class:`gmaps.Marker` and
         :class:`gmaps.Symbol` objects.
 
+    {clustering_options}
+
     :Examples:
 
     {marker_examples}
@@ -228,19 +274,319 @@ class Markers(GMapsWidgetMixin, widgets.Widget):
     def _calc_bounds(self, change):
         markers = change['new']
         if markers:
-            locations = [marker.location for marker in markers]
-            latitudes = [location[0] for location in locations]
-            longitudes = [location[1] for location in locations]
-            min_latitude, max_latitude = bounds.latitude_bounds(latitudes)
-            min_longitude, max_longitude = bounds.longitude_bounds(longitudes)
-            self.data_bounds = [
-                (min_latitude, min_longitude),
-                (max_latitude, max_longitude)
-            ]
+            self._update_bounds_accumulator(markers)
+            self.data_bounds = self._bounds_accumulator.bounds()
+            self.has_bounds = True
+        else:
+            self._bounds_locations = {}
+            self._bounds_accumulator = None
+            self.has_bounds = False
+
+    def _update_bounds_accumulator(self, markers):
+        # Maps each marker in the bounds to the locations it contributed,
+        # once for every time it appears in the list, since markers can
+        # be moved after being added.
+        previous_locations = getattr(self, '_bounds_locations', {})
+        counts = {}
+        for marker in markers:
+            counts[marker] = counts.get(marker, 0) + 1
+        added = []
+        removed = []
+        for marker in set(counts).union(previous_locations):
+            old_locations = previous_locations.get(marker, [])
+            count = counts.get(marker, 0)
+            location = marker.location if count else None
+            if all(old_location == location
+                   for old_location in old_locations):
+                # Only the number of copies of the marker changed
+                removed.extend(old_locations[count:])
+                added.extend([location] * (count - len(old_locations)))
+            else:
+                removed.extend(old_locations)
+                added.extend([location] * count)
+        if len(added) + len(removed) < len(markers):
+            # Cheaper to update the bounds incrementally
+            self._bounds_accumulator.remove(removed)
+            self._bounds_accumulator.add(added)
+        else:
+            self._bounds_accumulator = bounds.BoundsAccumulator()
+            self._bounds_accumulator.add(
+                [marker.location for marker in markers])
+        self._bounds_locations = {
+            marker: [marker.location] * count
+            for (marker, count) in counts.items()
+        }
+
+
+class _StyleColumn(Union):
+    """
+    Style option for every marker in a :class:`gmaps.CompactMarkers` layer
+
+    This is either a single value, which applies to every marker, or a
+    list with one value per marker. Lists usually contain a handful of
+    distinct values, e.g. a few colors, so each distinct value is only
+    validated once.
+    """
+    def __init__(self, trait, **metadata):
+        super(_StyleColumn, self).__init__([trait, List(trait)], **metadata)
+
+    def validate(self, obj, value):
+        value_trait = self.trait_types[0]
+        try:
+            return value_trait._validate(obj, value)
+        except TraitError:
+            if not isinstance(value, (list, tuple)):
+                self.error(obj, value)
+        return self._validate_column(obj, value)
+
+    def _validate_column(self, obj, values):
+        value_trait = self.trait_types[0]
+        validated_values = {}
+        column = []
+        for row, value in enumerate(values):
+            try:
+                # Include the type, since e.g. True == 1
+                key = (type(value), value)
+                validated_value = validated_values.get(key)
+                if validated_value is None:
+                    validated_value = value_trait._validate(obj, value)
+                    validated_values[key] = validated_value
+            except TypeError:
+                # Unhashable values, e.g. colors given as lists
+                validated_value = value_trait._validate(obj, value)
+            except TraitError:
+                raise TraitError(
+                    'Invalid value {!r} in row {} of the {!r} trait'.format(
+                        value, row, self.name))
+            column.append(validated_value)
+        return column
+
+
+class _ColorStyleColumn(_StyleColumn):
+    """
+    Style column of colors, which can also be a
+    :class:`gmaps.MappedColors` instance
+    """
+    def validate(self, obj, value):
+        if isinstance(value, MappedColors):
+            return value
+        return super(_ColorStyleColumn, self).validate(obj, value)
+
+
+def _color_column_to_json(value, widget):
+    if isinstance(value, MappedColors):
+        return value.to_json()
+    return value
+
+
+# Style options of compact marker layers, as a single value shared by
+# every marker or as a list with one value per marker.
+class _CompactMarkerStyleMixin(HasTraits):
+    hover_text = _StyleColumn(Unicode('')).tag(sync=True)
+    display_info_box = _StyleColumn(Bool(False)).tag(sync=True)
+    info_box_content = _StyleColumn(Unicode('')).tag(sync=True)
+
+    # Only used by markers
+    label = _StyleColumn(Unicode('')).tag(sync=True)
+
+    # Only used by symbols
+    fill_color = _ColorStyleColumn(
+        geotraitlets.ColorAlpha(allow_none=True, default_value=None),
+        allow_none=True
+    ).tag(sync=True, to_json=_color_column_to_json)
+    fill_opacity = _StyleColumn(
+        geotraitlets.Opacity(default_value=1.0)).tag(sync=True)
+    stroke_color = _ColorStyleColumn(
+        geotraitlets.ColorAlpha(allow_none=True, default_value=None),
+        allow_none=True
+    ).tag(sync=True, to_json=_color_column_to_json)
+    stroke_opacity = _StyleColumn(
+        geotraitlets.Opacity(default_value=1.0)).tag(sync=True)
+    scale = _StyleColumn(Int(default_value=3, min=1)).tag(sync=True)
+
+
+@doc_subst(_doc_snippets)
+class CompactMarkers(
+        GMapsWidgetMixin, _CompactMarkerStyleMixin, _MarkerClusteringMixin,
+        ViewportLayerMixin, widgets.Widget):
+    """
+    Marker or symbol layer backed by arrays
+
+    Unlike :class:`gmaps.Markers`, which holds one widget per marker,
+    this layer stores the locations and styles of every marker in a
+    single widget. This makes it much faster to create and display
+    layers with many thousands of markers, at the cost of not being
+    able to change individual markers through their own widget.
+
+    Prefer instantiating this by passing ``compact=True`` to
+    :func:`gmaps.marker_layer` or :func:`gmaps.symbol_layer`.
+
+    Apart from ``locations``, each style option is either a single
+    value, in which case it applies to every marker, or a list with
+    one value per marker.
+
+    :Examples:
+
+    >>> fig = gmaps.figure()
+    >>> locations = [(46.1, 5.2), (46.2, 5.3), (46.3, 5.4)]
+    >>> markers = gmaps.marker_layer(
+            locations, hover_text=['A', 'B', 'C'], compact=True)
+    >>> fig.add_layer(markers)
+
+    To change the style of markers on an existing layer, set the
+    style columns:
+
+    >>> markers.label = ['1', '2', '3']
+
+    To edit markers individually, convert the layer to a
+    :class:`gmaps.Markers` layer:
+
+    >>> marker_layer = markers.to_markers()
+    >>> marker_layer.markers[0].label = 'X'
+
+    :param locations:
+        List of (latitude, longitude) pairs, one for each marker.
+
+    :param marker_type:
+        Either 'marker', to draw the default inverted droplet, or
+        'symbol', to draw a circle. Defaults to 'marker'.
+    :type marker_type: str, optional
+
+    :param data_encoding:
+        How to send the locations to the browser. One of 'json',
+        'float64' or 'float32'. See :func:`gmaps.heatmap_layer` for
+        details. Defaults to 'json'.
+    :type data_encoding: str, optional
+
+    {clustering_options}
+    """
+    _view_name = Unicode('CompactMarkerLayerView').tag(sync=True)
+    _model_name = Unicode('CompactMarkerLayerModel').tag(sync=True)
+
+    marker_type = Enum(
+        ['marker', 'symbol'], default_value='marker'
+    ).tag(sync=True)
+    locations = geotraitlets.LocationArray(
+        allow_none=False, default_value=[]
+    ).tag(sync=True, to_json=array_to_json)
+    data_encoding = Enum(
+        ALLOWED_ENCODINGS, default_value='json'
+    ).tag(sync=True)
+    data_bounds = List().tag(sync=True)
+
+    _marker_style_columns = ['hover_text', 'label']
+    _symbol_style_columns = [
+        'hover_text', 'fill_color', 'fill_opacity',
+        'stroke_color', 'stroke_opacity', 'scale'
+    ]
+
+    @observe('locations')
+    def _calc_bounds(self, change):
+        if self._viewport_data is not None:
+            # The bounds cover every marker, not just the visible ones
+            return
+        locations = change['new']
+        if locations:
+            self.data_bounds = bounds.BoundsAccumulator.from_locations(
+                locations).bounds()
             self.has_bounds = True
         else:
             self.has_bounds = False
 
+    def _show_visible_data(self, locations, columns):
+        with self.hold_sync():
+            self.locations = locations
+            for name, values in columns.items():
+                setattr(self, name, values.tolist())
+
+    def to_markers(self):
+        """
+        Convert to a :class:`gmaps.Markers` layer with one widget per marker
+
+        Use this to edit individual markers interactively. This is
+        slow for layers with many markers.
+        """
+        if self.marker_type == 'marker':
+            marker_class = Marker
+            column_names = self._marker_style_columns
+        else:
+            marker_class = Symbol
+            column_names = self._symbol_style_columns
+        column_names = column_names + [
+            'info_box_content', 'display_info_box']
+        number_markers = len(self.locations)
+        option_dicts = {
+            name: _broadcast_column(getattr(self, name), number_markers)
+            for name in column_names
+        }
+        option_dicts['location'] = self.locations
+        markers = [
+            marker_class(**options)
+            for options in merge_option_dicts(option_dicts)
+        ]
+        return Markers(markers=markers)
+
+
+def _broadcast_column(column, number_markers):
+    if isinstance(column, list):
+        return column
+    elif isinstance(column, MappedColors):
+        return column.to_list()
+    return [column] * number_markers
+
+
+def _compact_column(values, number_markers, name, atomic_check=is_atomic):
+    """
+    Convert a style option to a single value or a list of values
+    """
+    if isinstance(values, MappedColors):
+        number_values = len(values)
+    elif atomic_check(values):
+        return values
+    else:
+        # Convert numpy arrays and pandas series to native Python values
+        values = (
+            values.tolist() if hasattr(values, 'tolist') else list(values))
+        number_values = len(values)
+    if number_values != number_markers:
+        raise ValueError(
+            '{} must be a single value or a list of the same length '
+            'as locations. Expected {} values, got {}.'.format(
+                name, number_markers, number_values))
+    return values
+
+
+def _compact_info_box_options(
+        number_markers, info_box_content, display_info_box):
+    if is_atomic(info_box_content) and is_atomic(display_info_box):
+        return _resolve_info_box_kwargs(
+            info_box_content=info_box_content,
+            display_info_box=display_info_box
+        )
+    info_box_content = _compact_column(
+        info_box_content, number_markers, 'info_box_content')
+    display_info_box = _compact_column(
+        display_info_box, number_markers, 'display_info_box')
+    # Infer missing display_info_box values from the content, column by
+    # column rather than marker by marker.
+    if isinstance(display_info_box, list):
+        display_info_box = [
+            (content is not None) if display is None else display
+            for (content, display) in zip(
+                _broadcast_column(info_box_content, number_markers),
+                display_info_box)
+        ]
+    elif display_info_box is None:
+        display_info_box = [
+            content is not None for content in info_box_content]
+    info_box_content = [
+        '' if content is None else content for content in info_box_content
+    ] if isinstance(info_box_content, list) else (info_box_content or '')
+    return {
+        'info_box_content': info_box_content,
+        'display_info_box': display_info_box
+    }
+
 
 def _info_box_option_lists(number_markers, info_box_content, display_info_box):
     if is_atomic(info_box_content):
@@ -274,9 +620,13 @@ def _symbol_layer_options(
         hover_text = [hover_text] * number_markers
     if is_atomic(scale):
         scale = [scale] * number_markers
-    if is_color_atomic(fill_color):
+    if isinstance(fill_color, MappedColors):
+        fill_color = fill_color.to_list()
+    elif is_color_atomic(fill_color):
         fill_color = [fill_color] * number_markers
-    if is_color_atomic(stroke_color):
+    if isinstance(stroke_color, MappedColors):
+        stroke_color = stroke_color.to_list()
+    elif is_color_atomic(stroke_color):
         stroke_color = [stroke_color] * number_markers
     if is_atomic(stroke_opacity):
         stroke_opacity = [stroke_opacity] * number_markers
@@ -325,10 +675,73 @@ def _marker_layer_options(
     return merge_option_dicts(marker_options)
 
 
+def _compact_layer(
+        marker_type, locations, info_box_content, display_info_box,
+        clustering_options, viewport_only, style_options,
+        color_options=None):
+    number_markers = len(locations)
+    options = {
+        name: _compact_column(values, number_markers, name)
+        for name, values in style_options.items()
+    }
+    for name, values in (color_options or {}).items():
+        options[name] = _compact_column(
+            values, number_markers, name, atomic_check=is_color_atomic)
+    options.update(_compact_info_box_options(
+        number_markers, info_box_content, display_info_box))
+    options.update(clustering_options)
+    if viewport_only:
+        return _viewport_compact_layer(marker_type, locations, options)
+    return CompactMarkers(
+        marker_type=marker_type, locations=locations, **options)
+
+
+def _viewport_compact_layer(marker_type, locations, options):
+    """
+    Create a compact layer that only holds the markers in the viewport
+
+    Before the map reports its viewport, we show the markers within
+    the data bounds, since this is where the map is initially centered.
+    """
+    columns = {
+        name: _broadcast_column(values, len(locations))
+        for name, values in options.items()
+        if isinstance(values, (list, MappedColors))
+    }
+    # Validate the options for every marker before keeping them aside
+    validated_columns = _CompactMarkerStyleMixin(**columns)
+    columns = {
+        name: getattr(validated_columns, name) for name in columns
+    }
+    viewport_data = ViewportData(locations, **columns)
+    if len(viewport_data):
+        data_bounds = bounds.BoundsAccumulator.from_locations(
+            viewport_data.locations).bounds()
+        visible_locations, visible_columns = viewport_data.visible(
+            data_bounds, padding=0.0)
+    else:
+        data_bounds = []
+        visible_locations, visible_columns = viewport_data.visible(
+            ((-90.0, -180.0), (90.0, 180.0)))
+    options.update({
+        name: values.tolist() for name, values in visible_columns.items()
+    })
+    layer = CompactMarkers(
+        marker_type=marker_type, locations=visible_locations,
+        viewport_only=True, **options)
+    layer._viewport_data = viewport_data
+    layer.data_bounds = data_bounds
+    layer.has_bounds = bool(data_bounds)
+    return layer
+
+
+@doc_subst(_doc_snippets)
 def symbol_layer(
         locations, hover_text='', fill_color=None,
         fill_opacity=1.0, stroke_color=None, stroke_opacity=1.0,
-        scale=3, info_box_content=None, display_info_box=None):
+        scale=3, info_box_content=None, display_info_box=None,
+        compact=False, cluster=False, cluster_radius=60,
+        cluster_max_zoom=15, viewport_only=False):
     """
     Symbol layer
 
@@ -398,6 +811,13 @@ def symbol_layer(
 
     >>> symbol_layer.markers[0].scale = 5
 
+    Creating a widget for every symbol is slow for large numbers of
+    symbols. Pass ``compact=True`` to store every symbol in a single
+    :class:`gmaps.CompactMarkers` widget instead:
+
+    >>> symbol_layer = gmaps.symbol_layer(
+            locations, fill_color='red', compact=True)
+
     :param locations:
         List of (latitude, longitude) pairs
         denoting a single point. Latitudes are expressed as
@@ -423,8 +843,10 @@ def symbol_layer(
         same length as ``locations``.
         Colors can be specified as a simple string, e.g. 'blue',
         as an RGB tuple, e.g. (100, 0, 0), or as an RGBA tuple, e.g.
-        (100, 0, 0, 0.5).
-    :type fill_color: single color or list of colors, optional
+        (100, 0, 0, 0.5). To color symbols by a numeric value, pass
+        the output of :func:`gmaps.colormap`.
+    :type fill_color: single color, list of colors or
+        :class:`gmaps.MappedColors`, optional
 
     :param fill_opacity:
         The opacity of the fill color. The opacity should be a float
@@ -439,8 +861,10 @@ def symbol_layer(
         same length as ``locations``.
         Colors can be specified as a simple string, e.g. 'blue',
         as an RGB tuple, e.g. (100, 0, 0), or as an RGBA tuple, e.g.
-        (100, 0, 0, 0.5).
-    :type stroke_color: single color or list of colors, optional
+        (100, 0, 0, 0.5). To color symbols by a numeric value, pass
+        the output of :func:`gmaps.colormap`.
+    :type stroke_color: single color, list of colors or
+        :class:`gmaps.MappedColors`, optional
 
     :param stroke_opacity:
         The opacity of the stroke color. The opacity should be a float
@@ -471,21 +895,58 @@ def symbol_layer(
         is set, and False otherwise.
     :type display_info_box: boolean or list of booleans, optional
 
+    :param compact:
+        Whether to store the symbols in a single
+        :class:`gmaps.CompactMarkers` widget, rather than creating
+        a :class:`gmaps.Symbol` widget for every symbol. This is
+        much faster for large numbers of symbols, but the symbols
+        cannot be edited individually. Defaults to False.
+    :type compact: boolean, optional
+
+    {clustering_options}
+
+    {viewport_only}
+
     :returns:
-        A :class:`gmaps.Markers` instance.
+        A :class:`gmaps.Markers` instance, or a
+        :class:`gmaps.CompactMarkers` instance if ``compact`` is True.
     """
+    clustering_options = {
+        'cluster': cluster,
+        'cluster_radius': cluster_radius,
+        'cluster_max_zoom': cluster_max_zoom
+    }
+    if viewport_only and not compact:
+        raise ValueError('viewport_only requires compact=True')
+    if compact:
+        return _compact_layer(
+            'symbol', locations, info_box_content, display_info_box,
+            clustering_options, viewport_only,
+            style_options={
+                'hover_text': hover_text,
+                'fill_opacity': fill_opacity,
+                'stroke_opacity': stroke_opacity,
+                'scale': scale
+            },
+            color_options={
+                'fill_color': fill_color,
+                'stroke_color': stroke_color
+            }
+        )
     options = _symbol_layer_options(
         locations, hover_text, fill_color,
         fill_opacity, stroke_color, stroke_opacity, scale,
         info_box_content, display_info_box)
     symbols = [Symbol(**option) for option in options]
-    return Markers(markers=symbols)
+    return Markers(markers=symbols, **clustering_options)
 
 
 @doc_subst(_doc_snippets)
 def marker_layer(
         locations, hover_text='', label='',
-        info_box_content=None, display_info_box=None):
+        info_box_content=None, display_info_box=None, compact=False,
+        cluster=False, cluster_radius=60, cluster_max_zoom=15,
+        viewport_only=False):
     """
     Marker layer
 
@@ -503,6 +964,12 @@ def marker_layer(
 
     >>> marker_layer.markers[0].label = 'C'  # markers[0] is a Marker
 
+    Creating a widget for every marker is slow for large numbers of
+    markers. Pass ``compact=True`` to store every marker in a single
+    :class:`gmaps.CompactMarkers` widget instead:
+
+    >>> marker_layer = gmaps.marker_layer(locations, compact=True)
+
     :param locations:
         List of (latitude, longitude) pairs
         denoting a single point. Latitudes are expressed as
@@ -547,10 +1014,36 @@ def marker_layer(
         is set, and False otherwise.
     :type display_info_box: boolean or list of booleans, optional
 
+    :param compact:
+        Whether to store the markers in a single
+        :class:`gmaps.CompactMarkers` widget, rather than creating
+        a :class:`gmaps.Marker` widget for every marker. This is
+        much faster for large numbers of markers, but the markers
+        cannot be edited individually. Defaults to False.
+    :type compact: boolean, optional
+
+    {clustering_options}
+
+    {viewport_only}
+
     :returns:
-        A :class:`gmaps.Markers` instance.
+        A :class:`gmaps.Markers` instance, or a
+        :class:`gmaps.CompactMarkers` instance if ``compact`` is True.
     """
+    clustering_options = {
+        'cluster': cluster,
+        'cluster_radius': cluster_radius,
+        'cluster_max_zoom': cluster_max_zoom
+    }
+    if viewport_only and not compact:
+        raise ValueError('viewport_only requires compact=True')
+    if compact:
+        return _compact_layer(
+            'marker', locations, info_box_content, display_info_box,
+            clustering_options, viewport_only,
+            style_options={'hover_text': hover_text, 'label': label}
+        )
     marker_options = _marker_layer_options(
         locations, hover_text, label, info_box_content, display_info_box)
     markers = [Marker(**option) for option in marker_options]
-    return Markers(markers=markers)
+    return Markers(markers=markers, **clustering_options)
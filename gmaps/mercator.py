@@ -0,0 +1,88 @@
+"""
+Web Mercator projection, as used by Google Maps
+
+World coordinates run from 0 to 1 in both directions, with (0, 0) at
+the top left corner of the map (85.05 degrees north, 180 degrees west).
+At zoom level `z`, the whole world is ``TILE_SIZE * 2**z`` pixels wide.
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TILE_SIZE = 256
+
+# Latitudes beyond this are outside the square Web Mercator world
+MAX_LATITUDE = 85.0511287798
+
+
+def world_coordinates(latitudes, longitudes):
+    """
+    Project arrays of latitudes and longitudes to world coordinates
+
+    :returns: a tuple ``(x, y)`` of numpy arrays with values in [0, 1].
+    """
+    latitudes = np.clip(
+        np.asarray(latitudes, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    longitudes = np.asarray(longitudes, dtype=float)
+    x = (longitudes + 180.0) / 360.0
+    sin_latitudes = np.sin(np.radians(latitudes))
+    y = 0.5 - np.log(
+        (1.0 + sin_latitudes) / (1.0 - sin_latitudes)) / (4.0 * math.pi)
+    return x, y
+
+
+def world_to_latitudes(y):
+    """
+    Inverse projection of world y-coordinates to latitudes
+    """
+    y = np.asarray(y, dtype=float)
+    return np.degrees(np.arctan(np.sinh(math.pi * (1.0 - 2.0 * y))))
+
+
+def world_to_longitudes(x):
+    """
+    Inverse projection of world x-coordinates to longitudes
+    """
+    return np.asarray(x, dtype=float) * 360.0 - 180.0
+
+
+def world_size(zoom):
+    """
+    Width of the world, in pixels, at a given zoom level
+    """
+    return TILE_SIZE * 2 ** zoom
+
+
+def zorder_keys(columns, rows):
+    """
+    Keys that sort cells of a grid along a Z-order curve
+
+    Interleaving the bits of the column and row of each cell gives a key
+    such that the cells of any coarser grid, obtained by dividing the
+    number of columns and rows by a power of 2, are contiguous ranges of
+    keys. Dropping the ``2 * k`` lowest bits of a key gives the key of the
+    cell in the grid ``2**k`` times coarser.
+
+    :param columns: array of integer column indices, less than 2**32
+    :param rows: array of integer row indices, less than 2**32
+    :returns: numpy array of unsigned 64-bit integers
+    """
+    return _interleave_bits(columns) | (_interleave_bits(rows) << np.uint64(1))
+
+
+def _interleave_bits(values):
+    # Spread the 32 low bits of each value over the even bits of a
+    # 64-bit integer
+    values = np.asarray(values).astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in [
+            (16, 0x0000FFFF0000FFFF),
+            (8, 0x00FF00FF00FF00FF),
+            (4, 0x0F0F0F0F0F0F0F0F),
+            (2, 0x3333333333333333),
+            (1, 0x5555555555555555)]:
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
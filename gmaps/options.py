@@ -1,5 +1,8 @@
 
-import collections
+try:
+    from collections.abc import Iterable, Sequence
+except ImportError:  # Python 2
+    from collections import Iterable, Sequence
 
 from six import string_types
 
@@ -37,7 +40,7 @@ def is_atomic(elem):
     """
     return (
         isinstance(elem, string_types) or
-        not isinstance(elem, collections.Iterable)
+        not isinstance(elem, Iterable)
     )
 
 
@@ -47,7 +50,7 @@ def is_color_atomic(color):
     """
     if isinstance(color, string_types):
         is_atomic = True
-    elif isinstance(color, collections.Sequence):
+    elif isinstance(color, Sequence):
         if isinstance(color[0], string_types):
             is_atomic = False
         elif isinstance(color[0], (int, float)) and len(color) in (3, 4):
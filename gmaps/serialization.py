@@ -0,0 +1,91 @@
+"""
+Serialization of large numeric arrays
+
+Arrays of numbers, like the locations of a heatmap, are normally sent to
+the front-end as JSON lists. Layers with many points can instead send
+them as packed binary buffers over the comm's `buffers` channel, which
+avoids formatting and parsing every number as text.
+"""
+
+import array
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ALLOWED_ENCODINGS = ['json', 'float64', 'float32']
+
+_array_typecodes = {'float64': 'd', 'float32': 'f', 'uint8': 'B'}
+
+
+def pack_array(values, dtype):
+    """
+    Pack a list of numbers, or a list of rows of numbers, into a buffer
+
+    :param values:
+        Either a flat sequence of numbers (e.g. weights) or a sequence
+        of rows of the same length (e.g. (latitude, longitude) pairs).
+
+    :param dtype:
+        One of 'float64', 'float32' or 'uint8'.
+
+    :returns:
+        A dictionary with keys 'dtype', 'shape' and 'buffer'. The buffer
+        is a memoryview, which ipywidgets sends as a binary buffer.
+    """
+    if dtype not in _array_typecodes:
+        raise ValueError(
+            '{} is not a valid binary encoding. '
+            'Expected one of {}'.format(dtype, list(_array_typecodes)))
+    if np is not None:
+        return _pack_with_numpy(values, dtype)
+    else:
+        return _pack_with_array(values, dtype)
+
+
+def _pack_with_numpy(values, dtype):
+    values_array = np.ascontiguousarray(values, dtype=dtype)
+    return {
+        'dtype': dtype,
+        'shape': list(values_array.shape),
+        'buffer': memoryview(values_array.ravel())
+    }
+
+
+def _pack_with_array(values, dtype):
+    values = list(values)
+    if values and _is_row(values[0]):
+        row_length = len(values[0])
+        shape = [len(values), row_length]
+        flat_values = itertools.chain.from_iterable(values)
+    else:
+        shape = [len(values)]
+        flat_values = values
+    values_array = array.array(_array_typecodes[dtype], flat_values)
+    return {
+        'dtype': dtype,
+        'shape': shape,
+        'buffer': memoryview(values_array)
+    }
+
+
+def _is_row(value):
+    try:
+        len(value)
+        return True
+    except TypeError:
+        return False
+
+
+def array_to_json(values, widget):
+    """
+    Serialize an array trait according to the widget's `data_encoding`
+
+    Use this as the `to_json` serializer of array traits on widgets
+    that have a `data_encoding` trait.
+    """
+    if values is None or widget.data_encoding == 'json':
+        return values
+    return pack_array(values, widget.data_encoding)
@@ -0,0 +1,357 @@
+"""
+Simplification of GeoJSON geometries
+
+High-resolution boundaries have far more vertices than can be seen at
+most zoom levels. The Douglas-Peucker algorithm removes the vertices
+that are closer than a tolerance to the line through the vertices that
+are kept, so that the simplified line stays within the tolerance of the
+original.
+
+Simplification preserves topology between features: vertices where a
+line starts or stops being shared with another line, like the points
+where the borders of three countries meet, are always kept. The border
+shared by two countries is then simplified in the same way in both, so
+that no gaps or overlaps appear between them.
+
+Tolerances are given in degrees of longitude, and distances are measured
+in the Web Mercator projection, so that the simplified lines are within
+the same number of pixels of the original everywhere on the map.
+"""
+
+from . import mercator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Zoom levels at which geometries are simplified with the 'auto' mode
+AUTO_SIMPLIFY_ZOOMS = [0, 2, 4, 6, 8, 10, 12]
+
+# Tolerance of the 'auto' mode, in pixels at each zoom level
+AUTO_SIMPLIFY_PIXELS = 1.0
+
+# Levels of the 'auto' mode stop when simplification keeps at least
+# this fraction of the vertices
+_MIN_VERTEX_REDUCTION = 0.9
+
+# Line types, and whether the first and last positions of each line
+# must stay equal
+_LINE_STRING = 0
+_LINEAR_RING = 1
+
+
+def pixel_tolerance(zoom, pixels=AUTO_SIMPLIFY_PIXELS):
+    """
+    Tolerance, in degrees of longitude, of `pixels` pixels at `zoom`
+    """
+    return pixels * 360.0 / mercator.world_size(zoom)
+
+
+def simplify_geometries(geometries, tolerance):
+    """
+    Simplify the lines and polygons of GeoJSON geometries
+
+    :param geometries:
+        List of GeoJSON geometries. Points are left untouched.
+
+    :param tolerance:
+        Maximum distance between the simplified and the original lines,
+        in degrees of longitude.
+    :type tolerance: float
+
+    :returns:
+        List of new geometries. The input geometries are not modified.
+    """
+    [simplified_geometries] = simplify_geometry_levels(
+        geometries, [tolerance])
+    return simplified_geometries
+
+
+def simplify_geometry_levels(geometries, tolerances):
+    """
+    Simplify GeoJSON geometries at several tolerances
+
+    This is faster than calling :func:`simplify_geometries` for each
+    tolerance, since the lines are only traversed once: each vertex is
+    given the largest tolerance at which it is kept, and the lines at
+    every tolerance are read from these.
+
+    :returns:
+        A list with the list of simplified geometries for each tolerance.
+    """
+    if np is None:
+        raise ImportError('Simplifying geometries requires numpy')
+    lines = []
+    for geometry in geometries:
+        _collect_lines(geometry, lines)
+    coordinates = [_line_array(line) for (line, _) in lines]
+    if coordinates:
+        # Simplify every line at once, from the concatenated vertices
+        importance = _douglas_peucker_importance(
+            _world_line(np.concatenate(coordinates)),
+            _junctions(coordinates))
+        line_starts = np.cumsum([len(line) for line in coordinates])
+        importances = np.split(importance, line_starts[:-1])
+    else:
+        importances = []
+    levels = []
+    for tolerance in tolerances:
+        tolerance_world = tolerance / 360.0
+        simplified_lines = iter([
+            _simplify_line(line, importance, tolerance_world, line_type)
+            for ((line, line_type), importance) in zip(lines, importances)
+        ])
+        levels.append([
+            _rebuild_geometry(geometry, simplified_lines)
+            for geometry in geometries
+        ])
+    return levels
+
+
+def auto_simplify_levels(geometries, zooms=None):
+    """
+    Simplified geometries for a range of zoom levels
+
+    Geometries are simplified to within ``AUTO_SIMPLIFY_PIXELS`` pixels
+    at each zoom level in `zooms`, stopping at the first level that
+    would keep most of the vertices. Levels that keep the same vertices
+    as the previous level are left out.
+
+    :returns:
+        List of ``(zoom, geometries)`` tuples, sorted by increasing zoom
+        level. The last level has ``geometries`` set to None, meaning
+        that the original geometries should be shown from that zoom
+        level onwards.
+    """
+    if zooms is None:
+        zooms = AUTO_SIMPLIFY_ZOOMS
+    tolerances = [pixel_tolerance(zoom) for zoom in zooms]
+    simplified_levels = simplify_geometry_levels(geometries, tolerances)
+    number_vertices = count_vertices(geometries)
+    levels = []
+    previous_vertices = None
+    for zoom, simplified_geometries in zip(zooms, simplified_levels):
+        level_vertices = count_vertices(simplified_geometries)
+        if level_vertices >= _MIN_VERTEX_REDUCTION * number_vertices:
+            break
+        # Vertices kept at a tolerance are also kept at every smaller
+        # tolerance, so levels with as many vertices are identical
+        if level_vertices != previous_vertices:
+            levels.append((zoom, simplified_geometries))
+            previous_vertices = level_vertices
+    else:
+        zoom = zooms[-1] + 1
+    levels.append((zoom, None))
+    return levels
+
+
+def count_vertices(geometries):
+    """
+    Total number of positions in lines and polygons of GeoJSON geometries
+    """
+    lines = []
+    for geometry in geometries:
+        _collect_lines(geometry, lines)
+    return sum(len(line) for (line, _) in lines)
+
+
+def _collect_lines(geometry, lines):
+    """
+    Append the lines of a geometry to `lines` as (coordinates, line_type)
+    """
+    geometry_type = geometry['type']
+    coordinates = geometry.get('coordinates')
+    if geometry_type == 'LineString':
+        lines.append((coordinates, _LINE_STRING))
+    elif geometry_type == 'MultiLineString':
+        lines.extend((line, _LINE_STRING) for line in coordinates)
+    elif geometry_type == 'Polygon':
+        lines.extend((ring, _LINEAR_RING) for ring in coordinates)
+    elif geometry_type == 'MultiPolygon':
+        lines.extend(
+            (ring, _LINEAR_RING)
+            for polygon in coordinates for ring in polygon)
+    elif geometry_type == 'GeometryCollection':
+        for member in geometry['geometries']:
+            _collect_lines(member, lines)
+
+
+def _rebuild_geometry(geometry, simplified_lines):
+    """
+    Copy of a geometry with its lines taken from `simplified_lines`,
+    an iterator over lines in the order of :func:`_collect_lines`
+    """
+    geometry_type = geometry['type']
+    coordinates = geometry.get('coordinates')
+    if geometry_type in ('LineString', 'Polygon', 'MultiLineString'):
+        if geometry_type == 'LineString':
+            coordinates = next(simplified_lines)
+        else:
+            coordinates = [next(simplified_lines) for _ in coordinates]
+    elif geometry_type == 'MultiPolygon':
+        coordinates = [
+            [next(simplified_lines) for _ in polygon]
+            for polygon in coordinates
+        ]
+    elif geometry_type == 'GeometryCollection':
+        rebuilt_geometry = dict(geometry)
+        rebuilt_geometry['geometries'] = [
+            _rebuild_geometry(member, simplified_lines)
+            for member in geometry['geometries']
+        ]
+        return rebuilt_geometry
+    else:
+        return geometry
+    rebuilt_geometry = dict(geometry)
+    rebuilt_geometry['coordinates'] = coordinates
+    return rebuilt_geometry
+
+
+def _line_array(line):
+    try:
+        return np.asarray(line, dtype=float)[:, :2]
+    except (ValueError, IndexError):
+        # Positions with and without altitude in the same line
+        return np.array([position[:2] for position in line], dtype=float)
+
+
+def _world_line(line):
+    x, y = mercator.world_coordinates(line[:, 1], line[:, 0])
+    return np.column_stack([x, y])
+
+
+def _junctions(lines):
+    """
+    Mask of the vertices that must be kept to preserve the topology
+    between lines, for the concatenated vertices of every line
+
+    Each vertex gets a signature, the XOR of random keys of the lines
+    that it belongs to. A vertex is a junction if its signature differs
+    from that of one of its neighbours along the line, i.e. where the
+    line starts or stops being shared with another line. The first and
+    last vertices of every line are also junctions of every line that
+    they belong to, since rings that share a border do not necessarily
+    start at the same vertex.
+    """
+    lengths = [len(line) for line in lines]
+    vertices = np.concatenate(lines)
+    line_ids = np.repeat(np.arange(len(lines)), lengths)
+    _, vertex_ids = np.unique(vertices, axis=0, return_inverse=True)
+    vertex_ids = vertex_ids.ravel()
+    line_keys = np.random.RandomState(0).randint(
+        0, 2 ** 62, size=len(lines), dtype=np.int64)
+    # Count each line once per vertex, even for the repeated first and
+    # last vertices of rings
+    vertex_lines = np.unique(
+        np.column_stack([vertex_ids, line_ids]), axis=0)
+    signatures = np.zeros(vertex_ids.max() + 1, dtype=np.int64)
+    np.bitwise_xor.at(
+        signatures, vertex_lines[:, 0], line_keys[vertex_lines[:, 1]])
+    vertex_signatures = signatures[vertex_ids]
+    changes = vertex_signatures[1:] != vertex_signatures[:-1]
+    is_junction = np.zeros(len(vertices), dtype=bool)
+    is_junction[1:] |= changes
+    is_junction[:-1] |= changes
+    line_starts = np.cumsum([0] + lengths[:-1])
+    line_ends = line_starts + np.asarray(lengths) - 1
+    is_endpoint = np.zeros(len(signatures), dtype=bool)
+    is_endpoint[vertex_ids[line_starts]] = True
+    is_endpoint[vertex_ids[line_ends]] = True
+    is_junction |= is_endpoint[vertex_ids]
+    return is_junction
+
+
+def _simplify_line(line, importance, tolerance, line_type):
+    """
+    Simplified copy of a list of positions
+    """
+    number_positions = len(line)
+    if number_positions <= 2:
+        return line
+    keep = importance > tolerance
+    if line_type == _LINEAR_RING and np.count_nonzero(keep) < 4:
+        # Linear rings need at least four positions
+        if number_positions < 4:
+            return line
+        keep[[number_positions // 3, 2 * number_positions // 3]] = True
+    return [line[index] for index in np.flatnonzero(keep).tolist()]
+
+
+def _douglas_peucker_importance(points, is_junction):
+    """
+    Largest tolerance at which the Douglas-Peucker algorithm keeps each
+    point
+
+    The algorithm keeps the point farthest from the segment between the
+    ends of a section if it is farther than the tolerance, and then
+    simplifies the sections on either side of it. The sections, and the
+    farthest point of each, do not depend on the tolerance, so a point
+    is kept at a tolerance if its distance, and that of every point
+    that split the sections containing it, are larger than the
+    tolerance. Junctions split the points into sections that are
+    simplified independently, and are always kept.
+
+    Rather than splitting one section at a time, every section is split
+    at each step, so that the number of steps is the depth of the
+    recursion rather than the number of points.
+    """
+    importance = np.where(is_junction, np.inf, 0.0)
+    junction_indices = np.flatnonzero(is_junction)
+    starts = junction_indices[:-1]
+    ends = junction_indices[1:]
+    # Importance of the point that split each section
+    parent_importances = np.full(len(starts), np.inf)
+    while True:
+        has_inner_points = ends - starts >= 2
+        starts = starts[has_inner_points]
+        ends = ends[has_inner_points]
+        parent_importances = parent_importances[has_inner_points]
+        if not len(starts):
+            return importance
+        number_inner_points = ends - starts - 1
+        section_offsets = np.cumsum(number_inner_points) - number_inner_points
+        section_ids = np.repeat(np.arange(len(starts)), number_inner_points)
+        inner_indices = (
+            np.arange(len(section_ids)) - section_offsets[section_ids] +
+            starts[section_ids] + 1)
+        distances = _segment_distances(
+            points[inner_indices],
+            points[starts[section_ids]],
+            points[ends[section_ids]]
+        )
+        max_distances = np.maximum.reduceat(distances, section_offsets)
+        # First point at the maximum distance in each section
+        farthest_indices = np.minimum.reduceat(
+            np.where(
+                distances == max_distances[section_ids],
+                inner_indices, len(points)),
+            section_offsets)
+        is_split = max_distances > 0.0
+        middles = farthest_indices[is_split]
+        middle_importances = np.minimum(
+            max_distances[is_split], parent_importances[is_split])
+        importance[middles] = middle_importances
+        starts = np.concatenate([starts[is_split], middles])
+        ends = np.concatenate([middles, ends[is_split]])
+        parent_importances = np.concatenate(
+            [middle_importances, middle_importances])
+
+
+def _segment_distances(points, starts, ends):
+    """
+    Distance of each point to the segment between the matching rows of
+    `starts` and `ends`
+    """
+    directions = ends - starts
+    length_squared = np.einsum('ij,ij->i', directions, directions)
+    offsets = points - starts
+    projections = np.zeros(len(points))
+    is_segment = length_squared > 0.0
+    projections[is_segment] = np.clip(
+        np.einsum(
+            'ij,ij->i', offsets[is_segment], directions[is_segment]
+        ) / length_squared[is_segment],
+        0.0, 1.0)
+    nearest_offsets = offsets - projections[:, np.newaxis] * directions
+    return np.sqrt(np.einsum('ij,ij->i', nearest_offsets, nearest_offsets))
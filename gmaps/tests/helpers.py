@@ -0,0 +1,15 @@
+def capture_messages(widget):
+    """
+    Replace the `send` method of a widget to record the custom messages
+    it sends to the browser
+
+    :returns:
+        List that each message is appended to, as a tuple
+        ``(message, buffers)``.
+    """
+    messages = []
+
+    def send(message, buffers=None):
+        messages.append((message, buffers))
+    widget.send = send
+    return messages
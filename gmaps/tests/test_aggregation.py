@@ -0,0 +1,151 @@
+import unittest
+
+import numpy as np
+import pytest
+
+from ..aggregation import (
+    grid_aggregate, automatic_cell_size, pyramid_aggregate,
+    DEFAULT_GRID_RESOLUTION)
+from ..bounds import BoundsAccumulator
+from ..geotraitlets import InvalidPointException, InvalidWeightException
+
+
+class GridAggregate(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [
+            (0.1, 0.1), (0.3, 0.3), (0.2, 0.2), (5.5, 5.5), (5.7, 5.7)
+        ]
+
+    def test_latlng_grid(self):
+        cell_locations, cell_weights = grid_aggregate(
+            self.locations, cell_size=1.0, grid_type='latlng')
+        assert cell_locations.tolist() == [
+            [pytest.approx(0.2), pytest.approx(0.2)],
+            [pytest.approx(5.6), pytest.approx(5.6)]
+        ]
+        assert cell_weights.tolist() == [3.0, 2.0]
+
+    def test_mercator_grid(self):
+        cell_locations, cell_weights = grid_aggregate(
+            self.locations, cell_size=1.0)
+        assert len(cell_locations) == 2
+        assert sorted(cell_weights.tolist()) == [2.0, 3.0]
+
+    def test_weighted_centroids(self):
+        cell_locations, cell_weights = grid_aggregate(
+            [(0.0, 0.0), (0.4, 0.8)], weights=[3.0, 1.0],
+            cell_size=1.0, grid_type='latlng')
+        assert cell_locations.tolist() == [
+            [pytest.approx(0.1), pytest.approx(0.2)]]
+        assert cell_weights.tolist() == [4.0]
+
+    def test_drops_zero_weight_cells(self):
+        cell_locations, cell_weights = grid_aggregate(
+            [(0.5, 0.5), (5.5, 5.5)], weights=[0.0, 2.0],
+            cell_size=1.0, grid_type='latlng')
+        assert cell_locations.tolist() == [[5.5, 5.5]]
+        assert cell_weights.tolist() == [2.0]
+
+    def test_preserves_total_weight(self):
+        random_state = np.random.RandomState(0)
+        locations = np.column_stack([
+            random_state.uniform(-60.0, 60.0, 1000),
+            random_state.uniform(-180.0, 180.0, 1000)
+        ])
+        weights = random_state.uniform(0.0, 1.0, 1000)
+        _, cell_weights = grid_aggregate(locations, weights)
+        assert cell_weights.sum() == pytest.approx(weights.sum())
+
+    def test_automatic_cell_size(self):
+        locations = [(0.0, 0.0), (10.0, 20.0)]
+        (_, min_longitude), (_, max_longitude) = \
+            BoundsAccumulator.from_locations(locations).bounds()
+        cell_size = automatic_cell_size(locations, grid_type='latlng')
+        assert cell_size == pytest.approx(
+            (max_longitude - min_longitude) / DEFAULT_GRID_RESOLUTION)
+
+    def test_empty(self):
+        cell_locations, cell_weights = grid_aggregate([])
+        assert len(cell_locations) == 0
+        assert len(cell_weights) == 0
+
+    def test_invalid_grid_type(self):
+        with pytest.raises(ValueError, match='grid type'):
+            grid_aggregate(self.locations, grid_type='hexagon')
+
+    def test_invalid_cell_size(self):
+        with pytest.raises(ValueError, match='cell_size'):
+            grid_aggregate(self.locations, cell_size=0.0)
+
+    def test_invalid_location(self):
+        with self.assertRaises(InvalidPointException):
+            grid_aggregate([(0.0, 0.0), (100.0, 0.0)])
+
+    def test_negative_weight(self):
+        with self.assertRaises(InvalidWeightException):
+            grid_aggregate([(0.0, 0.0)], weights=[-1.0])
+
+    def test_weights_length_mismatch(self):
+        with pytest.raises(ValueError, match='same length'):
+            grid_aggregate(self.locations, weights=[1.0])
+
+
+class PyramidAggregate(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.locations = np.column_stack([
+            random_state.normal(40.0, 2.0, 5000),
+            random_state.normal(-100.0, 2.0, 5000)
+        ])
+        self.weights = random_state.uniform(0.0, 1.0, 5000)
+
+    def test_levels(self):
+        levels = pyramid_aggregate(self.locations, max_level_points=1000)
+        zooms = [zoom for (zoom, _, _) in levels]
+        assert zooms == list(range(len(levels)))
+        sizes = [len(level_locations) for (_, level_locations, _) in levels]
+        assert sizes == sorted(sizes)
+        assert max(sizes) <= 1000
+        for (_, _, level_weights) in levels:
+            assert level_weights.sum() == pytest.approx(5000.0)
+
+    def test_matches_grid(self):
+        levels = pyramid_aggregate(self.locations, self.weights)
+        # Four pixel cells at zoom 3 are 0.703125 degrees of longitude wide
+        zoom, level_locations, level_weights = levels[3]
+        assert zoom == 3
+        grid_locations, grid_weights = grid_aggregate(
+            self.locations, self.weights, cell_size=0.703125)
+        assert np.allclose(
+            np.sort(level_weights), np.sort(grid_weights))
+        assert np.allclose(
+            np.sort(level_locations[:, 0]), np.sort(grid_locations[:, 0]))
+
+    def test_stops_when_points_are_separate(self):
+        locations = [(0.0, 0.0), (10.0, 10.0), (-20.0, 50.0)]
+        levels = pyramid_aggregate(locations)
+        zoom, level_locations, level_weights = levels[-1]
+        assert zoom < 20
+        assert sorted(level_locations.tolist()) == sorted(
+            [list(location) for location in locations])
+        assert level_weights.tolist() == [1.0, 1.0, 1.0]
+
+    def test_coarsest_level_always_included(self):
+        levels = pyramid_aggregate(self.locations, max_level_points=1)
+        assert len(levels) == 1
+        assert levels[0][0] == 0
+
+    def test_max_zoom(self):
+        levels = pyramid_aggregate(
+            self.locations, max_level_points=10 ** 6, max_zoom=2)
+        assert [zoom for (zoom, _, _) in levels] == [0, 1, 2]
+
+    def test_invalid_max_zoom(self):
+        with pytest.raises(ValueError, match='max_zoom'):
+            pyramid_aggregate(self.locations, max_zoom=40)
+
+    def test_invalid_max_level_points(self):
+        with pytest.raises(ValueError, match='max_level_points'):
+            pyramid_aggregate(self.locations, max_level_points=0)
@@ -5,7 +5,9 @@ import numpy as np
 
 from ..bounds import (
     latitude_bounds, longitude_bounds, merge_longitude_bounds,
-    MAX_ALLOWED_LATITUDE, MIN_ALLOWED_LATITUDE, EPSILON
+    BoundsAccumulator, MAX_ALLOWED_LATITUDE, MIN_ALLOWED_LATITUDE, EPSILON,
+    _latitude_bounds_python, _latitude_bounds_numpy,
+    _longitude_bounds_python, _longitude_bounds_numpy
 )
 
 
@@ -129,6 +131,173 @@ class LongitudeBounds(unittest.TestCase):
         assert lower < 10.0 < upper
 
 
+class ImplementationParity(unittest.TestCase):
+    """
+    The numpy and pure Python implementations must agree
+    """
+
+    latitude_cases = [
+        [-81.6297],
+        [10.0, 15.0, 20.0],
+        np.linspace(-89.0, 89.0, 100).tolist(),
+        [89.0, -89.0],
+        [-71.123, -71.123],
+        [-71.123, -71.123 + 0.01*EPSILON],
+        [-87.0],
+        [87.0],
+        np.random.RandomState(42).uniform(-60.0, 60.0, 1000).tolist()
+    ]
+
+    longitude_cases = [
+        [-87.6297],
+        [10.0, 15.0, 20.0],
+        [-10.0, -15.0, -20.0],
+        np.linspace(-179.0, 179.0, 100).tolist(),
+        [179.0, -179.0],
+        [-81.123, -81.123],
+        [-81.123, -81.123 + 0.01*EPSILON],
+        [10.0, 370.0],
+        np.random.RandomState(42).uniform(-200.0, 200.0, 1000).tolist()
+    ]
+
+    def _assert_bounds_close(self, actual, expected):
+        assert np.allclose(actual, expected, rtol=0.0, atol=1e-9)
+
+    def test_latitude_bounds(self):
+        for latitudes in self.latitude_cases:
+            self._assert_bounds_close(
+                _latitude_bounds_numpy(latitudes),
+                _latitude_bounds_python(latitudes)
+            )
+
+    def test_longitude_bounds(self):
+        for longitudes in self.longitude_cases:
+            self._assert_bounds_close(
+                _longitude_bounds_numpy(longitudes),
+                _longitude_bounds_python(longitudes)
+            )
+
+    def test_numpy_array_input(self):
+        latitudes = np.array([10.0, 15.0, 20.0])
+        self._assert_bounds_close(
+            _latitude_bounds_numpy(latitudes),
+            _latitude_bounds_python(latitudes.tolist())
+        )
+        self._assert_bounds_close(
+            _longitude_bounds_numpy(latitudes),
+            _longitude_bounds_python(latitudes.tolist())
+        )
+
+    def test_returns_python_floats(self):
+        lower, upper = latitude_bounds(np.array([10.0, 15.0, 20.0]))
+        assert type(lower) is float and type(upper) is float
+        lower, upper = longitude_bounds(np.array([10.0, 15.0, 20.0]))
+        assert type(lower) is float and type(upper) is float
+
+
+class TestBoundsAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        random_state = np.random.RandomState(42)
+        latitudes = random_state.normal(37.7, 0.1, 200)
+        longitudes = random_state.normal(-122.4, 0.1, 200)
+        self.locations = list(zip(latitudes.tolist(), longitudes.tolist()))
+
+    def _assert_bounds_close(self, actual, expected):
+        assert np.allclose(actual, expected, rtol=0.0, atol=1e-9)
+
+    def test_matches_bounds_functions(self):
+        accumulator = BoundsAccumulator.from_locations(self.locations)
+        latitudes, longitudes = zip(*self.locations)
+        self._assert_bounds_close(
+            accumulator.latitude_bounds(), latitude_bounds(latitudes))
+        self._assert_bounds_close(
+            accumulator.longitude_bounds(), longitude_bounds(longitudes))
+
+    def test_bounds_format(self):
+        accumulator = BoundsAccumulator.from_locations(self.locations)
+        [(min_latitude, min_longitude), (max_latitude, max_longitude)] = \
+            accumulator.bounds()
+        assert (min_latitude, max_latitude) == accumulator.latitude_bounds()
+        assert (min_longitude, max_longitude) == \
+            accumulator.longitude_bounds()
+
+    def test_add(self):
+        accumulator = BoundsAccumulator.from_locations(self.locations[:50])
+        accumulator.add(self.locations[50:])
+        assert accumulator.count == len(self.locations)
+        self._assert_bounds_close(
+            accumulator.bounds(),
+            BoundsAccumulator.from_locations(self.locations).bounds()
+        )
+
+    def test_remove(self):
+        accumulator = BoundsAccumulator.from_locations(self.locations)
+        accumulator.remove(self.locations[:50])
+        assert accumulator.count == len(self.locations) - 50
+        self._assert_bounds_close(
+            accumulator.bounds(),
+            BoundsAccumulator.from_locations(self.locations[50:]).bounds()
+        )
+
+    def test_merge_chunks(self):
+        chunks = [self.locations[i:i+30] for i in range(0, 200, 30)]
+        accumulators = [
+            BoundsAccumulator.from_locations(chunk) for chunk in chunks]
+        merged = sum(accumulators, BoundsAccumulator())
+        self._assert_bounds_close(
+            merged.bounds(),
+            BoundsAccumulator.from_locations(self.locations).bounds()
+        )
+
+    def test_merge_does_not_mutate(self):
+        first = BoundsAccumulator.from_locations(self.locations[:10])
+        second = BoundsAccumulator.from_locations(self.locations[10:])
+        first.merge(second)
+        assert first.count == 10
+        assert second.count == 190
+
+    def test_numpy_array(self):
+        accumulator = BoundsAccumulator.from_locations(
+            np.array(self.locations))
+        self._assert_bounds_close(
+            accumulator.bounds(),
+            BoundsAccumulator.from_locations(self.locations).bounds()
+        )
+
+    def test_single_point(self):
+        accumulator = BoundsAccumulator.from_locations([(-71.123, -81.123)])
+        lower, upper = accumulator.latitude_bounds()
+        assert 1.99*EPSILON < upper - lower < 2.01*EPSILON
+        assert lower < -71.123 < upper
+        lower, upper = accumulator.longitude_bounds()
+        assert 1.99*EPSILON < upper - lower < 2.01*EPSILON
+        assert lower < -81.123 < upper
+
+    def test_around_dateline(self):
+        accumulator = BoundsAccumulator.from_locations(
+            [(0.0, 179.0), (0.0, -179.0)])
+        lower, upper = accumulator.longitude_bounds()
+        assert 177.0 < lower < 180.0
+        assert -180.0 < upper < -177.0
+
+    def test_whole_earth(self):
+        latitudes = np.linspace(-89.0, 89.0, 100)
+        longitudes = np.linspace(-179.0, 179.0, 100)
+        accumulator = BoundsAccumulator.from_locations(
+            np.column_stack([latitudes, longitudes]))
+        lower, upper = accumulator.latitude_bounds()
+        assert lower == MIN_ALLOWED_LATITUDE
+        assert upper == MAX_ALLOWED_LATITUDE
+        lower, upper = accumulator.longitude_bounds()
+        assert (upper - lower > 180.0) or (upper < lower)
+
+    def test_empty(self):
+        accumulator = BoundsAccumulator()
+        with self.assertRaises(ValueError):
+            accumulator.bounds()
+
+
 class MergeLongitudeBounds(unittest.TestCase):
 
     def _verify_bounds(self, bounds, expected_lower, expected_upper):
@@ -0,0 +1,139 @@
+import unittest
+
+import numpy as np
+import pytest
+
+from ..clustering import (
+    ClusterIndex, Cluster, ClusteredMarkers, clustered_marker_layer)
+from ..geotraitlets import InvalidPointException
+
+
+class TestClusterIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.0, 0.0), (0.0, 0.0001), (10.0, 10.0)]
+
+    def test_single_cluster_zoom_zero(self):
+        index = ClusterIndex(self.locations)
+        [cluster] = index.get_clusters(zoom=0)
+        assert cluster.count == 3
+        assert cluster.latitude == pytest.approx(10.0 / 3)
+        assert cluster.longitude == pytest.approx((10.0 + 0.0001) / 3)
+
+    def test_clusters(self):
+        index = ClusterIndex(self.locations)
+        clusters = sorted(index.get_clusters(zoom=5))
+        assert clusters == [
+            Cluster(0.0, pytest.approx(0.00005), 2),
+            Cluster(10.0, 10.0, 1)
+        ]
+
+    def test_individual_points_above_max_zoom(self):
+        index = ClusterIndex(self.locations, max_zoom=10)
+        clusters = index.get_clusters(zoom=11)
+        assert sorted(clusters) == sorted(
+            Cluster(latitude, longitude, 1)
+            for latitude, longitude in self.locations
+        )
+
+    def test_bounds(self):
+        index = ClusterIndex(self.locations)
+        clusters = index.get_clusters(((5.0, 5.0), (15.0, 15.0)), zoom=5)
+        assert clusters == [Cluster(10.0, 10.0, 1)]
+
+    def test_bounds_across_antimeridian(self):
+        index = ClusterIndex([(0.0, 179.0), (0.0, -179.0), (0.0, 0.0)])
+        clusters = index.get_clusters(
+            ((-10.0, 170.0), (10.0, -170.0)), zoom=10)
+        assert sorted(cluster.longitude for cluster in clusters) == \
+            [-179.0, 179.0]
+
+    def test_counts_at_every_level(self):
+        random_state = np.random.RandomState(42)
+        locations = np.column_stack([
+            random_state.uniform(-80.0, 80.0, 1000),
+            random_state.uniform(-180.0, 180.0, 1000)
+        ])
+        index = ClusterIndex(locations, max_zoom=8)
+        for zoom in range(9):
+            _, _, counts = index.get_cluster_arrays(
+                ((-90.0, -180.0), (90.0, 180.0)), zoom)
+            assert counts.sum() == 1000
+
+    def test_add_matches_rebuild(self):
+        random_state = np.random.RandomState(42)
+        locations = np.column_stack([
+            random_state.normal(40.0, 5.0, 500),
+            random_state.normal(-100.0, 5.0, 500)
+        ])
+        index = ClusterIndex(locations[:300])
+        index.add(locations[300:])
+        expected = ClusterIndex(locations)
+        assert len(index) == 500
+        for zoom in [0, 4, 8, 16, 17]:
+            clusters = sorted(index.get_clusters(zoom=zoom))
+            expected_clusters = sorted(expected.get_clusters(zoom=zoom))
+            assert len(clusters) == len(expected_clusters)
+            for cluster, expected_cluster in zip(
+                    clusters, expected_clusters):
+                assert cluster == pytest.approx(expected_cluster)
+
+    def test_empty(self):
+        index = ClusterIndex()
+        assert len(index) == 0
+        assert index.get_clusters(zoom=3) == []
+        assert index.get_clusters(zoom=20) == []
+
+    def test_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame(self.locations, columns=['lat', 'lng'])
+        index = ClusterIndex(df)
+        assert len(index) == 3
+
+    def test_invalid_location(self):
+        with pytest.raises(InvalidPointException, match='row 1'):
+            ClusterIndex([(0.0, 0.0), (100.0, 0.0)])
+
+    def test_invalid_zoom_range(self):
+        with self.assertRaises(ValueError):
+            ClusterIndex(self.locations, min_zoom=5, max_zoom=2)
+
+
+class TestClusteredMarkers(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.0, 0.0), (0.0, 0.0001), (10.0, 10.0)]
+
+    def test_initial_clusters(self):
+        layer = clustered_marker_layer(self.locations)
+        assert isinstance(layer, ClusteredMarkers)
+        assert layer.locations == [
+            (pytest.approx(10.0 / 3), pytest.approx(10.0001 / 3))]
+        assert layer.label == ['3']
+        assert layer.hover_text == ['3 points']
+
+    def test_show_viewport(self):
+        layer = clustered_marker_layer(self.locations)
+        layer.show_viewport(((-5.0, -5.0), (5.0, 5.0)), 5)
+        assert len(layer.locations) == 1
+        assert layer.label == ['2']
+        layer.show_viewport(((-5.0, -5.0), (5.0, 5.0)), 20)
+        assert len(layer.locations) == 2
+        assert layer.label == ['', '']
+
+    def test_bounds_cover_all_points(self):
+        layer = clustered_marker_layer(self.locations)
+        layer.show_viewport(((5.0, 5.0), (15.0, 15.0)), 20)
+        (min_latitude, _), (max_latitude, _) = layer.data_bounds
+        assert min_latitude < 0.0 < 10.0 < max_latitude
+
+    def test_add(self):
+        layer = clustered_marker_layer(self.locations)
+        layer.add([(1.0, 1.0)])
+        assert len(layer.index) == 4
+        assert layer.label == ['4']
+
+    def test_update_viewport(self):
+        layer = clustered_marker_layer(self.locations)
+        layer.update_viewport(((-5.0, -5.0), (5.0, 5.0)), 20)
+        assert len(layer.locations) == 2
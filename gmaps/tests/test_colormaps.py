@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+import pytest
+import traitlets
+
+from ..colormaps import colormap, MappedColors
+
+
+class MappedColorsTests(unittest.TestCase):
+
+    def test_to_list(self):
+        colors = MappedColors(['red', (0, 0, 255)], [0, 1, 1, 0])
+        assert colors.palette == ['red', 'rgb(0,0,255)']
+        assert colors.to_list() == [
+            'red', 'rgb(0,0,255)', 'rgb(0,0,255)', 'red']
+        assert len(colors) == 4
+
+    def test_to_json(self):
+        colors = MappedColors(['red', 'blue'], [0, 1, 1])
+        state = colors.to_json()
+        assert state['palette'] == ['red', 'blue']
+        indices = state['indices']
+        assert indices['dtype'] == 'uint8'
+        assert indices['shape'] == [3]
+        assert bytes(indices['buffer']) == b'\x00\x01\x01'
+
+    def test_invalid_index(self):
+        with pytest.raises(ValueError, match='indices'):
+            MappedColors(['red', 'blue'], [0, 2])
+
+    def test_invalid_color(self):
+        with self.assertRaises(traitlets.TraitError):
+            MappedColors(['red', 'not-a-color'], [0, 1])
+
+
+class ColormapTests(unittest.TestCase):
+
+    def test_linear(self):
+        colors = colormap(
+            [0.0, 1.0, 2.0, 4.0], colors=['white', 'red'], number_colors=2)
+        assert colors.palette == ['rgb(255,255,255)', 'rgb(255,0,0)']
+        assert colors.indices.tolist() == [0, 0, 1, 1]
+        assert colors.bin_edges.tolist() == [0.0, 2.0, 4.0]
+
+    def test_linear_limits(self):
+        colors = colormap(
+            [-10.0, 0.5, 10.0], number_colors=4, vmin=0.0, vmax=1.0)
+        assert colors.indices.tolist() == [0, 2, 3]
+
+    def test_log(self):
+        colors = colormap([1.0, 10.0, 100.0, 1000.0], scale='log',
+                          number_colors=3)
+        assert colors.indices.tolist() == [0, 1, 2, 2]
+        assert colors.bin_edges == pytest.approx([1.0, 10.0, 100.0, 1000.0])
+
+    def test_log_non_positive(self):
+        with pytest.raises(ValueError, match='positive'):
+            colormap([0.0, 1.0], scale='log')
+
+    def test_quantile(self):
+        values = np.random.RandomState(0).exponential(size=1000)
+        colors = colormap(values, scale='quantile', number_colors=4)
+        assert np.bincount(colors.indices).tolist() == [250] * 4
+
+    def test_missing_values(self):
+        colors = colormap(
+            [1.0, np.nan, 2.0], number_colors=2, missing_color='gray')
+        assert colors.to_list()[1] == 'gray'
+        assert len(colors.palette) == 3
+
+    def test_missing_values_default_color(self):
+        colors = colormap([1.0, np.nan], number_colors=2)
+        assert colors.to_list()[1] is None
+
+    def test_rgba_palette(self):
+        colors = colormap(
+            [0.0, 1.0], colors=[(255, 0, 0, 0.0), (255, 0, 0, 1.0)],
+            number_colors=2)
+        assert colors.palette == ['rgba(255,0,0,0.000)', 'rgb(255,0,0)']
+
+    def test_invalid_scale(self):
+        with pytest.raises(ValueError, match='scale'):
+            colormap([1.0], scale='sqrt')
+
+    def test_invalid_number_colors(self):
+        with pytest.raises(ValueError, match='number_colors'):
+            colormap([1.0], number_colors=256)
@@ -1,7 +1,15 @@
 
+import copy
+import json
 import unittest
 
-from .. import geojson_layer, InvalidGeoJson, GeoJsonFeature
+import pytest
+import traitlets
+
+from .. import bounds
+from .. import (
+    geojson_layer, InvalidGeoJson, GeoJsonFeature, CompactGeoJson, colormap)
+from .helpers import capture_messages
 
 
 class GeoJson(unittest.TestCase):
@@ -34,6 +42,322 @@ class GeoJson(unittest.TestCase):
         with self.assertRaises(InvalidGeoJson):
             geojson_layer(geo)
 
+    def test_color_lists(self):
+        geo = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [1.0, 2.0]},
+                    "properties": {}
+                }
+            ] * 3
+        }
+        layer = geojson_layer(
+            geo, fill_color=["red", (100, 0, 0), "red"],
+            stroke_color=(0, 100, 0))
+        fill_colors = [feature.fill_color for feature in layer.features]
+        assert fill_colors == ["red", "rgb(100,0,0)", "red"]
+        for feature in layer.features:
+            assert feature.stroke_color == "rgb(0,100,0)"
+
+    def test_mapped_colors(self):
+        geo = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [1.0, 2.0]},
+                    "properties": {}
+                }
+            ] * 3
+        }
+        colors = colormap([1.0, 2.0, 3.0], colors=["white", "red"],
+                          number_colors=2)
+        layer = geojson_layer(geo, fill_color=colors)
+        fill_colors = [feature.fill_color for feature in layer.features]
+        assert fill_colors == colors.to_list()
+
+    def test_raise_on_invalid_color(self):
+        geo = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [1.0, 2.0]},
+                    "properties": {}
+                }
+            ] * 2
+        }
+        with self.assertRaises(traitlets.TraitError):
+            geojson_layer(geo, fill_color=["red", "not-a-color"])
+
+    def test_raise_on_open_ring(self):
+        ring = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]]
+        geo = _feature_collection({"type": "Polygon", "coordinates": [ring]})
+        with pytest.raises(InvalidGeoJson, match="index 0"):
+            geojson_layer(geo)
+
+    def test_raise_on_invalid_position(self):
+        geo = _feature_collection(
+            {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0]]})
+        with self.assertRaises(InvalidGeoJson):
+            geojson_layer(geo)
+
+    def test_raise_on_invalid_geometry_type(self):
+        geo = _feature_collection({"type": "Circle", "coordinates": []})
+        with self.assertRaises(InvalidGeoJson):
+            geojson_layer(geo)
+
+    def test_geometry_collection(self):
+        geo = _feature_collection({
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": (1.0, 2.0)},
+                {"type": "MultiPoint", "coordinates": [[3.0, 4.0]]}
+            ]
+        })
+        layer = geojson_layer(geo)
+        assert layer.data_bounds
+
+    def test_bounds(self):
+        geo = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[
+                            [0.0, 10.0], [2.0, 10.0, 5.0], [2.0, 12.0],
+                            [0.0, 10.0]
+                        ]]
+                    },
+                    "properties": {}
+                },
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [4.0, 8.0]},
+                    "properties": {}
+                }
+            ]
+        }
+        layer = geojson_layer(geo)
+        latitudes = [10.0, 10.0, 12.0, 10.0, 8.0]
+        longitudes = [0.0, 2.0, 2.0, 0.0, 4.0]
+        (min_latitude, min_longitude), (max_latitude, max_longitude) = \
+            layer.data_bounds
+        assert (min_latitude, max_latitude) == \
+            pytest.approx(bounds.latitude_bounds(latitudes))
+        assert (min_longitude, max_longitude) == \
+            pytest.approx(bounds.longitude_bounds(longitudes))
+
+    def test_feature_bounds_cached(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        layer = geojson_layer(geo)
+        [feature] = layer.features
+        accumulator = feature._get_bounds_accumulator()
+        feature.fill_color = "red"
+        layer.features = [feature]
+        assert feature._get_bounds_accumulator() is accumulator
+        feature.feature = {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [3.0, 4.0]},
+            "properties": {}
+        }
+        assert feature._get_bounds_accumulator() is not accumulator
+
+    def test_feature_bounds_same_geometry(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        layer = geojson_layer(geo)
+        [feature] = layer.features
+        accumulator = feature._get_bounds_accumulator()
+        feature.feature = dict(feature.feature, properties={"name": "A"})
+        assert feature._get_bounds_accumulator() is accumulator
+
+    def test_bounds_reused_on_restyle(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        geo["features"].append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [3.0, 4.0]},
+            "properties": {}
+        })
+        layer = geojson_layer(geo)
+        accumulators = [
+            feature._get_bounds_accumulator() for feature in layer.features]
+        data_bounds = layer.data_bounds
+        restyled = [
+            GeoJsonFeature(feature=dict(feature.feature), fill_color="red")
+            for feature in layer.features
+        ]
+        layer.features = restyled[::-1]
+        assert [
+            feature._get_bounds_accumulator() for feature in restyled
+        ] == accumulators
+        assert layer.data_bounds == pytest.approx(data_bounds)
+        assert all(
+            feature._bounds_fingerprint is None for feature in restyled)
+
+    def test_bounds_reused_for_equal_geometry(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        layer = geojson_layer(geo)
+        [feature] = layer.features
+        accumulator = feature._get_bounds_accumulator()
+        # Fingerprints are only computed to look up other features
+        assert feature._bounds_fingerprint is None
+        copied = GeoJsonFeature(feature=copy.deepcopy(feature.feature))
+        layer.features = [copied]
+        assert copied._get_bounds_accumulator() is accumulator
+
+    def test_copy(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        layer = geojson_layer(geo)
+        feature = layer.features[0].feature
+        assert feature["geometry"] == geo["features"][0]["geometry"]
+        assert feature is not geo["features"][0]
+        feature["geometry"]["coordinates"][0] = 5.0
+        assert geo["features"][0]["geometry"]["coordinates"][0] == 1.0
+
+    def test_no_copy(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        layer = geojson_layer(geo, copy=False)
+        assert layer.features[0].feature is geo["features"][0]
+        assert geo["features"][0]["properties"] == {}
+
+    def test_simplify(self):
+        line = [[0.001 * (i % 2), i / 99.0] for i in range(100)]
+        geo = _feature_collection({"type": "LineString", "coordinates": line})
+        layer = geojson_layer(geo, simplify=0.01)
+        geometry = layer.features[0].feature["geometry"]
+        assert geometry["coordinates"] == [line[0], line[-1]]
+        assert geo["features"][0]["geometry"]["coordinates"] == line
+
+    def test_simplify_invalid(self):
+        geo = _feature_collection({"type": "Point", "coordinates": [1.0, 2.0]})
+        with pytest.raises(ValueError):
+            geojson_layer(geo, simplify="auto")
+        with pytest.raises(ValueError):
+            geojson_layer(geo, simplify=-1.0)
+        with pytest.raises(ValueError):
+            geojson_layer(geo, simplify=True)
+
+
+def _feature_collection(geometry):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": geometry, "properties": None}
+        ]
+    }
+
+
+class CompactGeoJsonLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.geo = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point", "coordinates": [float(i), 2.0]},
+                    "properties": {"name": str(i)}
+                }
+                for i in range(3)
+            ]
+        }
+
+    def test_compact(self):
+        layer = geojson_layer(
+            self.geo, compact=True, fill_color=["red", "green", "blue"],
+            stroke_weight=2.0)
+        assert isinstance(layer, CompactGeoJson)
+        state = layer.get_state()
+        assert state["features"] == self.geo["features"]
+        assert state["fill_color"] == ["red", "green", "blue"]
+        assert state["stroke_weight"] == 2.0
+        assert state["fill_opacity"] == 0.4
+        assert layer.has_bounds
+        expected_bounds = geojson_layer(self.geo).data_bounds
+        assert layer.data_bounds == expected_bounds
+
+    def test_binary_encoding(self):
+        layer = geojson_layer(
+            self.geo, compact=True, data_encoding="binary")
+        payload = layer.get_state()["features"]
+        decoded = json.loads(bytes(payload["buffer"]).decode("utf-8"))
+        assert decoded == self.geo["features"]
+
+    def test_simplify_auto(self):
+        line = [[0.001 * (i % 2), i / 999.0] for i in range(1000)]
+        self.geo["features"][0]["geometry"] = {
+            "type": "LineString", "coordinates": line}
+        layer = geojson_layer(
+            self.geo, compact=True, simplify="auto", data_encoding="binary")
+        assert layer.features == self.geo["features"]
+        state = layer.get_state()
+        levels = state["geometry_levels"]
+        assert len(levels) > 1
+        assert levels[-1]["geometries"] is None
+        coarsest = json.loads(
+            bytes(levels[0]["geometries"]["buffer"]).decode("utf-8"))
+        assert coarsest[0]["coordinates"] == [line[0], line[-1]]
+        assert coarsest[1] == self.geo["features"][1]["geometry"]
+
+    def test_simplify_auto_points(self):
+        layer = geojson_layer(self.geo, compact=True, simplify="auto")
+        assert layer.geometry_levels == []
+
+    def test_binary_encoding_requires_compact(self):
+        with pytest.raises(ValueError):
+            geojson_layer(self.geo, data_encoding="binary")
+
+    def test_mapped_colors(self):
+        colors = colormap([1.0, 2.0, 3.0], number_colors=2)
+        layer = geojson_layer(self.geo, compact=True, stroke_color=colors)
+        state = layer.get_state()
+        assert state["stroke_color"]["palette"] == colors.palette
+
+    def test_column_length_mismatch(self):
+        with pytest.raises(ValueError, match="fill_color"):
+            geojson_layer(self.geo, compact=True, fill_color=["red"])
+
+    def test_update_styles(self):
+        layer = geojson_layer(self.geo, compact=True, fill_color="red")
+        messages = capture_messages(layer)
+        layer.update_styles([2, 0], fill_color=(0, 0, 255), stroke_weight=3)
+        assert layer.fill_color == ["rgb(0,0,255)", "red", "rgb(0,0,255)"]
+        assert layer.stroke_weight == [3.0, 1.0, 3.0]
+        [(message, _)] = messages
+        assert message == {
+            "event": "STYLES_UPDATED",
+            "payload": {
+                "indices": [2, 0],
+                "styles": {
+                    "fill_color": ["rgb(0,0,255)", "rgb(0,0,255)"],
+                    "stroke_weight": [3, 3]
+                }
+            }
+        }
+
+    def test_update_styles_lists(self):
+        layer = geojson_layer(
+            self.geo, compact=True, fill_opacity=[0.1, 0.2, 0.3])
+        capture_messages(layer)
+        layer.update_styles([1, 2], fill_opacity=[0.5, 0.6])
+        assert layer.fill_opacity == [0.1, 0.5, 0.6]
+
+    def test_update_styles_invalid(self):
+        layer = geojson_layer(self.geo, compact=True)
+        messages = capture_messages(layer)
+        with self.assertRaises(traitlets.TraitError):
+            layer.update_styles([0], fill_opacity=2.0)
+        with pytest.raises(IndexError):
+            layer.update_styles([3], fill_color="red")
+        with pytest.raises(ValueError):
+            layer.update_styles([0], label="A")
+        assert messages == []
+
 
 class TestGeoJsonFeature(unittest.TestCase):
 
@@ -43,6 +43,48 @@ class LocationArray(unittest.TestCase):
         with self.assertRaises(geotraitlets.InvalidPointException):
             self.A(x=[(0.0, 200.0)])
 
+    def test_reject_outofbounds_np_array(self):
+        import numpy as np
+        locations = np.array(self.locations + [(0.0, 200.0), (-100.0, 0.0)])
+        with pytest.raises(
+                geotraitlets.InvalidPointException, match=r'\(row 2\)'):
+            self.A(x=locations)
+
+    def test_reject_nan_np_array(self):
+        import numpy as np
+        locations = np.array(self.locations + [(np.nan, 0.0)])
+        with pytest.raises(
+                geotraitlets.InvalidPointException, match=r'\(row 2\)'):
+            self.A(x=locations)
+
+    def test_reject_outofbounds_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame.from_records(
+            [(-100.0, 0.0)] + self.locations,
+            columns=['latitude', 'longitude'])
+        with pytest.raises(
+                geotraitlets.InvalidPointException, match=r'\(row 0\)'):
+            self.A(x=df)
+
+    def test_reject_invalid_latitude_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame.from_records(
+            self.locations + [('not-a', 'latitude')],
+            columns=['latitude', 'longitude'])
+        with pytest.raises(traitlets.TraitError, match=r'\(row 2\)'):
+            self.A(x=df)
+
+    def test_reject_outofbounds_list_row(self):
+        with pytest.raises(
+                geotraitlets.InvalidPointException, match=r'\(row 1\)'):
+            self.A(x=[(0.0, 0.0), (0.0, 200.0)])
+
+    def test_np_array_returns_floats(self):
+        import numpy as np
+        a = self.A(x=np.array(self.locations, dtype=np.float32))
+        assert a.x == self.locations
+        assert all(isinstance(latitude, float) for latitude, _ in a.x)
+
     def test_minlen(self):
         class A(traitlets.HasTraits):
             x = geotraitlets.LocationArray(minlen=2)
@@ -255,6 +297,39 @@ class TestColorAlpha(unittest.TestCase):
         a = A(x="blue")
         assert a.x == "blue"
 
+    def test_reject_float_rgb_tuple(self):
+        self.A(x=(100, 0, 10))
+        with self.assertRaises(traitlets.TraitError):
+            self.A(x=(100.0, 0, 10))
+
+    def test_reject_invalid_string_twice(self):
+        for _ in range(2):
+            with self.assertRaises(traitlets.TraitError):
+                self.A(x="not-a-color")
+
+
+class TestNormalizeColors(unittest.TestCase):
+
+    def test_normalize(self):
+        colors = geotraitlets.normalize_colors(
+            ["Red", (100, 0, 10), [100, 0, 10], (100, 0, 10, 0.5), None])
+        assert colors == [
+            "red", "rgb(100,0,10)", "rgb(100,0,10)",
+            "rgba(100,0,10,0.5)", None
+        ]
+
+    def test_empty(self):
+        assert geotraitlets.normalize_colors([]) == []
+
+    def test_generator(self):
+        colors = geotraitlets.normalize_colors(
+            color for color in ["blue", "blue"])
+        assert colors == ["blue", "blue"]
+
+    def test_reject_invalid(self):
+        with pytest.raises(traitlets.TraitError, match="not-a-color"):
+            geotraitlets.normalize_colors(["red", "not-a-color"])
+
 
 class TestZoomLevel(unittest.TestCase):
 
@@ -1,12 +1,17 @@
 
+import os
+import shutil
+import tempfile
 import unittest
 import pytest
 
 import traitlets
 
 from ..heatmap import (
-    _HeatmapOptionsMixin, heatmap_layer, Heatmap, WeightedHeatmap)
+    _HeatmapOptionsMixin, heatmap_layer, Heatmap, WeightedHeatmap,
+    HeatmapPyramid, TiledHeatmap, heatmap_tile_layer)
 from ..geotraitlets import InvalidPointException, InvalidWeightException
+from .helpers import capture_messages
 
 
 class HeatmapLayer(unittest.TestCase):
@@ -152,6 +157,23 @@ class TestHeatmap(unittest.TestCase):
         heatmap.locations = df
         assert heatmap.locations == self.locations * 2
 
+    def test_bounds_appended_locations(self):
+        heatmap = Heatmap(locations=self.locations)
+        new_locations = [(20.0, 30.0), (-10.0, 15.0)]
+        heatmap.locations = heatmap.locations + new_locations
+        expected = Heatmap(locations=self.locations + new_locations)
+        assert heatmap._bounds_accumulator.count == 4
+        for actual_bound, expected_bound in zip(
+                heatmap.data_bounds, expected.data_bounds):
+            assert actual_bound == pytest.approx(expected_bound)
+
+    def test_bounds_replaced_locations(self):
+        heatmap = Heatmap(locations=self.locations)
+        heatmap.locations = [(20.0, 30.0)]
+        assert heatmap._bounds_accumulator.count == 1
+        [(min_latitude, _), (max_latitude, _)] = heatmap.data_bounds
+        assert min_latitude < 20.0 < max_latitude
+
 
 class TestWeightedHeatmap(unittest.TestCase):
 
@@ -170,3 +192,418 @@ class TestWeightedHeatmap(unittest.TestCase):
     def test_negative_weights(self):
         with self.assertRaises(InvalidWeightException):
             WeightedHeatmap(locations=self.locations, weights=[1.0, -2.0])
+
+
+class HeatmapDataEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0)]
+        self.weights = [0.2, 0.5]
+
+    def test_default_json(self):
+        heatmap = heatmap_layer(self.locations)
+        state = heatmap.get_state()
+        assert state['data_encoding'] == 'json'
+        assert state['locations'] == self.locations
+
+    def test_float64(self):
+        import numpy as np
+        heatmap = heatmap_layer(self.locations, data_encoding='float64')
+        state = heatmap.get_state()
+        payload = state['locations']
+        assert payload['dtype'] == 'float64'
+        assert payload['shape'] == [2, 2]
+        decoded = np.frombuffer(payload['buffer'], dtype='float64')
+        assert decoded.tolist() == [-5.0, 5.0, 10.0, 10.0]
+
+    def test_weighted_float32(self):
+        import numpy as np
+        heatmap = heatmap_layer(
+            self.locations, weights=self.weights, data_encoding='float32')
+        state = heatmap.get_state()
+        assert state['locations']['shape'] == [2, 2]
+        weights_payload = state['weights']
+        assert weights_payload['dtype'] == 'float32'
+        assert weights_payload['shape'] == [2]
+        decoded = np.frombuffer(weights_payload['buffer'], dtype='float32')
+        assert np.allclose(decoded, self.weights)
+
+    def test_python_attribute_unchanged(self):
+        heatmap = heatmap_layer(self.locations, data_encoding='float64')
+        assert heatmap.locations == self.locations
+
+    def test_invalid_encoding(self):
+        with self.assertRaises(traitlets.TraitError):
+            heatmap_layer(self.locations, data_encoding='int8')
+
+
+class HeatmapAppend(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0)]
+        self.weights = [0.2, 0.5]
+
+    def test_extend(self):
+        heatmap = heatmap_layer(self.locations)
+        messages = capture_messages(heatmap)
+        heatmap.extend([(20.0, 20.0), (30.0, 30.0)])
+        assert heatmap.locations == (
+            self.locations + [(20.0, 20.0), (30.0, 30.0)])
+        [(message, buffers)] = messages
+        assert message == {
+            'event': 'DATA_APPENDED',
+            'payload': {
+                'numberRemoved': 0,
+                'locations': [(20.0, 20.0), (30.0, 30.0)]
+            }
+        }
+        assert buffers == []
+
+    def test_append(self):
+        heatmap = heatmap_layer(self.locations)
+        messages = capture_messages(heatmap)
+        heatmap.append((20.0, 20.0))
+        assert heatmap.locations == self.locations + [(20.0, 20.0)]
+        assert len(messages) == 1
+
+    def test_extend_empty(self):
+        heatmap = heatmap_layer(self.locations)
+        messages = capture_messages(heatmap)
+        heatmap.extend([])
+        assert heatmap.locations == self.locations
+        assert messages == []
+
+    def test_extend_invalid_location(self):
+        heatmap = heatmap_layer(self.locations)
+        with self.assertRaises(InvalidPointException):
+            heatmap.extend([(100.0, 0.0)])
+        assert heatmap.locations == self.locations
+
+    def test_extend_bounds(self):
+        heatmap = heatmap_layer(self.locations)
+        capture_messages(heatmap)
+        heatmap.extend([(40.0, 40.0)])
+        expected = heatmap_layer(self.locations + [(40.0, 40.0)])
+        assert heatmap.data_bounds == pytest.approx(expected.data_bounds)
+
+    def test_max_points_trims_initial_data(self):
+        heatmap = heatmap_layer(
+            [(1.0, 1.0), (2.0, 2.0), (3.0, 3.0)], max_points=2)
+        assert heatmap.locations == [(2.0, 2.0), (3.0, 3.0)]
+
+    def test_max_points_sliding_window(self):
+        heatmap = heatmap_layer(self.locations, max_points=3)
+        messages = capture_messages(heatmap)
+        heatmap.extend([(20.0, 20.0), (30.0, 30.0)])
+        assert heatmap.locations == [
+            (10.0, 10.0), (20.0, 20.0), (30.0, 30.0)]
+        [(message, _)] = messages
+        assert message['payload']['numberRemoved'] == 1
+        expected = heatmap_layer(heatmap.locations)
+        assert heatmap.data_bounds == pytest.approx(expected.data_bounds)
+
+    def test_max_points_replaces_all_data(self):
+        heatmap = heatmap_layer(self.locations, max_points=2)
+        messages = capture_messages(heatmap)
+        heatmap.extend([(20.0, 20.0), (30.0, 30.0), (40.0, 40.0)])
+        assert heatmap.locations == [(30.0, 30.0), (40.0, 40.0)]
+        # The whole state is re-sent rather than a delta
+        assert messages == []
+
+    def test_set_max_points(self):
+        heatmap = heatmap_layer(
+            self.locations, weights=self.weights)
+        heatmap.max_points = 1
+        assert heatmap.locations == [(10.0, 10.0)]
+        assert heatmap.weights == [0.5]
+
+    def test_weighted_extend(self):
+        heatmap = heatmap_layer(self.locations, weights=self.weights)
+        messages = capture_messages(heatmap)
+        heatmap.extend([(20.0, 20.0)], [0.7])
+        assert heatmap.locations == self.locations + [(20.0, 20.0)]
+        assert heatmap.weights == self.weights + [0.7]
+        [(message, _)] = messages
+        assert message['payload']['weights'] == [0.7]
+
+    def test_weighted_extend_length_mismatch(self):
+        heatmap = heatmap_layer(self.locations, weights=self.weights)
+        with pytest.raises(ValueError, match='same length'):
+            heatmap.extend([(20.0, 20.0)], [0.7, 0.8])
+        assert heatmap.locations == self.locations
+
+    def test_extend_binary_encoding(self):
+        import numpy as np
+        heatmap = heatmap_layer(
+            self.locations, weights=self.weights, data_encoding='float64')
+        messages = capture_messages(heatmap)
+        heatmap.extend([(20.0, 20.0)], [0.7])
+        [(message, buffers)] = messages
+        payload = message['payload']
+        assert len(buffers) == 2
+        locations_payload = payload['locations']
+        assert locations_payload['dtype'] == 'float64'
+        assert locations_payload['shape'] == [1, 2]
+        locations_buffer = buffers[locations_payload['bufferIndex']]
+        decoded = np.frombuffer(locations_buffer, dtype='float64')
+        assert decoded.tolist() == [20.0, 20.0]
+        weights_buffer = buffers[payload['weights']['bufferIndex']]
+        decoded = np.frombuffer(weights_buffer, dtype='float64')
+        assert decoded.tolist() == [0.7]
+
+
+class HeatmapViewportOnly(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.0, 0.0), (0.5, 0.5), (1.0, 1.0), (40.0, 40.0)]
+        self.weights = [0.1, 0.2, 0.3, 0.4]
+
+    def test_update_viewport(self):
+        heatmap = heatmap_layer(self.locations, viewport_only=True)
+        heatmap.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        assert heatmap.locations == [(0.0, 0.0), (0.5, 0.5)]
+
+    def test_bounds_cover_all_points(self):
+        heatmap = heatmap_layer(self.locations, viewport_only=True)
+        expected = heatmap_layer(self.locations).data_bounds
+        heatmap.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        assert heatmap.data_bounds == pytest.approx(expected)
+
+    def test_weighted(self):
+        heatmap = heatmap_layer(
+            self.locations, weights=self.weights, viewport_only=True)
+        heatmap.update_viewport(((39.0, 39.0), (41.0, 41.0)), 10)
+        assert heatmap.locations == [(40.0, 40.0)]
+        assert heatmap.weights == [0.4]
+
+    def test_empty_viewport(self):
+        heatmap = heatmap_layer(self.locations, viewport_only=True)
+        heatmap.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        heatmap.update_viewport(((-50.0, -50.0), (-49.0, -49.0)), 10)
+        assert heatmap.locations == [(0.0, 0.0), (0.5, 0.5)]
+
+    def test_extend(self):
+        heatmap = heatmap_layer(self.locations, viewport_only=True)
+        heatmap.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        heatmap.extend([(0.2, 0.2), (-30.0, -30.0)])
+        assert heatmap.locations == [(0.0, 0.0), (0.5, 0.5), (0.2, 0.2)]
+
+    def test_viewport_ignored_by_default(self):
+        heatmap = heatmap_layer(self.locations)
+        heatmap.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        assert heatmap.locations == self.locations
+
+    def test_max_points(self):
+        with self.assertRaises(ValueError):
+            heatmap_layer(self.locations, viewport_only=True, max_points=2)
+
+
+class HeatmapAggregate(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.1, 0.1), (0.3, 0.3), (5.5, 5.5)]
+
+    def test_grid(self):
+        heatmap = heatmap_layer(
+            self.locations, aggregate='grid', cell_size=1.0)
+        assert isinstance(heatmap, WeightedHeatmap)
+        assert len(heatmap.locations) == 2
+        assert sorted(heatmap.weights) == [1.0, 2.0]
+
+    def test_weighted(self):
+        heatmap = heatmap_layer(
+            self.locations, weights=[1.0, 3.0, 0.5],
+            aggregate='grid', cell_size=1.0, grid_type='latlng')
+        assert heatmap.weights == [4.0, 0.5]
+        assert heatmap.locations[0] == (
+            pytest.approx(0.25), pytest.approx(0.25))
+
+    def test_binary_encoding(self):
+        import numpy as np
+        heatmap = heatmap_layer(
+            self.locations, aggregate='grid', data_encoding='float32')
+        state = heatmap.get_state()
+        assert state['locations']['dtype'] == 'float32'
+        assert state['weights']['dtype'] == 'float32'
+        decoded = np.frombuffer(state['weights']['buffer'], dtype='float32')
+        assert decoded.sum() == pytest.approx(3.0)
+
+    def test_invalid_aggregation(self):
+        with pytest.raises(ValueError, match='aggregation'):
+            heatmap_layer(self.locations, aggregate='hexbin')
+
+
+class HeatmapPyramidLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(1.0, 1.0), (1.01, 1.01), (40.0, 40.0)]
+
+    def test_levels(self):
+        heatmap = heatmap_layer(self.locations, aggregate='pyramid')
+        assert isinstance(heatmap, HeatmapPyramid)
+        state = heatmap.get_state()
+        levels = state['levels']
+        assert levels[0]['zoom'] == 0
+        assert len(levels[0]['locations']) == 2
+        assert sorted(levels[0]['weights']) == [1.0, 2.0]
+        assert len(levels[-1]['locations']) == 3
+
+    def test_options(self):
+        heatmap = heatmap_layer(
+            self.locations, aggregate='pyramid', max_intensity=5.0,
+            opacity=0.3, max_level_points=2)
+        assert heatmap.max_intensity == 5.0
+        assert heatmap.opacity == 0.3
+        assert heatmap.max_level_points == 2
+
+    def test_bounds_cover_all_points(self):
+        heatmap = heatmap_layer(self.locations, aggregate='pyramid')
+        expected = heatmap_layer(self.locations).data_bounds
+        assert heatmap.data_bounds == pytest.approx(expected)
+
+    def test_binary_encoding(self):
+        heatmap = heatmap_layer(
+            self.locations, weights=[1.0, 2.0, 3.0], aggregate='pyramid',
+            data_encoding='float32')
+        level = heatmap.get_state()['levels'][0]
+        assert level['locations']['dtype'] == 'float32'
+        assert level['weights']['shape'] == [2]
+
+    def test_set_data(self):
+        heatmap = heatmap_layer(self.locations, aggregate='pyramid')
+        heatmap.set_data([(10.0, 10.0)], [3.0])
+        assert heatmap.levels[0]['weights'].tolist() == [3.0]
+
+    def test_max_points(self):
+        with self.assertRaises(ValueError):
+            heatmap_layer(self.locations, aggregate='pyramid', max_points=2)
+
+    def test_viewport_only(self):
+        with self.assertRaises(ValueError):
+            heatmap_layer(
+                self.locations, aggregate='pyramid', viewport_only=True)
+
+
+class TiledHeatmapLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(10.0, -10.0), (10.1, -10.1), (-10.0, 10.0)]
+
+    def test_defaults(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        assert isinstance(heatmap, TiledHeatmap)
+        assert heatmap.point_radius == 10
+        assert heatmap.gradient is None
+        assert heatmap.data_bounds == pytest.approx(
+            heatmap_layer(self.locations).data_bounds)
+
+    def test_render_tile(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        tile = heatmap.render_tile(1, 0, 0)
+        assert tile.startswith(b'\x89PNG')
+
+    def test_empty_tile(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        assert heatmap.render_tile(3, 0, 0) is None
+        assert heatmap.render_tile(1, 0, 5) is None
+
+    def test_wraps_tile_columns(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        assert heatmap.render_tile(1, 2, 0) == heatmap.render_tile(1, 0, 0)
+
+    def test_cache(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        first = heatmap.render_tile(1, 0, 0)
+        assert heatmap.render_tile(1, 0, 0) is first
+        heatmap.render_tile(3, 0, 0)
+        heatmap.render_tile(3, 0, 0)
+        assert heatmap._tile_cache.hits == 2
+        assert heatmap._tile_cache.misses == 2
+
+    def test_style_change(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        first = heatmap.render_tile(1, 0, 0)
+        heatmap.gradient = ['white', 'red']
+        assert heatmap.render_tile(1, 0, 0) != first
+
+    def test_max_cache_bytes(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        first = heatmap.render_tile(1, 0, 0)
+        heatmap.max_cache_bytes = len(first) + 500
+        heatmap.render_tile(1, 1, 1)
+        assert len(heatmap._tile_cache) == 1
+        assert heatmap.cache_bytes <= heatmap.max_cache_bytes
+
+    def test_cache_statistics(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        tile = heatmap.render_tile(1, 0, 0)
+        heatmap.render_tile(1, 0, 0)
+        assert heatmap.cache_hits == 1
+        assert heatmap.cache_misses == 1
+        assert heatmap.cache_bytes > len(tile)
+        with self.assertRaises(traitlets.TraitError):
+            heatmap.cache_hits = 0
+
+    def test_no_fingerprint_without_tile_store(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        heatmap.render_tile(1, 0, 0)
+        assert heatmap._data_fingerprint is None
+
+    def test_tile_store(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'tiles.mbtiles')
+            heatmap = heatmap_tile_layer(self.locations, tile_store=path)
+            tile = heatmap.render_tile(1, 0, 0)
+            heatmap.tile_store = None
+            new_heatmap = heatmap_tile_layer(
+                self.locations, tile_store=path)
+            assert new_heatmap.render_tile(1, 0, 0) == tile
+            assert new_heatmap.cache_hits == 1
+            # Tiles for other data are not reused
+            other_heatmap = heatmap_tile_layer(
+                self.locations[:2], tile_store=path)
+            other_heatmap.render_tile(1, 0, 0)
+            assert other_heatmap.cache_hits == 0
+            new_heatmap.tile_store = None
+            other_heatmap.tile_store = None
+        finally:
+            shutil.rmtree(directory)
+
+    def test_tile_request(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        messages = capture_messages(heatmap)
+        heatmap._handle_message(None, {
+            'event': 'TILE_REQUESTED',
+            'payload': {'requestId': 7, 'zoom': 1, 'x': 0, 'y': 0}
+        }, [])
+        [(message, buffers)] = messages
+        assert message == {
+            'event': 'TILE_RENDERED',
+            'payload': {'requestId': 7, 'isEmpty': False}
+        }
+        assert buffers == [heatmap.render_tile(1, 0, 0)]
+
+    def test_empty_tile_request(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        messages = capture_messages(heatmap)
+        heatmap._handle_message(None, {
+            'event': 'TILE_REQUESTED',
+            'payload': {'requestId': 8, 'zoom': 5, 'x': 0, 'y': 0}
+        }, [])
+        [(message, buffers)] = messages
+        assert message['payload']['isEmpty']
+        assert buffers == []
+
+    def test_set_data(self):
+        heatmap = heatmap_tile_layer(self.locations)
+        heatmap.render_tile(1, 0, 0)
+        messages = capture_messages(heatmap)
+        heatmap.set_data([(-40.0, 100.0)], [2.0])
+        assert messages == [({'event': 'TILES_CHANGED', 'payload': {}}, None)]
+        assert heatmap.render_tile(1, 0, 0) is None
+        assert heatmap.render_tile(1, 1, 1) is not None
+
+    def test_invalid_weights(self):
+        with self.assertRaises(InvalidWeightException):
+            heatmap_tile_layer(self.locations, weights=[1.0, -1.0, 1.0])
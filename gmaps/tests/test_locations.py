@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pytest
+
+from ..locations import locations_to_list, locations_to_array
+
+
+class LocationsToList(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0), (20.0, -30.0)]
+
+    def test_list(self):
+        assert locations_to_list(self.locations) == self.locations
+
+    def test_generator(self):
+        locations = (location for location in self.locations)
+        assert locations_to_list(locations) == self.locations
+
+    def test_np_array(self):
+        locations = locations_to_list(np.array(self.locations))
+        assert locations == self.locations
+        assert all(isinstance(latitude, float) for latitude, _ in locations)
+
+    def test_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame.from_records(
+            self.locations, columns=['latitude', 'longitude'])
+        assert locations_to_list(df) == self.locations
+
+    def test_dataframe_mixed_dtypes(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame({
+            'latitude': np.array([-5, 10, 20], dtype=np.int64),
+            'longitude': np.array([5.0, 10.0, -30.0], dtype=np.float32)
+        })
+        assert locations_to_list(df) == self.locations
+
+    def test_arrow_table(self):
+        pa = pytest.importorskip('pyarrow')
+        latitudes, longitudes = zip(*self.locations)
+        table = pa.table({
+            'latitude': list(latitudes), 'longitude': list(longitudes)})
+        assert locations_to_list(table) == self.locations
+
+    def test_non_numeric_falls_back(self):
+        locations = np.array([('not-a', 'latitude')])
+        assert locations_to_list(locations) == [('not-a', 'latitude')]
+
+
+class LocationsToArray(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0), (20.0, -30.0)]
+
+    def test_list(self):
+        locations = locations_to_array(self.locations)
+        assert locations.shape == (3, 2)
+        assert locations.dtype == np.float64
+        assert locations.flags['C_CONTIGUOUS']
+        expected = [list(location) for location in self.locations]
+        assert locations.tolist() == expected
+
+    def test_empty_list(self):
+        assert locations_to_array([]).shape == (0, 2)
+
+    def test_dataframe(self):
+        pd = pytest.importorskip('pandas')
+        df = pd.DataFrame.from_records(
+            self.locations, columns=['latitude', 'longitude'])
+        locations = locations_to_array(df)
+        assert locations.flags['C_CONTIGUOUS']
+        expected = [list(location) for location in self.locations]
+        assert locations.tolist() == expected
+
+    def test_fortran_ordered_array(self):
+        locations = np.asfortranarray(np.array(self.locations))
+        locations_array = locations_to_array(locations)
+        assert locations_array.flags['C_CONTIGUOUS']
+        assert locations_array.tolist() == locations.tolist()
+
+    def test_reject_wrong_number_columns(self):
+        with self.assertRaises(ValueError):
+            locations_to_array(np.zeros((3, 3)))
+
+    def test_reject_non_numeric(self):
+        with self.assertRaises(ValueError):
+            locations_to_array([('not-a', 'latitude')])
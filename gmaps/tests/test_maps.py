@@ -1,6 +1,7 @@
 
 import unittest
 
+import ipywidgets
 import traitlets
 
 from .. import maps, heatmap_layer
@@ -84,3 +85,44 @@ class SerializeViewport(unittest.TestCase):
             'zoom_level': 3
         }
         assert maps._serialize_viewport(viewport, None) == expected
+
+
+class _ViewportLayer(ipywidgets.Widget):
+    has_bounds = False
+
+    def __init__(self):
+        super(_ViewportLayer, self).__init__()
+        self.viewports = []
+
+    def update_viewport(self, bounds, zoom):
+        self.viewports.append((bounds, zoom))
+
+
+class CurrentViewport(unittest.TestCase):
+
+    def test_defaults(self):
+        state = maps.Map().get_state()
+        assert state['current_bounds'] is None
+        assert state['current_zoom'] is None
+
+    def test_update_layers(self):
+        layer = _ViewportLayer()
+        m = maps.Map()
+        m.layers = [heatmap_layer([(1.0, 2.0)])]
+        m.layers = list(m.layers) + [layer]
+        assert layer.viewports == []
+        m.set_state({
+            'current_bounds': [[1.0, 2.0], [3.0, 4.0]],
+            'current_zoom': 5
+        })
+        assert layer.viewports == [([(1.0, 2.0), (3.0, 4.0)], 5)]
+
+    def test_new_layer(self):
+        m = maps.Map()
+        m.set_state({
+            'current_bounds': [[1.0, 2.0], [3.0, 4.0]],
+            'current_zoom': 5
+        })
+        layer = _ViewportLayer()
+        m.layers = [layer]
+        assert layer.viewports == [([(1.0, 2.0), (3.0, 4.0)], 5)]
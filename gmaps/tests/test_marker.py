@@ -5,10 +5,13 @@ import pytest
 import numpy as np
 import traitlets
 
+from ..bounds import BoundsAccumulator
+from ..colormaps import colormap, MappedColors
 from ..marker import (
     MarkerOptions,
     Marker,
     Markers,
+    CompactMarkers,
     Symbol,
     marker_layer,
     symbol_layer
@@ -166,6 +169,12 @@ class SymbolLayer(unittest.TestCase):
         for symbol in symbols.markers:
             assert symbol.stroke_color == 'rgba(10,10,10,0.5)'
 
+    def test_mapped_colors(self):
+        colors = MappedColors(["red", "green"], [1, 0])
+        symbols = symbol_layer(self.locations, fill_color=colors)
+        fill_colors = [symbol.fill_color for symbol in symbols.markers]
+        assert fill_colors == ["green", "red"]
+
     def test_stroke_color_list_text(self):
         options = self._add_default_options(stroke_color=["red", "green"])
         symbols = symbol_layer(self.locations, **options)
@@ -360,3 +369,249 @@ class MarkersTest(unittest.TestCase):
     def test_bounds_no_markers(self):
         layer = Markers(markers=[])
         assert not layer.has_bounds
+
+    def _assert_bounds_equal(self, layer, markers):
+        expected = Markers(markers=markers).data_bounds
+        for actual_bound, expected_bound in zip(
+                layer.data_bounds, expected):
+            assert actual_bound == pytest.approx(expected_bound)
+
+    def test_bounds_add_markers(self):
+        layer = Markers(markers=self.symbols)
+        new_symbol = Symbol(location=(40.0, -20.0))
+        layer.markers = self.symbols + [new_symbol]
+        self._assert_bounds_equal(layer, self.symbols + [new_symbol])
+
+    def test_bounds_remove_markers(self):
+        symbols = self.symbols + [
+            Symbol(location=(40.0, -20.0)), Symbol(location=(41.0, -21.0))]
+        layer = Markers(markers=symbols)
+        layer.markers = symbols[1:]
+        self._assert_bounds_equal(layer, symbols[1:])
+
+    def test_bounds_moved_marker_removed(self):
+        symbols = self.symbols + [
+            Symbol(location=(40.0, -20.0)), Symbol(location=(41.0, -21.0))]
+        layer = Markers(markers=symbols)
+        symbols[0].location = (-30.0, 50.0)
+        layer.markers = symbols[1:]
+        self._assert_bounds_equal(layer, symbols[1:])
+
+    def test_bounds_moved_marker_kept(self):
+        symbols = self.symbols + [
+            Symbol(location=(40.0, -20.0)), Symbol(location=(41.0, -21.0))]
+        layer = Markers(markers=symbols[:3])
+        symbols[0].location = (-50.0, -50.0)
+        layer.markers = symbols
+        self._assert_bounds_equal(layer, symbols)
+
+    def test_bounds_repeated_markers(self):
+        symbols = self.symbols + [Symbol(location=(40.0, -20.0))]
+        layer = Markers(markers=symbols)
+        repeated = symbols + [symbols[2]] * 3
+        layer.markers = repeated
+        expected = BoundsAccumulator.from_locations(
+            [symbol.location for symbol in repeated]).bounds()
+        for actual_bound, expected_bound in zip(layer.data_bounds, expected):
+            assert actual_bound == pytest.approx(expected_bound)
+        layer.markers = repeated[:-1]
+        self._assert_bounds_equal(layer, repeated[:-1])
+
+
+class CompactMarkerLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0)]
+
+    def test_marker_layer(self):
+        layer = marker_layer(
+            self.locations, hover_text=['t1', 't2'], label='A',
+            compact=True)
+        assert isinstance(layer, CompactMarkers)
+        state = layer.get_state()
+        assert state['marker_type'] == 'marker'
+        assert state['locations'] == self.locations
+        assert state['hover_text'] == ['t1', 't2']
+        assert state['label'] == 'A'
+
+    def test_symbol_layer(self):
+        layer = symbol_layer(
+            self.locations, fill_color='red',
+            stroke_color=[(100, 0, 0), (0, 100, 0)],
+            scale=[2, 5], compact=True)
+        state = layer.get_state()
+        assert state['marker_type'] == 'symbol'
+        assert state['fill_color'] == 'red'
+        assert state['stroke_color'] == ['rgb(100,0,0)', 'rgb(0,100,0)']
+        assert state['scale'] == [2, 5]
+        assert state['fill_opacity'] == 1.0
+
+    def test_locations_array(self):
+        layer = marker_layer(np.array(self.locations), compact=True)
+        assert layer.locations == self.locations
+
+    def test_infobox_default(self):
+        layer = marker_layer(self.locations, compact=True)
+        assert not layer.display_info_box
+        assert layer.info_box_content == ''
+
+    def test_infobox_content_lists(self):
+        layer = marker_layer(
+            self.locations, info_box_content=['c1', None], compact=True)
+        assert layer.info_box_content == ['c1', '']
+        assert layer.display_info_box == [True, False]
+
+    def test_column_length_mismatch(self):
+        with pytest.raises(ValueError, match='hover_text'):
+            marker_layer(
+                self.locations, hover_text=['t1', 't2', 't3'],
+                compact=True)
+
+    def test_invalid_style(self):
+        with self.assertRaises(traitlets.TraitError):
+            symbol_layer(self.locations, scale=[1, 0], compact=True)
+
+    def test_invalid_style_row(self):
+        with pytest.raises(traitlets.TraitError, match='row 1'):
+            symbol_layer(
+                self.locations, fill_color=['red', 'not-a-color'],
+                compact=True)
+
+    def test_style_array(self):
+        layer = symbol_layer(
+            self.locations, scale=np.array([2, 5]), compact=True)
+        assert layer.scale == [2, 5]
+        assert all(type(scale) is int for scale in layer.scale)
+
+    def test_infobox_display_list(self):
+        layer = marker_layer(
+            self.locations, info_box_content='content',
+            display_info_box=[True, None], compact=True)
+        assert layer.info_box_content == 'content'
+        assert layer.display_info_box == [True, True]
+
+    def test_mapped_colors(self):
+        colors = colormap([1.0, 2.0], colors=['white', 'red'],
+                          number_colors=2)
+        layer = symbol_layer(self.locations, fill_color=colors, compact=True)
+        assert layer.fill_color is colors
+        state = layer.get_state()
+        assert state['fill_color']['palette'] == colors.palette
+        assert state['fill_color']['indices']['dtype'] == 'uint8'
+        markers = layer.to_markers()
+        assert [symbol.fill_color for symbol in markers.markers] == \
+            ['rgb(255,255,255)', 'rgb(255,0,0)']
+
+    def test_mapped_colors_length_mismatch(self):
+        colors = colormap([1.0, 2.0, 3.0])
+        with pytest.raises(ValueError, match='stroke_color'):
+            symbol_layer(self.locations, stroke_color=colors, compact=True)
+
+    def test_bounds(self):
+        layer = marker_layer(self.locations, compact=True)
+        expected = marker_layer(self.locations)
+        assert layer.has_bounds
+        assert layer.data_bounds == pytest.approx(expected.data_bounds)
+
+    def test_empty(self):
+        layer = marker_layer([], compact=True)
+        assert not layer.has_bounds
+
+    def test_binary_encoding(self):
+        layer = CompactMarkers(
+            locations=self.locations, data_encoding='float64')
+        payload = layer.get_state()['locations']
+        decoded = np.frombuffer(payload['buffer'], dtype='float64')
+        assert decoded.tolist() == [-5.0, 5.0, 10.0, 10.0]
+
+    def test_to_markers(self):
+        layer = symbol_layer(
+            self.locations, fill_color=['red', 'blue'],
+            info_box_content='content', compact=True)
+        markers = layer.to_markers()
+        assert isinstance(markers, Markers)
+        assert [symbol.location for symbol in markers.markers] == \
+            self.locations
+        assert [symbol.fill_color for symbol in markers.markers] == \
+            ['red', 'blue']
+        for symbol in markers.markers:
+            assert isinstance(symbol, Symbol)
+            assert symbol.display_info_box
+            assert symbol.info_box_content == 'content'
+
+
+class MarkerClustering(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0)]
+
+    def test_defaults(self):
+        layer = marker_layer(self.locations)
+        state = layer.get_state()
+        assert not state['cluster']
+        assert state['cluster_radius'] == 60
+        assert state['cluster_max_zoom'] == 15
+
+    def test_marker_layer(self):
+        layer = marker_layer(
+            self.locations, cluster=True, cluster_radius=40,
+            cluster_max_zoom=10)
+        state = layer.get_state()
+        assert state['cluster']
+        assert state['cluster_radius'] == 40
+        assert state['cluster_max_zoom'] == 10
+
+    def test_symbol_layer(self):
+        layer = symbol_layer(self.locations, cluster=True)
+        assert layer.cluster
+
+    def test_compact_layer(self):
+        layer = marker_layer(
+            self.locations, cluster=True, cluster_radius=40, compact=True)
+        state = layer.get_state()
+        assert state['cluster']
+        assert state['cluster_radius'] == 40
+
+    def test_invalid_radius(self):
+        with self.assertRaises(traitlets.TraitError):
+            marker_layer(self.locations, cluster=True, cluster_radius=0)
+
+    def test_invalid_max_zoom(self):
+        with self.assertRaises(traitlets.TraitError):
+            marker_layer(self.locations, cluster=True, cluster_max_zoom=25)
+
+
+class MarkerViewportOnly(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.0, 0.0), (0.5, 0.5), (40.0, 40.0)]
+
+    def test_update_viewport(self):
+        layer = symbol_layer(
+            self.locations, fill_color=['red', 'green', 'blue'],
+            hover_text='text', compact=True, viewport_only=True)
+        layer.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        assert layer.locations == [(0.0, 0.0), (0.5, 0.5)]
+        assert layer.fill_color == ['red', 'green']
+        assert layer.hover_text == 'text'
+        layer.update_viewport(((-50.0, -50.0), (-49.0, -49.0)), 10)
+        assert layer.locations == []
+        assert layer.fill_color == []
+
+    def test_bounds_cover_all_markers(self):
+        layer = marker_layer(
+            self.locations, compact=True, viewport_only=True)
+        expected = marker_layer(self.locations).data_bounds
+        layer.update_viewport(((-0.1, -0.1), (0.6, 0.6)), 10)
+        assert layer.has_bounds
+        assert np.allclose(layer.data_bounds, expected)
+
+    def test_invalid_style(self):
+        with self.assertRaises(traitlets.TraitError):
+            symbol_layer(
+                self.locations, scale=[1, 2, 0],
+                compact=True, viewport_only=True)
+
+    def test_requires_compact(self):
+        with self.assertRaises(ValueError):
+            marker_layer(self.locations, viewport_only=True)
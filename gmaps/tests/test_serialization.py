@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from .. import serialization
+
+
+class PackArray(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(-5.0, 5.0), (10.0, 10.0), (20.0, -30.0)]
+        self.weights = [0.2, 0.5, 1.0]
+
+    def test_rows(self):
+        payload = serialization.pack_array(self.locations, 'float64')
+        assert payload['dtype'] == 'float64'
+        assert payload['shape'] == [3, 2]
+        decoded = np.frombuffer(payload['buffer'], dtype='float64')
+        assert decoded.reshape(3, 2).tolist() == [
+            list(location) for location in self.locations]
+
+    def test_flat(self):
+        payload = serialization.pack_array(self.weights, 'float32')
+        assert payload['shape'] == [3]
+        decoded = np.frombuffer(payload['buffer'], dtype='float32')
+        assert np.allclose(decoded, self.weights)
+
+    def test_without_numpy(self):
+        for dtype in ['float64', 'float32']:
+            payload = serialization._pack_with_array(self.locations, dtype)
+            expected = serialization._pack_with_numpy(self.locations, dtype)
+            assert payload['shape'] == expected['shape']
+            assert payload['buffer'].tobytes() == \
+                expected['buffer'].tobytes()
+
+    def test_flat_without_numpy(self):
+        payload = serialization._pack_with_array(self.weights, 'float64')
+        assert payload['shape'] == [3]
+        assert payload['buffer'].tobytes() == \
+            np.array(self.weights).tobytes()
+
+    def test_invalid_dtype(self):
+        with self.assertRaises(ValueError):
+            serialization.pack_array(self.weights, 'int8')
@@ -0,0 +1,136 @@
+import math
+import unittest
+
+import pytest
+
+from ..simplify import (
+    simplify_geometries, auto_simplify_levels, count_vertices,
+    pixel_tolerance)
+
+
+def _wiggly_line(number_points, amplitude=0.001, longitude=0.0):
+    # Line along a meridian, with small zigzags
+    return [
+        [
+            longitude + amplitude * math.sin(index),
+            index / float(number_points - 1)
+        ]
+        for index in range(number_points)
+    ]
+
+
+class SimplifyGeometries(unittest.TestCase):
+
+    def setUp(self):
+        # Two squares sharing a wiggly border along the meridian
+        border = _wiggly_line(101)
+        self.west = {
+            "type": "Polygon",
+            "coordinates": [
+                [[-1.0, 0.0]] + border + [[-1.0, 1.0], [-1.0, 0.0]]]
+        }
+        self.east = {
+            "type": "Polygon",
+            "coordinates": [
+                [[1.0, 1.0]] + border[::-1] + [[1.0, 0.0], [1.0, 1.0]]]
+        }
+
+    def test_reduces_vertices(self):
+        line = {"type": "LineString", "coordinates": _wiggly_line(1000)}
+        [simplified] = simplify_geometries([line], 0.01)
+        assert simplified["type"] == "LineString"
+        assert len(simplified["coordinates"]) == 2
+        assert simplified["coordinates"][0] == line["coordinates"][0]
+        assert simplified["coordinates"][-1] == line["coordinates"][-1]
+        assert len(line["coordinates"]) == 1000
+
+    def test_within_tolerance(self):
+        line = {"type": "LineString", "coordinates": _wiggly_line(1000)}
+        [simplified] = simplify_geometries([line], 1e-4)
+        assert 2 < len(simplified["coordinates"]) < 1000
+        [exact] = simplify_geometries([line], 0.0)
+        assert len(exact["coordinates"]) == 1000
+
+    def test_rings_stay_valid(self):
+        [simplified] = simplify_geometries([self.west], 10.0)
+        [ring] = simplified["coordinates"]
+        assert len(ring) >= 4
+        assert ring[0] == ring[-1]
+
+    def test_shared_borders(self):
+        west, east = simplify_geometries([self.west, self.east], 1e-4)
+        [west_ring] = west["coordinates"]
+        [east_ring] = east["coordinates"]
+        west_border = [
+            position for position in west_ring if abs(position[0]) < 1.0]
+        east_border = [
+            position for position in east_ring if abs(position[0]) < 1.0]
+        assert 2 < len(west_border) < 101
+        assert west_border == east_border[::-1]
+
+    def test_points_untouched(self):
+        point = {"type": "Point", "coordinates": [1.0, 2.0]}
+        multi_point = {
+            "type": "MultiPoint", "coordinates": _wiggly_line(10)}
+        assert simplify_geometries([point, multi_point], 1.0) == \
+            [point, multi_point]
+
+    def test_nested_geometries(self):
+        collection = {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [1.0, 2.0]},
+                {
+                    "type": "MultiPolygon",
+                    "coordinates": [self.west["coordinates"]]
+                },
+                {
+                    "type": "MultiLineString",
+                    "coordinates": [
+                        _wiggly_line(50, longitude=5.0),
+                        _wiggly_line(20, longitude=6.0)
+                    ]
+                }
+            ]
+        }
+        [simplified] = simplify_geometries([collection], 0.01)
+        point, multi_polygon, multi_line_string = simplified["geometries"]
+        assert point == collection["geometries"][0]
+        assert len(multi_polygon["coordinates"][0][0]) < 105
+        assert [len(line) for line in multi_line_string["coordinates"]] == \
+            [2, 2]
+
+
+class AutoSimplifyLevels(unittest.TestCase):
+
+    def test_levels(self):
+        line = {"type": "LineString", "coordinates": _wiggly_line(1000)}
+        levels = auto_simplify_levels([line])
+        zooms = [zoom for (zoom, _) in levels]
+        assert zooms == sorted(zooms)
+        assert levels[-1][1] is None
+        vertices = [
+            count_vertices(geometries) for (_, geometries) in levels[:-1]]
+        assert vertices == sorted(vertices)
+        assert vertices[0] < 1000
+
+    def test_no_identical_levels(self):
+        border = _wiggly_line(101)
+        polygon = {
+            "type": "Polygon",
+            "coordinates": [
+                [[-1.0, 0.0]] + border + [[-1.0, 1.0], [-1.0, 0.0]]]
+        }
+        levels = auto_simplify_levels([polygon])
+        vertices = [
+            count_vertices(geometries) for (_, geometries) in levels[:-1]]
+        assert len(vertices) > 1
+        assert len(set(vertices)) == len(vertices)
+
+    def test_no_simplification(self):
+        point = {"type": "Point", "coordinates": [1.0, 2.0]}
+        assert auto_simplify_levels([point]) == [(0, None)]
+
+    def test_pixel_tolerance(self):
+        assert pixel_tolerance(0, 256) == pytest.approx(360.0)
+        assert pixel_tolerance(1) == pytest.approx(360.0 / 512)
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..tile_cache import TileCache, MBTilesStore, _ENTRY_OVERHEAD_BYTES
+
+
+class TileCacheTests(unittest.TestCase):
+
+    def _cache(self, number_bytes):
+        # Cache that can hold `number_bytes` of tile data
+        return TileCache(number_bytes + 2 * _ENTRY_OVERHEAD_BYTES)
+
+    def test_get(self):
+        cache = self._cache(10)
+        cache.put((0, 0, 0, 's'), b'tile')
+        assert cache.get((0, 0, 0, 's')) == b'tile'
+        assert cache.get((0, 0, 0, 'other')) is None
+
+    def test_least_recently_used(self):
+        cache = self._cache(10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        assert cache.get('a') == b'12345'
+        cache.put('c', b'12345')
+        assert 'b' not in cache
+        assert 'a' in cache
+        assert 'c' in cache
+        assert len(cache) == 2
+
+    def test_large_tiles_evict_several(self):
+        cache = self._cache(10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.put('c', b'1234567890')
+        assert len(cache) == 1
+        assert cache.size_bytes == 10 + _ENTRY_OVERHEAD_BYTES
+
+    def test_replace(self):
+        cache = self._cache(10)
+        cache.put('a', b'12345')
+        cache.put('a', b'123')
+        assert cache.get('a') == b'123'
+        assert cache.size_bytes == 3 + _ENTRY_OVERHEAD_BYTES
+
+    def test_empty_tiles_count(self):
+        cache = TileCache(10 * _ENTRY_OVERHEAD_BYTES)
+        for index in range(20):
+            cache.put(index, b'')
+        assert len(cache) == 10
+
+    def test_resize(self):
+        cache = self._cache(10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.resize(5 + _ENTRY_OVERHEAD_BYTES)
+        assert list(cache._tiles) == ['b']
+
+    def test_hits_and_misses(self):
+        cache = self._cache(10)
+        cache.put('a', b'1')
+        cache.get('a')
+        cache.get('b')
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_clear(self):
+        cache = self._cache(10)
+        cache.put('a', b'1')
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+
+class MBTilesStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tiles.mbtiles')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_persists(self):
+        store = MBTilesStore(self.path)
+        store.put((2, 1, 0, 'style'), b'tile')
+        store.close()
+        store = MBTilesStore(self.path)
+        assert store.get((2, 1, 0, 'style')) == b'tile'
+        assert store.get((2, 1, 0, 'other')) is None
+        assert len(store) == 1
+        store.close()
+
+    def test_tms_rows(self):
+        store = MBTilesStore(self.path)
+        store.put((2, 1, 0, 'style'), b'tile')
+        (tile_row,) = store._connection.execute(
+            'SELECT tile_row FROM tiles').fetchone()
+        assert tile_row == 3
+        store.close()
+
+    def test_clear(self):
+        store = MBTilesStore(self.path)
+        store.put((0, 0, 0, 'style'), b'tile')
+        store.clear()
+        assert len(store) == 0
+        store.close()
+
+    def test_cache_reads_through(self):
+        store = MBTilesStore(self.path)
+        store.put((0, 0, 0, 'style'), b'tile')
+        cache = TileCache(store=store)
+        assert cache.get((0, 0, 0, 'style')) == b'tile'
+        assert cache.hits == 1
+        assert (0, 0, 0, 'style') in cache
+        cache.put((1, 0, 0, 'style'), b'other')
+        assert store.get((1, 0, 0, 'style')) == b'other'
+        store.close()
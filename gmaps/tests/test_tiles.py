@@ -0,0 +1,158 @@
+import struct
+import unittest
+import zlib
+
+import numpy as np
+import pytest
+
+from ..tiles import (
+    color_to_rgba, gradient_colormap, encode_png, TilePointIndex,
+    render_heatmap_tile, TILE_SIZE
+)
+
+
+def _decode_png(png):
+    """
+    Decode a PNG image written by `encode_png` to an RGBA array
+    """
+    assert png[:8] == b'\x89PNG\r\n\x1a\n'
+    position = 8
+    chunks = {}
+    while position < len(png):
+        (length,) = struct.unpack('>I', png[position:position+4])
+        chunk_type = png[position+4:position+8]
+        data = png[position+8:position+8+length]
+        (checksum,) = struct.unpack(
+            '>I', png[position+8+length:position+12+length])
+        assert checksum == zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+        chunks[chunk_type] = data
+        position += 12 + length
+    width, height, bit_depth, color_type, _, _, _ = struct.unpack(
+        '>IIBBBBB', chunks[b'IHDR'])
+    assert (bit_depth, color_type) == (8, 6)
+    rows = np.frombuffer(
+        zlib.decompress(chunks[b'IDAT']), dtype=np.uint8
+    ).reshape(height, 1 + 4 * width)
+    assert (rows[:, 0] == 0).all()
+    assert b'IEND' in chunks
+    return rows[:, 1:].reshape(height, width, 4)
+
+
+class ColorToRgba(unittest.TestCase):
+
+    def test_name(self):
+        assert color_to_rgba('navy') == (0, 0, 128, 1.0)
+
+    def test_hex(self):
+        assert color_to_rgba('#ff8000') == (255, 128, 0, 1.0)
+        assert color_to_rgba('#f80') == (255, 136, 0, 1.0)
+
+    def test_rgb(self):
+        assert color_to_rgba('rgb(1,2,3)') == (1, 2, 3, 1.0)
+
+    def test_rgba(self):
+        assert color_to_rgba('rgba(1, 2, 3, 0.5)') == (1, 2, 3, 0.5)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            color_to_rgba('not-a-color')
+
+
+class GradientColormap(unittest.TestCase):
+
+    def test_interpolation(self):
+        colormap = gradient_colormap(
+            ['rgba(0,0,0,0)', 'rgba(255,0,0,1)'], size=3)
+        assert colormap.tolist() == [
+            [0, 0, 0, 0], [128, 0, 0, 128], [255, 0, 0, 255]]
+
+    def test_single_color(self):
+        colormap = gradient_colormap(['red'], size=2)
+        assert colormap.tolist() == [[255, 0, 0, 255], [255, 0, 0, 255]]
+
+
+class EncodePng(unittest.TestCase):
+
+    def test_round_trip(self):
+        rgba = np.arange(3 * 5 * 4, dtype=np.uint8).reshape(3, 5, 4)
+        assert (_decode_png(encode_png(rgba)) == rgba).all()
+
+
+class TilePointIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        # Points in the four tiles at zoom 1, in the order
+        # north-west, north-east, south-west, south-east
+        locations = [(10.0, -10.0), (10.0, 10.0), (-10.0, -10.0),
+                     (-10.0, 10.0), (-20.0, 20.0)]
+        self.index = TilePointIndex(locations, [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def _tile_weights(self, zoom, x, y):
+        return sorted(self.index.weights[
+            self.index.tile_slice(zoom, x, y)].tolist())
+
+    def test_tile_slice(self):
+        assert self._tile_weights(0, 0, 0) == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert self._tile_weights(1, 0, 0) == [1.0]
+        assert self._tile_weights(1, 1, 0) == [2.0]
+        assert self._tile_weights(1, 0, 1) == [3.0]
+        assert self._tile_weights(1, 1, 1) == [4.0, 5.0]
+
+    def test_points_near_tile(self):
+        pixel_x, pixel_y, weights = self.index.points_near_tile(
+            1, 0, 0, 20)
+        # Only the points within 20 pixels of the north-west tile
+        assert sorted(weights.tolist()) == [1.0, 2.0, 3.0, 4.0]
+        first = weights.tolist().index(1.0)
+        assert pixel_x[first] == pytest.approx(256.0 - 256.0 * 10.0 / 180.0)
+        _, _, weights = self.index.points_near_tile(1, 0, 0, 5)
+        assert weights.tolist() == [1.0]
+
+    def test_wraps_around_antimeridian(self):
+        index = TilePointIndex([(0.0, 179.9)], [1.0])
+        pixel_x, _, _ = index.points_near_tile(1, 0, 0, 10)
+        # The point is just west of the left edge of the western tile
+        assert pixel_x.tolist() == [pytest.approx(-0.1 * 512.0 / 360.0)]
+
+    def test_max_density(self):
+        assert self.index.max_density(0, 256) == pytest.approx(15.0)
+        assert self.index.max_density(1, 256) == pytest.approx(9.0)
+
+    def test_fingerprint(self):
+        locations = [(10.0, -10.0), (10.0, 10.0), (-10.0, -10.0),
+                     (-10.0, 10.0), (-20.0, 20.0)]
+        same = TilePointIndex(locations, [1.0, 2.0, 3.0, 4.0, 5.0])
+        assert same.fingerprint() == self.index.fingerprint()
+        other = TilePointIndex(locations, [1.0, 2.0, 3.0, 4.0, 6.0])
+        assert other.fingerprint() != self.index.fingerprint()
+
+    def test_empty(self):
+        index = TilePointIndex(np.empty((0, 2)), [])
+        assert index.max_density(0, 10) == 0.0
+        _, _, weights = index.points_near_tile(0, 0, 0, 10)
+        assert len(weights) == 0
+
+
+class RenderHeatmapTile(unittest.TestCase):
+
+    def setUp(self):
+        self.colormap = gradient_colormap(
+            ['rgba(0,0,255,0)', 'rgba(255,0,0,1)'])
+
+    def test_isolated_point(self):
+        rgba = render_heatmap_tile(
+            np.array([100.5]), np.array([50.5]), np.array([2.0]),
+            radius=10, max_intensity=2.0, colormap=self.colormap)
+        assert rgba.shape == (TILE_SIZE, TILE_SIZE, 4)
+        # The hottest color at the point, fading away from it
+        assert rgba[50, 100].tolist() == [255, 0, 0, 255]
+        assert 0 < rgba[50, 105, 3] < 255
+        assert rgba[50, 120, 3] == 0
+        assert rgba[0, 0].tolist() == [0, 0, 0, 0]
+
+    def test_points_outside_tile(self):
+        rgba = render_heatmap_tile(
+            np.array([-3.0]), np.array([10.0]), np.array([1.0]),
+            radius=10, max_intensity=1.0, colormap=self.colormap)
+        assert rgba[10, 0, 3] > 0
+        assert rgba[10, 20, 3] == 0
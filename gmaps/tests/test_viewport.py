@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+import pytest
+
+from ..viewport import in_bounds, pad_bounds, ViewportData
+
+
+class InBounds(unittest.TestCase):
+
+    def test_in_bounds(self):
+        latitudes = np.array([0.0, 5.0, 20.0])
+        longitudes = np.array([0.0, 5.0, 5.0])
+        mask = in_bounds(latitudes, longitudes, ((-1.0, -1.0), (10.0, 10.0)))
+        assert mask.tolist() == [True, True, False]
+
+    def test_across_antimeridian(self):
+        latitudes = np.zeros(3)
+        longitudes = np.array([175.0, -175.0, 0.0])
+        mask = in_bounds(latitudes, longitudes, ((-1.0, 170.0), (1.0, -170.0)))
+        assert mask.tolist() == [True, True, False]
+
+
+class PadBounds(unittest.TestCase):
+
+    def test_pad(self):
+        bounds = pad_bounds(((0.0, 0.0), (10.0, 20.0)), 0.1)
+        assert bounds == (
+            (pytest.approx(-1.0), pytest.approx(-2.0)),
+            (pytest.approx(11.0), pytest.approx(22.0))
+        )
+
+    def test_clip_latitudes(self):
+        (min_latitude, _), (max_latitude, _) = pad_bounds(
+            ((-85.0, 0.0), (85.0, 10.0)), 0.25)
+        assert min_latitude == -90.0
+        assert max_latitude == 90.0
+
+    def test_wrap_longitudes(self):
+        (_, min_longitude), (_, max_longitude) = pad_bounds(
+            ((0.0, 170.0), (10.0, 178.0)), 0.5)
+        assert min_longitude == pytest.approx(166.0)
+        assert max_longitude == pytest.approx(-178.0)
+
+    def test_whole_world(self):
+        (_, min_longitude), (_, max_longitude) = pad_bounds(
+            ((0.0, -170.0), (10.0, 170.0)), 0.25)
+        assert (min_longitude, max_longitude) == (-180.0, 180.0)
+
+
+class TestViewportData(unittest.TestCase):
+
+    def setUp(self):
+        self.locations = [(0.0, 0.0), (5.0, 5.0), (40.0, 40.0)]
+        self.weights = [1.0, 2.0, 3.0]
+
+    def test_visible(self):
+        data = ViewportData(self.locations, weights=self.weights)
+        locations, columns = data.visible(
+            ((-1.0, -1.0), (6.0, 6.0)), padding=0.0)
+        assert locations.tolist() == [[0.0, 0.0], [5.0, 5.0]]
+        assert columns['weights'].tolist() == [1.0, 2.0]
+
+    def test_extend(self):
+        data = ViewportData(self.locations, weights=self.weights)
+        data.extend([(1.0, 1.0)], weights=[4.0])
+        assert len(data) == 4
+        locations, columns = data.visible(
+            ((-1.0, -1.0), (6.0, 6.0)), padding=0.0)
+        assert len(locations) == 3
+        assert columns['weights'].tolist() == [1.0, 2.0, 4.0]
@@ -0,0 +1,184 @@
+"""
+Caches for map tiles rendered in the kernel
+
+Layers that render image tiles in the kernel, like tiled heatmaps, keep
+the tiles they render in a :class:`TileCache`, so that panning back to
+a region already viewed does not render the tiles again. The cache keeps
+the most recently used tiles in memory, up to a maximum number of bytes.
+Tiles can also be persisted to an :class:`MBTilesStore`, an SQLite file
+that outlives the kernel.
+
+Tiles are identified by keys ``(zoom, x, y, style)``, where ``x`` and
+``y`` are the column and row of the tile in the Google Maps tile grid
+and ``style`` is a string that identifies everything else that affects
+the image, like the data and the colors.
+"""
+
+import collections
+import sqlite3
+
+__all__ = ['TileCache', 'MBTilesStore']
+
+# 64MB holds about two thousand dense heatmap tiles
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Approximate memory used by each entry besides the tile itself, so that
+# empty tiles also count towards the size of the cache
+_ENTRY_OVERHEAD_BYTES = 128
+
+
+class TileCache(object):
+    """
+    Least-recently-used cache of tiles, bounded by their total size
+
+    :param max_bytes:
+        Maximum total size of the tiles kept in memory. The least recently
+        used tiles are dropped first.
+    :type max_bytes: int, optional
+
+    :param store:
+        Optional persistent store, such as a :class:`MBTilesStore`.
+        Tiles missing from memory are looked up in the store, and new
+        tiles are written to it.
+
+    :Examples:
+
+    >>> cache = TileCache(max_bytes=10 * 1024 * 1024)
+    >>> cache.put((3, 2, 5, 'default'), png_bytes)
+    >>> cache.get((3, 2, 5, 'default'))
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, store=None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self._tiles = collections.OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def get(self, key):
+        """
+        Cached tile for `key`, or None if the tile is not cached
+        """
+        tile = self._tiles.pop(key, None)
+        if tile is None and self.store is not None:
+            tile = self.store.get(key)
+            if tile is not None:
+                self.size_bytes += _entry_size(tile)
+        if tile is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # (Re-)insert the tile to mark it as the most recently used
+        self._tiles[key] = tile
+        self._evict()
+        return tile
+
+    def put(self, key, tile):
+        """
+        Add a tile to the cache
+
+        :param tile: the tile, as a bytes object
+        """
+        previous_tile = self._tiles.pop(key, None)
+        if previous_tile is not None:
+            self.size_bytes -= _entry_size(previous_tile)
+        self._tiles[key] = tile
+        self.size_bytes += _entry_size(tile)
+        if self.store is not None:
+            self.store.put(key, tile)
+        self._evict()
+
+    def resize(self, max_bytes):
+        """
+        Change the maximum size of the cache, dropping tiles if needed
+        """
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        """
+        Drop every tile from memory
+
+        Tiles in the persistent store are kept.
+        """
+        self._tiles.clear()
+        self.size_bytes = 0
+
+    def _evict(self):
+        while self.size_bytes > self.max_bytes and self._tiles:
+            _, tile = self._tiles.popitem(last=False)
+            self.size_bytes -= _entry_size(tile)
+
+
+def _entry_size(tile):
+    return len(tile) + _ENTRY_OVERHEAD_BYTES
+
+
+class MBTilesStore(object):
+    """
+    Persistent store of tiles in an SQLite file
+
+    The tiles are stored in a ``tiles`` table laid out as in the MBTiles
+    format, with rows numbered from the south as in the TMS scheme, and
+    an additional ``style`` column. Tiles written by one kernel are
+    available to the next kernel that opens the same file.
+
+    :param path: path to the SQLite file, created if it does not exist
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS tiles ('
+                'zoom_level INTEGER, tile_column INTEGER, '
+                'tile_row INTEGER, style TEXT, tile_data BLOB, '
+                'PRIMARY KEY (zoom_level, tile_column, tile_row, style))'
+            )
+
+    def get(self, key):
+        """
+        Tile stored for `key`, or None if there is no such tile
+        """
+        row = self._connection.execute(
+            'SELECT tile_data FROM tiles WHERE zoom_level = ? '
+            'AND tile_column = ? AND tile_row = ? AND style = ?',
+            self._key_to_row(key)
+        ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, key, tile):
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?)',
+                self._key_to_row(key) + (sqlite3.Binary(tile),)
+            )
+
+    def __len__(self):
+        (count,) = self._connection.execute(
+            'SELECT COUNT(*) FROM tiles').fetchone()
+        return count
+
+    def clear(self):
+        """
+        Delete every tile from the store
+        """
+        with self._connection:
+            self._connection.execute('DELETE FROM tiles')
+
+    def close(self):
+        self._connection.close()
+
+    @staticmethod
+    def _key_to_row(key):
+        zoom, x, y, style = key
+        # MBTiles number rows from the south
+        tms_y = 2 ** zoom - 1 - y
+        return (zoom, x, tms_y, style)
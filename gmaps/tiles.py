@@ -0,0 +1,324 @@
+"""
+Rendering heatmaps as raster tiles in the kernel
+
+Rather than sending points to the browser, tiled heatmaps keep the
+points in the kernel and render 256 x 256 pixel PNG tiles of the heatmap
+when the map asks for them. The cost of drawing a tile depends on the
+number of points in the tile rather than in the whole dataset, since the
+points are sorted along a Z-order curve, so the points in a tile are a
+contiguous slice of the sorted points.
+"""
+
+import hashlib
+import re
+import struct
+import zlib
+
+from . import mercator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TILE_SIZE = mercator.TILE_SIZE
+_TILE_BITS = 8  # log2(TILE_SIZE)
+
+# Color gradient used by Google Maps heatmaps, from transparent for no
+# data to red for the highest intensities
+DEFAULT_GRADIENT = [
+    'rgba(102,255,0,0)',
+    'rgba(102,255,0,1)',
+    'rgba(147,255,0,1)',
+    'rgba(193,255,0,1)',
+    'rgba(238,255,0,1)',
+    'rgba(244,227,0,1)',
+    'rgba(249,198,0,1)',
+    'rgba(255,170,0,1)',
+    'rgba(255,113,0,1)',
+    'rgba(255,57,0,1)',
+    'rgba(255,0,0,1)'
+]
+
+# Number of bits per axis of the grid used to sort the points. Tiles can
+# be rendered for zoom levels up to this value.
+_INDEX_BITS = 24
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_color_values = {
+    'black': (0, 0, 0), 'silver': (192, 192, 192),
+    'gray': (128, 128, 128), 'white': (255, 255, 255),
+    'maroon': (128, 0, 0), 'red': (255, 0, 0),
+    'purple': (128, 0, 128), 'fuschia': (255, 0, 255),
+    'green': (0, 128, 0), 'lime': (0, 255, 0),
+    'olive': (128, 128, 0), 'yellow': (255, 255, 0),
+    'navy': (0, 0, 128), 'blue': (0, 0, 255),
+    'teal': (0, 128, 128), 'aqua': (0, 255, 255)
+}
+
+_color_function_re = re.compile(r'rgba?\(([^)]*)\)$')
+
+
+def color_to_rgba(color):
+    """
+    Convert a color string to an (r, g, b, alpha) tuple
+
+    :param color:
+        A color string, as returned by validating a color with
+        :class:`gmaps.geotraitlets.ColorAlpha`, e.g. 'red', '#ff0000',
+        'rgb(255,0,0)' or 'rgba(255,0,0,0.5)'.
+
+    :returns:
+        Tuple of red, green and blue values between 0 and 255 and an
+        alpha value between 0 and 1.
+    """
+    color = color.replace(' ', '').lower()
+    if color in _color_values:
+        return _color_values[color] + (1.0,)
+    elif color.startswith('#'):
+        hex_digits = color[1:]
+        if len(hex_digits) == 3:
+            hex_digits = ''.join(digit * 2 for digit in hex_digits)
+        red, green, blue = [
+            int(hex_digits[index:index+2], 16) for index in (0, 2, 4)]
+        return (red, green, blue, 1.0)
+    match = _color_function_re.match(color)
+    if match is None:
+        raise ValueError('{} is not a valid color'.format(color))
+    components = match.group(1).split(',')
+    red, green, blue = [int(component) for component in components[:3]]
+    alpha = float(components[3]) if len(components) == 4 else 1.0
+    return (red, green, blue, alpha)
+
+
+def gradient_colormap(gradient, size=256):
+    """
+    Lookup table interpolating linearly between the colors of a gradient
+
+    :returns:
+        Array of shape ``(size, 4)`` of 8-bit RGBA values.
+    """
+    colors = np.array(
+        [color_to_rgba(color) for color in gradient], dtype=float)
+    colors[:, 3] *= 255.0
+    if len(colors) == 1:
+        colors = np.repeat(colors, 2, axis=0)
+    stops = np.linspace(0.0, 1.0, len(colors))
+    positions = np.linspace(0.0, 1.0, size)
+    colormap = np.column_stack([
+        np.interp(positions, stops, colors[:, channel])
+        for channel in range(4)
+    ])
+    return np.round(colormap).astype(np.uint8)
+
+
+def encode_png(rgba):
+    """
+    Encode an array of shape ``(height, width, 4)`` of 8-bit RGBA values
+    as a PNG image
+    """
+    height, width, _ = rgba.shape
+    # Each row of a PNG image starts with its filter type, 0 for none
+    rows = np.zeros((height, 1 + 4 * width), dtype=np.uint8)
+    rows[:, 1:] = np.asarray(rgba, dtype=np.uint8).reshape(height, -1)
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return b''.join([
+        _PNG_SIGNATURE,
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)),
+        _png_chunk(b'IEND', b'')
+    ])
+
+
+def _png_chunk(chunk_type, data):
+    checksum = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return b''.join([
+        struct.pack('>I', len(data)),
+        chunk_type,
+        data,
+        struct.pack('>I', checksum)
+    ])
+
+
+class TilePointIndex(object):
+    """
+    Points sorted so that the points in any map tile can be found quickly
+
+    :param locations: array of shape ``(n, 2)`` of latitudes and longitudes
+    :param weights: array of ``n`` non-negative weights
+    """
+    def __init__(self, locations, weights):
+        if np is None:
+            raise ImportError('Rendering heatmap tiles requires numpy')
+        locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+        x, y = mercator.world_coordinates(locations[:, 0], locations[:, 1])
+        cells_per_axis = 2 ** _INDEX_BITS
+        columns = np.clip(
+            (x * cells_per_axis).astype(np.uint64), 0, cells_per_axis - 1)
+        rows = np.clip(
+            (y * cells_per_axis).astype(np.uint64), 0, cells_per_axis - 1)
+        keys = mercator.zorder_keys(columns, rows)
+        order = np.argsort(keys, kind='mergesort')
+        self.keys = keys[order]
+        self.x = x[order]
+        self.y = y[order]
+        self.weights = np.asarray(weights, dtype=float)[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def fingerprint(self):
+        """
+        SHA-1 digest of the points and their weights, as a hex string
+        """
+        digest = hashlib.sha1()
+        for values in (self.x, self.y, self.weights):
+            # Hash the array's buffer directly rather than a copy
+            digest.update(memoryview(np.ascontiguousarray(values)))
+        return digest.hexdigest()
+
+    def tile_slice(self, zoom, tile_x, tile_y):
+        """
+        Slice of the sorted points that lie within a tile
+        """
+        if not 0 <= zoom <= _INDEX_BITS:
+            raise ValueError(
+                'zoom must be between 0 and {}'.format(_INDEX_BITS))
+        shift = np.uint64(2 * (_INDEX_BITS - zoom))
+        tile_key = mercator.zorder_keys([tile_x], [tile_y])[0]
+        start, end = np.searchsorted(
+            self.keys,
+            [tile_key << shift, (tile_key + np.uint64(1)) << shift]
+        )
+        return slice(start, end)
+
+    def points_near_tile(self, zoom, tile_x, tile_y, margin):
+        """
+        Points within a tile or less than `margin` pixels from it
+
+        :returns:
+            Tuple ``(pixel_x, pixel_y, weights)`` where ``pixel_x`` and
+            ``pixel_y`` are the positions of the points in pixels,
+            relative to the top left corner of the tile. Points near
+            the left and right edges of the world are repeated on the
+            other side, so that heatmaps wrap around the antimeridian.
+        """
+        number_tiles = 2 ** zoom
+        world_pixels = mercator.world_size(zoom)
+        pixel_x = []
+        pixel_y = []
+        weights = []
+        for offset_y in (-1, 0, 1):
+            neighbor_y = tile_y + offset_y
+            if not 0 <= neighbor_y < number_tiles:
+                continue
+            for offset_x in (-1, 0, 1):
+                neighbor_x = (tile_x + offset_x) % number_tiles
+                points = self.tile_slice(zoom, neighbor_x, neighbor_y)
+                # Shift for neighbors on the other side of the antimeridian
+                wrap_offset = (tile_x + offset_x - neighbor_x) * TILE_SIZE
+                neighbor_pixel_x = (
+                    self.x[points] * world_pixels - tile_x * TILE_SIZE +
+                    wrap_offset)
+                neighbor_pixel_y = (
+                    self.y[points] * world_pixels - tile_y * TILE_SIZE)
+                neighbor_weights = self.weights[points]
+                if offset_x != 0 or offset_y != 0:
+                    is_near = (
+                        (neighbor_pixel_x >= -margin) &
+                        (neighbor_pixel_x < TILE_SIZE + margin) &
+                        (neighbor_pixel_y >= -margin) &
+                        (neighbor_pixel_y < TILE_SIZE + margin)
+                    )
+                    neighbor_pixel_x = neighbor_pixel_x[is_near]
+                    neighbor_pixel_y = neighbor_pixel_y[is_near]
+                    neighbor_weights = neighbor_weights[is_near]
+                pixel_x.append(neighbor_pixel_x)
+                pixel_y.append(neighbor_pixel_y)
+                weights.append(neighbor_weights)
+        return (
+            np.concatenate(pixel_x),
+            np.concatenate(pixel_y),
+            np.concatenate(weights)
+        )
+
+    def max_density(self, zoom, cell_pixels):
+        """
+        Total weight of the points in the densest square cell
+
+        The cells are `cell_pixels` pixels wide at `zoom`, rounded to a
+        power of 2.
+        """
+        if not len(self):
+            return 0.0
+        cell_bits = max(int(round(np.log2(max(cell_pixels, 1)))), 0)
+        # Number of bits per axis of the grid of cells
+        grid_bits = min(max(zoom + _TILE_BITS - cell_bits, 0), _INDEX_BITS)
+        shift = np.uint64(2 * (_INDEX_BITS - grid_bits))
+        cell_keys = self.keys >> shift
+        is_new_cell = np.empty(len(cell_keys), dtype=bool)
+        is_new_cell[0] = True
+        np.not_equal(cell_keys[1:], cell_keys[:-1], out=is_new_cell[1:])
+        cell_weights = np.add.reduceat(
+            self.weights, np.flatnonzero(is_new_cell))
+        return float(cell_weights.max())
+
+
+def render_heatmap_tile(
+        pixel_x, pixel_y, weights, radius, max_intensity, colormap):
+    """
+    Render a heatmap tile as an array of RGBA values
+
+    Each point contributes a smooth bump of height its weight and of
+    radius `radius` pixels. The intensity at each pixel, the sum of the
+    contributions of every point, is mapped to a color of `colormap`,
+    with intensities of `max_intensity` and above mapped to the last
+    color.
+
+    :param pixel_x, pixel_y, weights:
+        Position and weight of the points, as returned by
+        :meth:`TilePointIndex.points_near_tile`.
+
+    :returns:
+        Array of shape ``(TILE_SIZE, TILE_SIZE, 4)`` of 8-bit RGBA values.
+    """
+    # The bump is a tent function, built by blurring twice with a box
+    # filter of width `box_width`.
+    half_width = max(radius // 2, 1)
+    box_width = 2 * half_width + 1
+    margin = 2 * half_width
+    size = TILE_SIZE + 2 * margin
+    columns = np.floor(pixel_x).astype(np.int64) + margin
+    rows = np.floor(pixel_y).astype(np.int64) + margin
+    is_inside = (
+        (columns >= 0) & (columns < size) & (rows >= 0) & (rows < size))
+    density = np.bincount(
+        rows[is_inside] * size + columns[is_inside],
+        weights=weights[is_inside],
+        minlength=size * size
+    ).reshape(size, size)
+    for axis in (0, 1):
+        density = _box_blur(density, half_width, axis)
+        density = _box_blur(density, half_width, axis)
+    # Scale so that an isolated point has an intensity of its weight
+    density = density[margin:-margin, margin:-margin] * box_width ** 2
+    intensities = np.clip(density / max_intensity, 0.0, 1.0)
+    color_indices = np.round(
+        intensities * (len(colormap) - 1)).astype(np.int64)
+    rgba = colormap[color_indices]
+    rgba[density <= 0.0] = 0
+    return rgba
+
+
+def _box_blur(values, half_width, axis):
+    # Moving average over a window of `2 * half_width + 1` values,
+    # computed with cumulative sums
+    width = 2 * half_width + 1
+    pad_width = [(0, 0), (0, 0)]
+    pad_width[axis] = (half_width + 1, half_width)
+    sums = np.cumsum(np.pad(values, pad_width, mode='constant'), axis=axis)
+    if axis == 0:
+        return (sums[width:] - sums[:-width]) / width
+    else:
+        return (sums[:, width:] - sums[:, :-width]) / width
@@ -0,0 +1,135 @@
+"""
+Loading layer data for the visible part of the map
+
+Maps report their current viewport, as bounds and a zoom level, to the
+kernel whenever the user stops panning or zooming. Layers that define an
+``update_viewport(bounds, zoom)`` method are called with the new
+viewport, so they can send only the data that is visible.
+"""
+
+from traitlets import HasTraits, Bool
+
+from .locations import locations_to_array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Fraction of the viewport size added on each side of the viewport when
+# selecting the visible points, so that small pans do not leave the
+# edges of the map empty while waiting for new data.
+VIEWPORT_PADDING = 0.25
+
+
+def in_bounds(latitudes, longitudes, bounds):
+    """
+    Boolean mask of the points that lie within bounds
+
+    :param bounds:
+        ((min_latitude, min_longitude), (max_latitude, max_longitude))
+        tuple. If ``min_longitude`` is greater than ``max_longitude``,
+        the bounds cross the antimeridian.
+    """
+    (min_latitude, min_longitude), (max_latitude, max_longitude) = bounds
+    in_latitude = (latitudes >= min_latitude) & (latitudes <= max_latitude)
+    if min_longitude <= max_longitude:
+        in_longitude = (
+            (longitudes >= min_longitude) & (longitudes <= max_longitude))
+    else:
+        # The bounds cross the antimeridian
+        in_longitude = (
+            (longitudes >= min_longitude) | (longitudes <= max_longitude))
+    return in_latitude & in_longitude
+
+
+def pad_bounds(bounds, padding=VIEWPORT_PADDING):
+    """
+    Enlarge bounds by a fraction of their size on each side
+    """
+    (min_latitude, min_longitude), (max_latitude, max_longitude) = bounds
+    latitude_padding = (max_latitude - min_latitude) * padding
+    longitude_extent = (max_longitude - min_longitude) % 360.0
+    longitude_padding = longitude_extent * padding
+    if longitude_extent + 2.0 * longitude_padding >= 360.0:
+        min_longitude, max_longitude = -180.0, 180.0
+    else:
+        min_longitude = _wrap_longitude(min_longitude - longitude_padding)
+        max_longitude = _wrap_longitude(max_longitude + longitude_padding)
+    return (
+        (max(min_latitude - latitude_padding, -90.0), min_longitude),
+        (min(max_latitude + latitude_padding, 90.0), max_longitude)
+    )
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+class ViewportData(object):
+    """
+    Points, and columns of values attached to each point, from which
+    we can select the points visible in a viewport
+    """
+    def __init__(self, locations, **columns):
+        if np is None:
+            raise ImportError('Loading data by viewport requires numpy')
+        self.locations = locations_to_array(locations)
+        self.columns = {
+            name: np.asarray(values) for name, values in columns.items()
+        }
+
+    def __len__(self):
+        return len(self.locations)
+
+    def extend(self, locations, **columns):
+        self.locations = np.concatenate(
+            [self.locations, locations_to_array(locations)])
+        for name, values in columns.items():
+            self.columns[name] = np.concatenate(
+                [self.columns[name], np.asarray(values)])
+
+    def visible(self, bounds, padding=VIEWPORT_PADDING):
+        """
+        Locations and columns of the points in a padded viewport
+
+        :returns:
+            Tuple ``(locations, columns)``, where ``locations`` is an
+            array of shape ``(n, 2)`` and ``columns`` maps the name of
+            each column to the values for the visible points.
+        """
+        is_visible = in_bounds(
+            self.locations[:, 0], self.locations[:, 1],
+            pad_bounds(bounds, padding))
+        columns = {
+            name: values[is_visible] for name, values in self.columns.items()
+        }
+        return self.locations[is_visible], columns
+
+
+class ViewportLayerMixin(HasTraits):
+    """
+    Mixin for layers that only send the data visible in the map's viewport
+
+    Layers using this mixin must implement ``_show_visible_data``, which
+    takes the output of :meth:`ViewportData.visible` and updates the
+    layer's synced traits.
+    """
+    viewport_only = Bool(False)
+
+    _viewport_data = None
+
+    def update_viewport(self, bounds, zoom):
+        """
+        Called by the map when the viewport changes
+        """
+        self._viewport_bounds = bounds
+        if self.viewport_only and self._viewport_data is not None:
+            self._show_visible_data(*self._viewport_data.visible(bounds))
+
+    def _refresh_viewport(self):
+        bounds = getattr(self, '_viewport_bounds', None)
+        if bounds is None:
+            bounds = self.data_bounds
+        self.update_viewport(bounds, None)
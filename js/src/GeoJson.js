@@ -2,6 +2,33 @@ import * as widgets from '@jupyter-widgets/base';
 import GoogleMapsLoader from 'google-maps';
 
 import {GMapsLayerView, GMapsLayerModel} from './GMapsLayer';
+import {deserializeColors} from './services/colors';
+import {columnValue, updateColumn} from './services/columns';
+import {levelIndexForZoom} from './services/pyramid';
+
+// Features of compact GeoJSON layers arrive either as a JSON array or,
+// with binary encoding, as a buffer of UTF-8 encoded JSON.
+const deserializeFeatures = value => {
+    if (Array.isArray(value)) {
+        return value;
+    }
+    const {buffer} = value;
+    const bytes = new Uint8Array(
+        buffer.buffer,
+        buffer.byteOffset,
+        buffer.byteLength
+    );
+    return JSON.parse(new TextDecoder('utf-8').decode(bytes));
+};
+
+// Geometries of each level are encoded like the features. Levels
+// without geometries show the geometries of the features.
+const deserializeGeometryLevels = levels =>
+    levels.map(({zoom, geometries}) => ({
+        zoom,
+        geometries:
+            geometries === null ? null : deserializeFeatures(geometries),
+    }));
 
 export class GeoJsonLayerModel extends GMapsLayerModel {
     defaults() {
@@ -98,3 +125,145 @@ export class GeoJsonLayerView extends GMapsLayerView {
         });
     }
 }
+
+export class CompactGeoJsonLayerModel extends GMapsLayerModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            _view_name: 'CompactGeoJsonLayerView',
+            _model_name: 'CompactGeoJsonLayerModel',
+        };
+    }
+
+    static serializers = {
+        ...widgets.DOMWidgetModel.serializers,
+        features: {deserialize: deserializeFeatures},
+        geometry_levels: {deserialize: deserializeGeometryLevels},
+        fill_color: {deserialize: deserializeColors},
+        stroke_color: {deserialize: deserializeColors},
+    };
+}
+
+/* GeoJSON layer with every feature in a single model.
+ *
+ * The features are added to a data layer of their own, styled from the
+ * model's style columns. The kernel sends changes to the style of a few
+ * features as messages, which only restyle those features. If the model
+ * has simplified geometry levels, the features are swapped for the
+ * level that matches the zoom level whenever the map is zoomed.
+ */
+export class CompactGeoJsonLayerView extends GMapsLayerView {
+    constructor(options) {
+        super(options);
+        this.canDownloadAsPng = true;
+    }
+
+    render() {
+        this.data = new google.maps.Data();
+        this.levelIndex = null;
+        this.addFeatures();
+        this.data.setStyle(feature => this.featureStyle(feature));
+        this.model.on(
+            'change:features change:geometry_levels',
+            this.resetFeatures,
+            this
+        );
+        const styleEvents = GeoJsonFeatureView.styleProperties
+            .map(([, nameInModel]) => `change:${nameInModel}`)
+            .join(' ');
+        this.model.on(styleEvents, this.restyle, this);
+        this.model.on('msg:custom', this.handleMessage, this);
+    }
+
+    addToMapView(mapView) {
+        this.mapView = mapView;
+        this.data.setMap(mapView.map);
+        mapView.map.addListener('zoom_changed', () => this.updateLevel());
+        this.updateLevel();
+    }
+
+    currentZoom() {
+        return this.mapView ? this.mapView.map.getZoom() : undefined;
+    }
+
+    // Swap the features if the map is zoomed into another level
+    updateLevel() {
+        const levels = this.model.get('geometry_levels');
+        if (levels.length === 0) {
+            return;
+        }
+        const levelIndex = levelIndexForZoom(levels, this.currentZoom());
+        if (levelIndex !== this.levelIndex) {
+            this.resetFeatures();
+        }
+    }
+
+    // Features with the geometries of the level for the current zoom
+    levelFeatures() {
+        const features = this.model.get('features');
+        const levels = this.model.get('geometry_levels');
+        if (levels.length === 0) {
+            return features;
+        }
+        this.levelIndex = levelIndexForZoom(levels, this.currentZoom());
+        const {geometries} = levels[this.levelIndex];
+        if (geometries === null) {
+            return features;
+        }
+        return features.map((feature, index) => ({
+            ...feature,
+            geometry: geometries[index],
+        }));
+    }
+
+    addFeatures() {
+        this.features = this.data.addGeoJson({
+            type: 'FeatureCollection',
+            features: this.levelFeatures(),
+        });
+        this.featureIndices = new Map(
+            this.features.map((feature, index) => [feature, index])
+        );
+    }
+
+    resetFeatures() {
+        this.features.forEach(feature => this.data.remove(feature));
+        this.addFeatures();
+    }
+
+    featureStyle(feature) {
+        const index = this.featureIndices.get(feature);
+        return GeoJsonFeatureView.styleProperties.reduce(
+            (acc, [nameInView, nameInModel]) => {
+                const value = columnValue(this.model.get(nameInModel), index);
+                return {...acc, [nameInView]: value};
+            },
+            {}
+        );
+    }
+
+    restyle() {
+        this.data.revertStyle();
+        this.data.setStyle(feature => this.featureStyle(feature));
+    }
+
+    handleMessage(msg) {
+        if (msg.event === 'STYLES_UPDATED') {
+            const {indices, styles} = msg.payload;
+            Object.entries(styles).forEach(([nameInModel, values]) => {
+                // Update the model's attributes directly, since setting
+                // them would restyle every feature.
+                this.model.attributes[nameInModel] = updateColumn(
+                    this.model.get(nameInModel),
+                    indices,
+                    values,
+                    this.features.length
+                );
+            });
+            indices.forEach(index => {
+                const feature = this.features[index];
+                this.data.overrideStyle(feature, this.featureStyle(feature));
+            });
+        }
+    }
+}
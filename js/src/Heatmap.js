@@ -1,8 +1,52 @@
+import * as widgets from '@jupyter-widgets/base';
 import GoogleMapsLoader from 'google-maps';
 
 import {GMapsLayerView, GMapsLayerModel} from './GMapsLayer';
+import {
+    deserializeArray,
+    arrayRow,
+    mapRows,
+    appendRows,
+} from './services/arrays';
+import {levelIndexForZoom} from './services/pyramid';
 
-export class SimpleHeatmapLayerModel extends GMapsLayerModel {
+// Base model for heatmaps that can receive appended points.
+//
+// Python sends 'DATA_APPENDED' messages containing only the new
+// points. We update the model's data in place, without triggering
+// a change event, and notify the views with a 'data:appended' event
+// so they can update their existing Google Maps data.
+class HeatmapLayerBaseModel extends GMapsLayerModel {
+    initialize(attributes, options) {
+        super.initialize(attributes, options);
+        this.on('msg:custom', this.handleMessage, this);
+    }
+
+    handleMessage(content, buffers) {
+        if (content.event === 'DATA_APPENDED') {
+            const {numberRemoved, ...newData} = content.payload;
+            const appended = {};
+            Object.entries(newData).forEach(([name, value]) => {
+                const newRows = Array.isArray(value)
+                    ? value
+                    : deserializeArray({
+                          ...value,
+                          buffer: buffers[value.bufferIndex],
+                      });
+                const updatedRows = appendRows(
+                    this.get(name),
+                    newRows,
+                    numberRemoved
+                );
+                this.set(name, updatedRows, {silent: true});
+                appended[name] = newRows;
+            });
+            this.trigger('data:appended', appended, numberRemoved);
+        }
+    }
+}
+
+export class SimpleHeatmapLayerModel extends HeatmapLayerBaseModel {
     defaults() {
         return {
             ...super.defaults(),
@@ -10,9 +54,14 @@ export class SimpleHeatmapLayerModel extends GMapsLayerModel {
             _model_name: 'SimpleHeatmapLayerModel',
         };
     }
+
+    static serializers = {
+        ...widgets.DOMWidgetModel.serializers,
+        locations: {deserialize: deserializeArray},
+    };
 }
 
-export class WeightedHeatmapLayerModel extends GMapsLayerModel {
+export class WeightedHeatmapLayerModel extends HeatmapLayerBaseModel {
     defaults() {
         return {
             ...super.defaults(),
@@ -20,6 +69,34 @@ export class WeightedHeatmapLayerModel extends GMapsLayerModel {
             _model_name: 'WeightedHeatmapLayerModel',
         };
     }
+
+    static serializers = {
+        ...widgets.DOMWidgetModel.serializers,
+        locations: {deserialize: deserializeArray},
+        weights: {deserialize: deserializeArray},
+    };
+}
+
+export class HeatmapPyramidLayerModel extends GMapsLayerModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            _view_name: 'HeatmapPyramidLayerView',
+            _model_name: 'HeatmapPyramidLayerModel',
+        };
+    }
+
+    static serializers = {
+        ...widgets.DOMWidgetModel.serializers,
+        levels: {
+            deserialize: levels =>
+                levels.map(({zoom, locations, weights}) => ({
+                    zoom,
+                    locations: deserializeArray(locations),
+                    weights: deserializeArray(weights),
+                })),
+        },
+    };
 }
 
 class HeatmapLayerBaseView extends GMapsLayerView {
@@ -46,6 +123,24 @@ class HeatmapLayerBaseView extends GMapsLayerView {
         this.heatmap.setData(this.getData());
     }
 
+    appendData(appended, numberRemoved) {
+        if (this.heatmap === undefined) {
+            // Not rendered yet: the heatmap will be created from the
+            // updated model data.
+            return;
+        }
+        const data = this.heatmap.getData();
+        if (numberRemoved > data.getLength() / 2) {
+            // Cheaper to rebuild the data from the model
+            this.resetData();
+            return;
+        }
+        for (let i = 0; i < numberRemoved; i++) {
+            data.removeAt(0);
+        }
+        this.toGooglePoints(appended).forEach(point => data.push(point));
+    }
+
     addToMapView(mapView) {
         this.heatmap.setMap(mapView.map);
     }
@@ -65,6 +160,14 @@ class HeatmapLayerBaseView extends GMapsLayerView {
                 this.heatmap.set(nameInView, this.model.get(nameInModel));
             this.model.on(`change:${nameInModel}`, callback, this);
         });
+        this.model.on('data:appended', this.appendData, this);
+    }
+
+    getData() {
+        const dataAsGoogle = new google.maps.MVCArray(
+            this.toGooglePoints(this.model.attributes)
+        );
+        return dataAsGoogle;
     }
 }
 
@@ -74,12 +177,12 @@ export class SimpleHeatmapLayerView extends HeatmapLayerBaseView {
         this.model.on('change:locations', this.resetData, this);
     }
 
-    getData() {
-        const data = this.model.get('locations');
-        const dataAsGoogle = new google.maps.MVCArray(
-            data.map(([lat, lng]) => new google.maps.LatLng(lat, lng))
+    // Convert an object with a `locations` array to Google Maps points
+    toGooglePoints({locations}) {
+        return mapRows(
+            locations,
+            ([lat, lng]) => new google.maps.LatLng(lat, lng)
         );
-        return dataAsGoogle;
     }
 }
 
@@ -90,16 +193,174 @@ export class WeightedHeatmapLayerView extends HeatmapLayerBaseView {
         this.model.on('change:weights', this.resetData, this);
     }
 
+    // Convert an object with `locations` and `weights` arrays to
+    // weighted Google Maps points
+    toGooglePoints({locations, weights}) {
+        return mapRows(locations, ([lat, lng], i) => {
+            const weight = arrayRow(weights, i);
+            const location = new google.maps.LatLng(lat, lng);
+            return {location, weight};
+        });
+    }
+}
+
+// Heatmap showing one level of a pyramid of aggregated points at a time.
+// The level is swapped whenever the zoom level of the map changes.
+export class HeatmapPyramidLayerView extends WeightedHeatmapLayerView {
+    initialize(parameters) {
+        super.initialize(parameters);
+        this.levelIndex = null;
+    }
+
+    modelEvents() {
+        super.modelEvents();
+        this.model.on('change:levels', this.resetLevel, this);
+    }
+
+    addToMapView(mapView) {
+        super.addToMapView(mapView);
+        mapView.map.addListener('zoom_changed', () => this.updateLevel());
+        this.updateLevel();
+    }
+
+    currentZoom() {
+        return this.mapView ? this.mapView.map.getZoom() : undefined;
+    }
+
+    resetLevel() {
+        this.levelIndex = null;
+        this.updateLevel();
+    }
+
+    // Swap the heatmap data if the map is zoomed into another level
+    updateLevel() {
+        const levels = this.model.get('levels');
+        const levelIndex = levelIndexForZoom(levels, this.currentZoom());
+        if (levelIndex !== this.levelIndex && this.heatmap !== undefined) {
+            this.levelIndex = levelIndex;
+            this.resetData();
+        }
+    }
+
     getData() {
-        const data = this.model.get('locations');
-        const weights = this.model.get('weights');
-        const dataAsGoogle = new google.maps.MVCArray(
-            data.map(([lat, lng], i) => {
-                const weight = weights[i];
-                const location = new google.maps.LatLng(lat, lng);
-                return {location, weight};
-            })
+        const levels = this.model.get('levels');
+        const levelIndex = levelIndexForZoom(levels, this.currentZoom());
+        this.levelIndex = levelIndex;
+        const level = levels[levelIndex];
+        const points = level === undefined ? [] : this.toGooglePoints(level);
+        return new google.maps.MVCArray(points);
+    }
+}
+
+export class TiledHeatmapLayerModel extends GMapsLayerModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            _view_name: 'TiledHeatmapLayerView',
+            _model_name: 'TiledHeatmapLayerModel',
+        };
+    }
+}
+
+// Heatmap made of PNG tiles rendered by the kernel.
+//
+// The layer is an overlay map type. When the map needs a tile, we
+// return an empty image and send a 'TILE_REQUESTED' message to the
+// kernel. The kernel replies with a 'TILE_RENDERED' message, with the
+// PNG image as a binary buffer, which we load into the image.
+export class TiledHeatmapLayerView extends GMapsLayerView {
+    constructor(options) {
+        super(options);
+        this.canDownloadAsPng = true;
+    }
+
+    render() {
+        this.nextRequestId = 0;
+        // Images waiting for a tile from the kernel, by request ID
+        this.pendingTiles = new Map();
+        this.tiles = new Set();
+        this.mapType = {
+            tileSize: new google.maps.Size(256, 256),
+            getTile: (coord, zoom, ownerDocument) =>
+                this.getTile(coord, zoom, ownerDocument),
+            releaseTile: tile => this.releaseTile(tile),
+        };
+        this.model.on('msg:custom', this.handleMessage, this);
+        this.model.on('change:opacity', this.updateOpacity, this);
+        this.model.on(
+            'change:point_radius change:max_intensity change:gradient',
+            this.reloadTiles,
+            this
         );
-        return dataAsGoogle;
+    }
+
+    addToMapView(mapView) {
+        this.mapView = mapView;
+        mapView.map.overlayMapTypes.push(this.mapType);
+    }
+
+    getTile(coord, zoom, ownerDocument) {
+        const tile = ownerDocument.createElement('img');
+        tile.style.width = '256px';
+        tile.style.height = '256px';
+        tile.style.opacity = this.model.get('opacity');
+        tile.requestId = this.nextRequestId++;
+        this.pendingTiles.set(tile.requestId, tile);
+        this.tiles.add(tile);
+        this.send({
+            event: 'TILE_REQUESTED',
+            payload: {
+                requestId: tile.requestId,
+                zoom,
+                x: coord.x,
+                y: coord.y,
+            },
+        });
+        return tile;
+    }
+
+    releaseTile(tile) {
+        this.pendingTiles.delete(tile.requestId);
+        this.tiles.delete(tile);
+        if (tile.src) {
+            URL.revokeObjectURL(tile.src);
+        }
+    }
+
+    handleMessage(content, buffers) {
+        if (content.event === 'TILE_RENDERED') {
+            const {requestId, isEmpty} = content.payload;
+            const tile = this.pendingTiles.get(requestId);
+            if (tile === undefined) {
+                // The tile was released before the kernel replied
+                return;
+            }
+            this.pendingTiles.delete(requestId);
+            if (!isEmpty) {
+                const image = new Blob([buffers[0]], {type: 'image/png'});
+                tile.src = URL.createObjectURL(image);
+            }
+        } else if (content.event === 'TILES_CHANGED') {
+            this.reloadTiles();
+        }
+    }
+
+    updateOpacity() {
+        const opacity = this.model.get('opacity');
+        this.tiles.forEach(tile => {
+            tile.style.opacity = opacity;
+        });
+    }
+
+    // Re-insert the overlay to make the map request every tile again
+    reloadTiles() {
+        if (this.mapView) {
+            const overlays = this.mapView.map.overlayMapTypes;
+            const index = overlays.getArray().indexOf(this.mapType);
+            if (index !== -1) {
+                overlays.removeAt(index);
+                overlays.insertAt(index, this.mapType);
+            }
+        }
     }
 }
@@ -46,6 +46,11 @@ function reloadGoogleMaps(configuration) {
 
 const DATA_BOUNDS = 'DATA_BOUNDS';
 const ZOOM_CENTER = 'ZOOM_CENTER';
+
+// Wait this long (in ms) after the map becomes idle before sending
+// the viewport to the kernel, to avoid sending intermediate viewports
+// while the user is still panning or zooming.
+const VIEWPORT_SYNC_DELAY = 300;
 const AUTHENTICATION_ERROR_MESSAGE = `
 <p>
 Something went wrong authenticating with Google Maps. This may be because you did not pass in an API key, or the key you passed in was incorrect.
@@ -145,6 +150,30 @@ export class PlainmapView extends ConfigurationMixin(widgets.DOMWidgetView) {
             this.model.set('map_type', newMapType);
             this.touch();
         });
+
+        const syncViewport = _.debounce(
+            () => this.syncViewport(),
+            VIEWPORT_SYNC_DELAY
+        );
+        this.map.addListener('idle', syncViewport);
+    }
+
+    // Send the current bounds and zoom level to the kernel
+    syncViewport() {
+        const bounds = this.map.getBounds();
+        if (bounds === undefined || bounds === null) {
+            return;
+        }
+        const southWest = bounds.getSouthWest();
+        const northEast = bounds.getNorthEast();
+        this.model.set({
+            current_bounds: [
+                [southWest.lat(), southWest.lng()],
+                [northEast.lat(), northEast.lng()],
+            ],
+            current_zoom: this.map.getZoom(),
+        });
+        this.touch();
     }
 
     setMapOptions(options) {
@@ -240,6 +269,8 @@ export class PlainmapModel extends widgets.DOMWidgetModel {
             initial_viewport: {type: DATA_BOUNDS},
             map_type: 'ROADMAP',
             mouse_handling: 'COOPERATIVE',
+            current_bounds: null,
+            current_zoom: null,
         };
     }
 
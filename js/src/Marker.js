@@ -1,6 +1,10 @@
 import * as widgets from '@jupyter-widgets/base';
 
 import {GMapsLayerView, GMapsLayerModel} from './GMapsLayer';
+import {deserializeArray, arrayLength, arrayRow} from './services/arrays';
+import {deserializeColors} from './services/colors';
+import {columnValue} from './services/columns';
+import {MarkerClusterer, clusterOptions} from './MarkerClusterer';
 
 export class SymbolModel extends GMapsLayerModel {
     defaults() {
@@ -40,6 +44,23 @@ export class MarkerLayerModel extends GMapsLayerModel {
     };
 }
 
+export class CompactMarkerLayerModel extends GMapsLayerModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            _view_name: 'CompactMarkerLayerView',
+            _model_name: 'CompactMarkerLayerModel',
+        };
+    }
+
+    static serializers = {
+        ...widgets.DOMWidgetModel.serializers,
+        locations: {deserialize: deserializeArray},
+        fill_color: {deserialize: deserializeColors},
+        stroke_color: {deserialize: deserializeColors},
+    };
+}
+
 /* Base class for markers.
  * This sets options common to the different types of markers.
  *
@@ -209,15 +230,36 @@ export class MarkerLayerView extends GMapsLayerView {
     }
 
     render() {
+        this.clusterer = new MarkerClusterer(clusterOptions(this.model));
         this.markerViews = new widgets.ViewList(
             this.addMarker,
             this.removeMarker,
             this
         );
-        this.markerViews.update(this.model.get('markers'));
-        this.model.on('change:markers', () => {
-            this.markerViews.update(this.model.get('markers'));
-        });
+        this.updateMarkers();
+        this.model.on('change:markers', this.updateMarkers, this);
+        this.model.on('change:cluster', this.toggleClustering, this);
+        this.model.on(
+            'change:cluster_radius change:cluster_max_zoom',
+            () => this.clusterer.setOptions(clusterOptions(this.model)),
+            this
+        );
+        this.toggleClustering();
+    }
+
+    updateMarkers() {
+        this.markerViews
+            .update(this.model.get('markers'))
+            .then(markerViews =>
+                this.clusterer.setMarkers(
+                    markerViews.map(markerView => markerView.marker)
+                )
+            );
+    }
+
+    toggleClustering() {
+        const map = this.model.get('cluster') ? this.mapView.map : null;
+        this.clusterer.setMap(map);
     }
 
     // No need to do anything here since the markers are added
@@ -235,3 +277,126 @@ export class MarkerLayerView extends GMapsLayerView {
         markerView.removeFromMapView();
     }
 }
+
+/* Layer of markers or symbols stored as arrays in a single model.
+ *
+ * Rather than a view per marker, this creates all the Google Maps
+ * markers from the model's arrays, and shares a single info box
+ * between the markers. Any change to the model re-creates every
+ * marker.
+ */
+export class CompactMarkerLayerView extends GMapsLayerView {
+    static modelProperties = [
+        'locations',
+        'marker_type',
+        'hover_text',
+        'display_info_box',
+        'info_box_content',
+        'label',
+        'fill_color',
+        'fill_opacity',
+        'stroke_color',
+        'stroke_opacity',
+        'scale',
+    ];
+
+    constructor(options) {
+        super(options);
+        this.canDownloadAsPng = true;
+    }
+
+    render() {
+        this.infoBox = new google.maps.InfoWindow();
+        this.clusterer = new MarkerClusterer(clusterOptions(this.model));
+        this.markers = this.createMarkers();
+        this.clusterer.setMarkers(this.markers);
+        const events = CompactMarkerLayerView.modelProperties
+            .map(nameInModel => `change:${nameInModel}`)
+            .join(' ');
+        this.model.on(events, this.resetMarkers, this);
+        this.model.on('change:cluster', this.toggleClustering, this);
+        this.model.on(
+            'change:cluster_radius change:cluster_max_zoom',
+            () => this.clusterer.setOptions(clusterOptions(this.model)),
+            this
+        );
+    }
+
+    addToMapView(mapView) {
+        this.mapView = mapView;
+        this.markers.forEach(marker => marker.setMap(mapView.map));
+        this.toggleClustering();
+    }
+
+    removeFromMapView() {
+        this.clusterer.setMap(null);
+        this.infoBox.close();
+        this.markers.forEach(marker => marker.setMap(null));
+        this.mapView = null;
+    }
+
+    toggleClustering() {
+        if (this.mapView) {
+            const map = this.model.get('cluster') ? this.mapView.map : null;
+            this.clusterer.setMap(map);
+        }
+    }
+
+    resetMarkers() {
+        const mapView = this.mapView;
+        this.removeFromMapView();
+        this.markers = this.createMarkers();
+        this.clusterer.setMarkers(this.markers);
+        if (mapView) {
+            this.addToMapView(mapView);
+        }
+    }
+
+    createMarkers() {
+        const locations = this.model.get('locations');
+        const numberMarkers = arrayLength(locations);
+        const markers = new Array(numberMarkers);
+        for (let index = 0; index < numberMarkers; index++) {
+            markers[index] = this.createMarker(locations, index);
+        }
+        return markers;
+    }
+
+    createMarker(locations, index) {
+        const [lat, lng] = arrayRow(locations, index);
+        const value = nameInModel =>
+            columnValue(this.model.get(nameInModel), index);
+        const displayInfoBox = value('display_info_box');
+        const marker = new google.maps.Marker({
+            position: {lat, lng},
+            draggable: false,
+            clickable: displayInfoBox,
+            title: value('hover_text'),
+            ...this.getStyleOptions(value),
+        });
+        if (displayInfoBox) {
+            marker.addListener('click', () => {
+                this.infoBox.setContent(value('info_box_content'));
+                this.infoBox.open(this.mapView.map, marker);
+            });
+        }
+        return marker;
+    }
+
+    getStyleOptions(value) {
+        if (this.model.get('marker_type') === 'symbol') {
+            return {
+                icon: {
+                    path: google.maps.SymbolPath.CIRCLE,
+                    scale: value('scale'),
+                    fillColor: value('fill_color'),
+                    strokeColor: value('stroke_color'),
+                    fillOpacity: value('fill_opacity'),
+                    strokeOpacity: value('stroke_opacity'),
+                },
+            };
+        } else {
+            return {label: value('label')};
+        }
+    }
+}
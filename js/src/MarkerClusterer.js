@@ -0,0 +1,144 @@
+import {gridClusters} from './services/clustering';
+
+// Clustering options from a layer model with `cluster_radius`
+// and `cluster_max_zoom` attributes.
+export function clusterOptions(model) {
+    return {
+        radius: model.get('cluster_radius'),
+        maxZoom: model.get('cluster_max_zoom'),
+    };
+}
+
+/* Groups Google Maps markers into clusters that depend on the zoom level.
+ *
+ * The clusterer controls which markers are shown on the map: markers
+ * that belong to a cluster with more than one member are hidden and
+ * replaced by a single cluster icon showing the number of markers.
+ * Clusters are recomputed whenever the map becomes idle after a pan
+ * or a zoom. Only cluster icons within the visible bounds are created.
+ */
+export class MarkerClusterer {
+    constructor({radius, maxZoom}) {
+        this.radius = radius;
+        this.maxZoom = maxZoom;
+        this.map = null;
+        this.markers = [];
+        this.clusterMarkers = [];
+        this.idleListener = null;
+        this.redrawTimeout = null;
+    }
+
+    setMap(map) {
+        if (this.idleListener !== null) {
+            this.idleListener.remove();
+            this.idleListener = null;
+        }
+        this.clearClusterMarkers();
+        if (map === null && this.map === null) {
+            return;
+        } else if (map === null) {
+            // Stop clustering: restore every marker
+            const previousMap = this.map;
+            this.map = null;
+            this.markers.forEach(marker => marker.setMap(previousMap));
+        } else {
+            this.map = map;
+            this.idleListener = map.addListener('idle', () => this.redraw());
+            this.redraw();
+        }
+    }
+
+    setMarkers(markers) {
+        this.markers = markers;
+        this.scheduleRedraw();
+    }
+
+    setOptions({radius, maxZoom}) {
+        this.radius = radius;
+        this.maxZoom = maxZoom;
+        this.scheduleRedraw();
+    }
+
+    // Redraw once after a sequence of changes, e.g. when many
+    // markers are added one at a time.
+    scheduleRedraw() {
+        if (this.redrawTimeout === null) {
+            this.redrawTimeout = setTimeout(() => {
+                this.redrawTimeout = null;
+                this.redraw();
+            }, 0);
+        }
+    }
+
+    redraw() {
+        const map = this.map;
+        if (map === null || map.getBounds() === undefined) {
+            return;
+        }
+        this.clearClusterMarkers();
+        const zoom = map.getZoom();
+        if (zoom > this.maxZoom) {
+            this.markers.forEach(marker => this.showMarker(marker, map));
+            return;
+        }
+        const bounds = map.getBounds();
+        const positions = this.markers.map(marker => {
+            const position = marker.getPosition();
+            return [position.lat(), position.lng()];
+        });
+        gridClusters(positions, zoom, this.radius).forEach(cluster => {
+            const {lat, lng, indices} = cluster;
+            const members = indices.map(index => this.markers[index]);
+            if (members.length === 1) {
+                this.showMarker(members[0], map);
+            } else {
+                members.forEach(marker => this.showMarker(marker, null));
+                if (bounds.contains({lat, lng})) {
+                    this.clusterMarkers.push(
+                        this.createClusterMarker(cluster, map)
+                    );
+                }
+            }
+        });
+    }
+
+    showMarker(marker, map) {
+        // Avoid re-drawing markers that are already in the right state
+        if (marker.getMap() !== map) {
+            marker.setMap(map);
+        }
+    }
+
+    createClusterMarker({lat, lng, indices}, map) {
+        const count = indices.length;
+        const clusterMarker = new google.maps.Marker({
+            position: {lat, lng},
+            map,
+            label: {text: `${count}`, color: 'white'},
+            title: `${count} markers`,
+            icon: {
+                path: google.maps.SymbolPath.CIRCLE,
+                scale: 12 + 4 * Math.log10(count),
+                fillColor: '#1f77b4',
+                fillOpacity: 0.8,
+                strokeColor: 'white',
+                strokeWeight: 2,
+            },
+        });
+        clusterMarker.addListener('click', () => {
+            const clusterBounds = new google.maps.LatLngBounds();
+            indices.forEach(index =>
+                clusterBounds.extend(this.markers[index].getPosition())
+            );
+            map.fitBounds(clusterBounds);
+        });
+        return clusterMarker;
+    }
+
+    clearClusterMarkers() {
+        this.clusterMarkers.forEach(clusterMarker =>
+            clusterMarker.setMap(null)
+        );
+        this.clusterMarkers = [];
+    }
+}
@@ -0,0 +1,96 @@
+import {
+    deserializeArray, arrayLength, arrayRow, mapRows, appendRows
+} from "../arrays";
+
+const asDataView = typedArray => new DataView(typedArray.buffer)
+
+describe("deserializeArray", () => {
+
+    it("passes JSON arrays through", () => {
+        const value = [[1.0, 2.0], [3.0, 4.0]]
+        expect(deserializeArray(value)).toBe(value)
+    })
+
+    it("passes null through", () => {
+        expect(deserializeArray(null)).toBeNull()
+    })
+
+    it("decodes float64 buffers", () => {
+        const buffer = asDataView(new Float64Array([1.0, 2.0, 3.0, 4.0]))
+        const array = deserializeArray(
+            {dtype: "float64", shape: [2, 2], buffer})
+        expect(array.shape).toEqual([2, 2])
+        expect(Array.from(array.data)).toEqual([1.0, 2.0, 3.0, 4.0])
+    })
+
+    it("decodes float32 buffers", () => {
+        const buffer = asDataView(new Float32Array([0.5, 1.5]))
+        const array = deserializeArray(
+            {dtype: "float32", shape: [2], buffer})
+        expect(array.data).toBeInstanceOf(Float32Array)
+        expect(Array.from(array.data)).toEqual([0.5, 1.5])
+    })
+
+    it("copies misaligned buffers", () => {
+        const bytes = new Uint8Array(20)
+        new Float64Array(bytes.buffer, 0, 2).set([1.0, 2.0])
+        bytes.copyWithin(4, 0, 16)
+        const buffer = new DataView(bytes.buffer, 4, 16)
+        const array = deserializeArray(
+            {dtype: "float64", shape: [2], buffer})
+        expect(Array.from(array.data)).toEqual([1.0, 2.0])
+    })
+})
+
+describe("array rows", () => {
+    const jsonArray = [[1.0, 2.0], [3.0, 4.0]]
+    const binaryArray = {shape: [2, 2], data: new Float64Array([1.0, 2.0, 3.0, 4.0])}
+    const binaryVector = {shape: [2], data: new Float64Array([0.2, 0.5])}
+
+    it("returns the length", () => {
+        expect(arrayLength(jsonArray)).toBe(2)
+        expect(arrayLength(binaryArray)).toBe(2)
+    })
+
+    it("returns rows of two-dimensional arrays", () => {
+        expect(Array.from(arrayRow(binaryArray, 1))).toEqual([3.0, 4.0])
+        expect(arrayRow(jsonArray, 1)).toEqual([3.0, 4.0])
+    })
+
+    it("returns elements of one-dimensional arrays", () => {
+        expect(arrayRow(binaryVector, 1)).toBe(0.5)
+    })
+
+    it("maps over rows", () => {
+        const sumRows = ([first, second], index) => first + second + index
+        expect(mapRows(jsonArray, sumRows)).toEqual([3.0, 8.0])
+        expect(mapRows(binaryArray, sumRows)).toEqual([3.0, 8.0])
+    })
+})
+
+describe("appendRows", () => {
+
+    it("appends to JSON arrays in place", () => {
+        const array = [[1.0, 2.0], [3.0, 4.0]]
+        const result = appendRows(array, [[5.0, 6.0]], 1)
+        expect(result).toBe(array)
+        expect(result).toEqual([[3.0, 4.0], [5.0, 6.0]])
+    })
+
+    it("appends to two-dimensional binary arrays", () => {
+        const array = {shape: [2, 2], data: new Float64Array([1.0, 2.0, 3.0, 4.0])}
+        const newRows = {shape: [2, 2], data: new Float64Array([5.0, 6.0, 7.0, 8.0])}
+        const result = appendRows(array, newRows, 1)
+        expect(result.shape).toEqual([3, 2])
+        expect(result.data).toBeInstanceOf(Float64Array)
+        expect(Array.from(result.data)).toEqual([3.0, 4.0, 5.0, 6.0, 7.0, 8.0])
+    })
+
+    it("appends to one-dimensional binary arrays", () => {
+        const array = {shape: [2], data: new Float32Array([0.5, 1.0])}
+        const newRows = {shape: [1], data: new Float32Array([1.5])}
+        const result = appendRows(array, newRows, 0)
+        expect(result.shape).toEqual([3])
+        expect(Array.from(result.data)).toEqual([0.5, 1.0, 1.5])
+    })
+})
@@ -0,0 +1,47 @@
+import {projectToPixels, gridClusters} from "../clustering";
+
+describe("projectToPixels", () => {
+
+    it("maps the origin to the center of the world", () => {
+        const [x, y] = projectToPixels(0.0, 0.0, 0)
+        expect(x).toBeCloseTo(128.0)
+        expect(y).toBeCloseTo(128.0)
+    })
+
+    it("doubles the coordinates with every zoom level", () => {
+        const [x0, y0] = projectToPixels(40.0, -70.0, 3)
+        const [x1, y1] = projectToPixels(40.0, -70.0, 4)
+        expect(x1).toBeCloseTo(2 * x0)
+        expect(y1).toBeCloseTo(2 * y0)
+    })
+
+    it("puts northern latitudes at the top", () => {
+        const [, yNorth] = projectToPixels(50.0, 0.0, 2)
+        const [, ySouth] = projectToPixels(-50.0, 0.0, 2)
+        expect(yNorth).toBeLessThan(ySouth)
+    })
+})
+
+describe("gridClusters", () => {
+
+    const positions = [[10.0, 10.0], [10.01, 10.01], [-30.0, 100.0]]
+
+    it("groups nearby points", () => {
+        const clusters = gridClusters(positions, 2, 60)
+        expect(clusters).toHaveLength(2)
+        const [first, second] = clusters
+        expect(first.indices).toEqual([0, 1])
+        expect(first.lat).toBeCloseTo(10.005)
+        expect(first.lng).toBeCloseTo(10.005)
+        expect(second.indices).toEqual([2])
+    })
+
+    it("separates points at high zoom", () => {
+        const clusters = gridClusters(positions, 18, 60)
+        expect(clusters).toHaveLength(3)
+    })
+
+    it("returns no clusters for no points", () => {
+        expect(gridClusters([], 5, 60)).toEqual([])
+    })
+})
@@ -0,0 +1,28 @@
+import {deserializeColors, isMappedColors, mappedColor} from "../colors";
+
+const asDataView = typedArray => new DataView(typedArray.buffer)
+
+describe("deserializeColors", () => {
+
+    it("passes single colors through", () => {
+        expect(deserializeColors("red")).toEqual("red")
+        expect(deserializeColors(null)).toBeNull()
+    })
+
+    it("passes arrays of colors through", () => {
+        const colors = ["red", "blue"]
+        expect(deserializeColors(colors)).toBe(colors)
+    })
+
+    it("decodes mapped colors", () => {
+        const buffer = asDataView(new Uint8Array([1, 0, 1]))
+        const colors = deserializeColors({
+            palette: ["red", "blue"],
+            indices: {dtype: "uint8", shape: [3], buffer}
+        })
+        expect(isMappedColors(colors)).toBe(true)
+        expect(colors.indices.data).toBeInstanceOf(Uint8Array)
+        expect(mappedColor(colors, 0)).toEqual("blue")
+        expect(mappedColor(colors, 1)).toEqual("red")
+    })
+})
@@ -0,0 +1,46 @@
+import {columnValue, columnToArray, updateColumn} from "../columns";
+
+const mappedColors = {
+    palette: ["red", "blue"],
+    indices: {shape: [3], data: new Uint8Array([1, 0, 1])}
+}
+
+describe("columnValue", () => {
+
+    it("broadcasts single values", () => {
+        expect(columnValue("red", 2)).toEqual("red")
+    })
+
+    it("indexes arrays", () => {
+        expect(columnValue([1, 2, 3], 1)).toEqual(2)
+    })
+
+    it("looks up mapped colors", () => {
+        expect(columnValue(mappedColors, 0)).toEqual("blue")
+    })
+})
+
+describe("columnToArray", () => {
+
+    it("expands single values", () => {
+        expect(columnToArray(2.0, 3)).toEqual([2.0, 2.0, 2.0])
+    })
+
+    it("expands mapped colors", () => {
+        expect(columnToArray(mappedColors, 3)).toEqual(["blue", "red", "blue"])
+    })
+})
+
+describe("updateColumn", () => {
+
+    it("updates arrays in place", () => {
+        const column = [1, 2, 3]
+        const updated = updateColumn(column, [0, 2], [5, 6], 3)
+        expect(updated).toBe(column)
+        expect(column).toEqual([5, 2, 6])
+    })
+
+    it("expands single values", () => {
+        expect(updateColumn(1, [1], [4], 3)).toEqual([1, 4, 1])
+    })
+})
@@ -0,0 +1,28 @@
+import {levelIndexForZoom} from "../pyramid";
+
+describe("levelIndexForZoom", () => {
+
+    const levels = [{zoom: 0}, {zoom: 1}, {zoom: 3}]
+
+    it("selects the level for the zoom", () => {
+        expect(levelIndexForZoom(levels, 0)).toEqual(0)
+        expect(levelIndexForZoom(levels, 1)).toEqual(1)
+        expect(levelIndexForZoom(levels, 3)).toEqual(2)
+    })
+
+    it("keeps a level until the next one", () => {
+        expect(levelIndexForZoom(levels, 2)).toEqual(1)
+    })
+
+    it("uses the finest level beyond the last zoom", () => {
+        expect(levelIndexForZoom(levels, 18)).toEqual(2)
+    })
+
+    it("uses the coarsest level below the first zoom", () => {
+        expect(levelIndexForZoom([{zoom: 2}, {zoom: 3}], 0)).toEqual(0)
+    })
+
+    it("handles undefined zoom levels", () => {
+        expect(levelIndexForZoom(levels, undefined)).toEqual(0)
+    })
+})
@@ -0,0 +1,96 @@
+// Helpers for arrays sent by the Python side. Arrays arrive either as
+// (nested) JSON lists or, when binary encoding is enabled, as objects
+// of the form {dtype, shape, buffer}, where `buffer` is a DataView.
+
+const typedArrayConstructors = {
+    float64: Float64Array,
+    float32: Float32Array,
+    uint8: Uint8Array,
+};
+
+// Widget deserializer for arrays that may be binary-encoded.
+// Binary arrays are converted to {shape, data}, where `data` is a
+// typed array of the right type.
+export function deserializeArray(value) {
+    if (value === null || value === undefined || Array.isArray(value)) {
+        return value;
+    }
+    const {dtype, shape, buffer} = value;
+    const TypedArray = typedArrayConstructors[dtype];
+    if (TypedArray === undefined) {
+        throw new Error(`Unexpected array dtype: ${dtype}`);
+    }
+    const length = shape.reduce((acc, dimension) => acc * dimension, 1);
+    let data;
+    if (buffer.byteOffset % TypedArray.BYTES_PER_ELEMENT === 0) {
+        data = new TypedArray(buffer.buffer, buffer.byteOffset, length);
+    } else {
+        // Typed arrays must be aligned on their element size.
+        const alignedBuffer = buffer.buffer.slice(
+            buffer.byteOffset,
+            buffer.byteOffset + length * TypedArray.BYTES_PER_ELEMENT
+        );
+        data = new TypedArray(alignedBuffer);
+    }
+    return {shape, data};
+}
+
+export function arrayLength(array) {
+    return Array.isArray(array) ? array.length : array.shape[0];
+}
+
+// Row `index` of an array. For two-dimensional binary arrays, this
+// is a view on the underlying typed array, not a copy.
+export function arrayRow(array, index) {
+    if (Array.isArray(array)) {
+        return array[index];
+    }
+    const {
+        shape: [, rowLength],
+        data,
+    } = array;
+    if (rowLength === undefined) {
+        return data[index];
+    }
+    return data.subarray(index * rowLength, (index + 1) * rowLength);
+}
+
+// Equivalent of `Array.map` that works for both JSON and binary arrays
+export function mapRows(array, callback) {
+    if (Array.isArray(array)) {
+        return array.map(callback);
+    }
+    const length = arrayLength(array);
+    const result = new Array(length);
+    for (let index = 0; index < length; index++) {
+        result[index] = callback(arrayRow(array, index), index);
+    }
+    return result;
+}
+
+// Append `newRows` to the end of `array` and drop the first
+// `numberRemoved` rows. JSON arrays are modified in place, while
+// binary arrays are copied into a new typed array. Both arrays must
+// use the same encoding.
+export function appendRows(array, newRows, numberRemoved) {
+    if (Array.isArray(array)) {
+        // Avoid `array.push(...newRows)`, which overflows the call
+        // stack for large arrays.
+        newRows.forEach(row => array.push(row));
+        array.splice(0, numberRemoved);
+        return array;
+    }
+    const {shape, data} = array;
+    const rowLength = shape.length > 1 ? shape[1] : 1;
+    const removedLength = numberRemoved * rowLength;
+    const newData = new data.constructor(
+        data.length - removedLength + newRows.data.length
+    );
+    newData.set(data.subarray(removedLength));
+    newData.set(newRows.data, data.length - removedLength);
+    const newShape = [shape[0] - numberRemoved + newRows.shape[0]];
+    if (shape.length > 1) {
+        newShape.push(rowLength);
+    }
+    return {shape: newShape, data: newData};
+}
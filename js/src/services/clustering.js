@@ -0,0 +1,49 @@
+// Grid-based clustering of points on a Web Mercator map.
+//
+// Points are projected to pixel coordinates at the current zoom level
+// and grouped into square cells of `radius` pixels. Every non-empty
+// cell becomes a cluster.
+
+const TILE_SIZE = 256;
+
+// Project a latitude and longitude to pixel coordinates at `zoom`
+export function projectToPixels(lat, lng, zoom) {
+    const scale = TILE_SIZE * Math.pow(2, zoom);
+    const sinLatitude = Math.min(
+        Math.max(Math.sin((lat * Math.PI) / 180.0), -0.9999),
+        0.9999
+    );
+    const x = ((lng + 180.0) / 360.0) * scale;
+    const y =
+        (0.5 -
+            Math.log((1 + sinLatitude) / (1 - sinLatitude)) / (4 * Math.PI)) *
+        scale;
+    return [x, y];
+}
+
+// Group `positions`, an array of [lat, lng] pairs, into clusters.
+//
+// Returns an array of clusters of the form {lat, lng, indices}, where
+// `lat` and `lng` are the mean position of the points in the cluster
+// and `indices` are the indices of these points in `positions`.
+export function gridClusters(positions, zoom, radius) {
+    const cells = new Map();
+    positions.forEach(([lat, lng], index) => {
+        const [x, y] = projectToPixels(lat, lng, zoom);
+        const key = `${Math.floor(x / radius)},${Math.floor(y / radius)}`;
+        const cell = cells.get(key);
+        if (cell === undefined) {
+            cells.set(key, {sumLat: lat, sumLng: lng, indices: [index]});
+        } else {
+            cell.sumLat += lat;
+            cell.sumLng += lng;
+            cell.indices.push(index);
+        }
+    });
+    const clusters = [];
+    cells.forEach(({sumLat, sumLng, indices}) => {
+        const count = indices.length;
+        clusters.push({lat: sumLat / count, lng: sumLng / count, indices});
+    });
+    return clusters;
+}
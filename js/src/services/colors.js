@@ -0,0 +1,23 @@
+import {deserializeArray} from './arrays';
+
+// Colors sent by `gmaps.colormap` arrive as a palette of color strings
+// and a binary array with the index in the palette of each color.
+export const isMappedColors = value =>
+    value !== null && typeof value === 'object' && 'palette' in value;
+
+// Widget deserializer for color options that may be mapped colors.
+// Other values, like single colors or arrays of colors, are passed
+// through.
+export function deserializeColors(value) {
+    if (!isMappedColors(value)) {
+        return value;
+    }
+    return {
+        palette: value.palette,
+        indices: deserializeArray(value.indices),
+    };
+}
+
+// Color at `index` of deserialized mapped colors
+export const mappedColor = (colors, index) =>
+    colors.palette[colors.indices.data[index]];
@@ -0,0 +1,35 @@
+import {isMappedColors, mappedColor} from './colors';
+
+// Style options on compact layers are either a single value, shared by
+// every item, or an array with one value per item. Colors can also be
+// a palette with the index of each item's color.
+export const columnValue = (column, index) => {
+    if (Array.isArray(column)) {
+        return column[index];
+    } else if (isMappedColors(column)) {
+        return mappedColor(column, index);
+    }
+    return column;
+};
+
+// Array with the value of a column for each of `length` items
+export function columnToArray(column, length) {
+    const values = new Array(length);
+    for (let index = 0; index < length; index++) {
+        values[index] = columnValue(column, index);
+    }
+    return values;
+}
+
+// Set the values of a column at `indices` to `values`. Array columns
+// are modified in place, while other columns are first converted to
+// an array of `length` values.
+export function updateColumn(column, indices, values, length) {
+    const updatedColumn = Array.isArray(column)
+        ? column
+        : columnToArray(column, length);
+    indices.forEach((itemIndex, index) => {
+        updatedColumn[itemIndex] = values[index];
+    });
+    return updatedColumn;
+}
@@ -0,0 +1,13 @@
+// Index of the level of a heatmap pyramid to show at a zoom level.
+//
+// `levels` is an array of objects with a `zoom` attribute, sorted by
+// increasing zoom. Each level is shown from its zoom level until the
+// zoom level of the next one. The first level is also shown at lower
+// zoom levels, and the last one at higher zoom levels.
+export function levelIndexForZoom(levels, zoom) {
+    let index = 0;
+    while (index + 1 < levels.length && levels[index + 1].zoom <= zoom) {
+        index++;
+    }
+    return index;
+}